@@ -0,0 +1,345 @@
+import json
+import os
+import re
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pa_parquet
+except ImportError:  # Parquet/Arrow dışa aktarımı pyarrow gerektirir, uygulamanın geri kalanı gerektirmez
+    pa = None
+
+from migrations import TEST_COUNTERS
+from score_history import history_frame, month_key, week_key
+from session_log import SESSION_DIR, read_session
+
+# -------------------- Analiz İçin Dışa Aktarma --------------------
+# Günlük istatistikler ve (oturum kaydı açıksa, bkz. session_log) cevap
+# olayları tipli sütunlarla Parquet veya Arrow IPC dosyalarına yazılır.
+# Klasör düzeni Hive bölümlemesidir, birden fazla öğrencinin klasörleri tek
+# klasörde toplanıp birlikte okunabilir:
+#
+#   analiz/daily/learner=<ad>/part-<ilk gün>_<son gün>.parquet
+#   analiz/events/learner=<ad>/part-<zaman damgası>.parquet
+#   analiz/_export_state.json   (öğrenci başına son aktarılan gün, özetler ve oturumlar)
+#
+#   pd.read_parquet("analiz/daily")   veya   load_table("analiz", "daily")
+#
+# Aktarım artımlıdır: her çalıştırmada sadece son aktarılan günden sonraki
+# tamamlanmış günler (bugün hariç) ve oturum dosyalarına yeni eklenen cevaplar
+# yeni bir parça dosyasına yazılır; mevcut dosyalar yeniden yazılmaz. Bir
+# bölümdeki parça sayısı COMPACT_PARTS'ı geçince parçalar tek dosyada
+# birleştirilir (küçük dosya sayısı okumayı yavaşlatmasın diye).
+#
+# Eski günler puan geçmişinde haftalık/aylık özetlere taşınır (bkz.
+# score_history); aktarım raw_history_days'ten seyrek çalışırsa aradaki
+# günler "weekly"/"monthly" satırları olarak (period sütunu) aktarılır. Bir
+# özet hem aktarılmış hem aktarılmamış günleri içerebileceğinden durum
+# dosyası her haftalık/aylık anahtar için o döneme (sonradan toplanacağı
+# dönem dahil: gün -> haftası -> haftanın ayı) aktarılmış toplamları tutar;
+# özetten sadece aktarılmamış fark satır olarak yazılır. Böylece her gün
+# tabloya bir kez girer ve sütun toplamları puan geçmişinin toplamlarına eşit
+# olur.
+
+ANALYTICS_DIR = "analiz"
+STATE_FILE = "_export_state.json"  # "_" ile başlayan dosyaları veri kümesi okuyucuları atlar
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+COMPACT_PARTS = 32  # Bölümde bundan fazla parça olunca birleştirilir
+
+COUNT_COLUMNS = ("questions_answered", "correct", "wrong", "new_words") + TEST_COUNTERS
+SUMMED_COLUMNS = ("days", "active_days", "score") + COUNT_COLUMNS
+
+# Sütun tipleri (pandas); Arrow şemaları _daily_schema ve _event_schema'da
+DAILY_DTYPES = {"period": "string", "days": "int16", "active_days": "int16", "score": "int64",
+                **{column: "int32" for column in COUNT_COLUMNS}}
+EVENT_DTYPES = {
+    "session": "string", "seed": "int64", "started": "datetime64[ns]", "answered_at": "datetime64[ns]",
+    "serial": "int32", "section": "string", "test_type": "string", "item_id": "string",
+    "question_id": "string", "answer": "string", "correct": "bool", "response_time": "float32",
+    "free_text": "bool", "match": "string", "distance": "Int16",
+}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ValueError("Parquet/Arrow dışa aktarımı için pyarrow gerekli (pip install pyarrow)")
+
+
+def _daily_schema():
+    return pa.schema([("date", pa.date32()), ("period", pa.string()), ("days", pa.int16()),
+                      ("active_days", pa.int16()), ("score", pa.int64())]
+                     + [(column, pa.int32()) for column in COUNT_COLUMNS])
+
+
+def _event_schema():
+    return pa.schema([
+        ("session", pa.string()), ("seed", pa.int64()), ("started", pa.timestamp("s")),
+        ("answered_at", pa.timestamp("s")), ("serial", pa.int32()), ("section", pa.string()),
+        ("test_type", pa.string()), ("item_id", pa.string()), ("question_id", pa.string()),
+        ("answer", pa.string()), ("correct", pa.bool_()), ("response_time", pa.float32()),
+        ("free_text", pa.bool_()), ("match", pa.string()), ("distance", pa.int16()),
+    ])
+
+
+def default_learner():
+    """Öğrenci adı verilmezse veri klasörünün adı"""
+    return os.path.basename(os.path.abspath(".")) or "ogrenci"
+
+
+def _safe_name(name):
+    """Klasör adında kullanılabilecek öğrenci adı"""
+    return re.sub(r"[^\w.-]", "_", name).strip(".") or "ogrenci"
+
+
+# -------------------- Tablolar --------------------
+
+def _period_end(period, start):
+    if period == "weekly":
+        return start + timedelta(days=6)
+    if period == "monthly":
+        next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return next_month - timedelta(days=1)
+    return start
+
+
+def _summary_key(period, start):
+    return week_key(start) if period == "weekly" else month_key(start)
+
+
+def _summaries_of(period, start):
+    """Satırın içinde yer aldığı (veya sonradan toplanacağı) özet dönemler: [(katman, anahtar), ...]"""
+    if period == "daily":
+        week = week_key(start)
+        return [("weekly", week), ("monthly", month_key(date.fromisoformat(week)))]
+    if period == "weekly":
+        return [("weekly", week_key(start)), ("monthly", month_key(start))]
+    return [("monthly", month_key(start))]
+
+
+def unexported_rows(frame, last_day, exported):
+    """Aktarılmamış satırlar: last_day'den sonraki ham günler ve özetlerin aktarılmamış farkı.
+
+    exported: {katman: {anahtar: {sütun: aktarılan toplam}}}; seçilen satırlar
+    yerinde eklenir.
+    """
+    rows = []
+    for record in frame.to_dict("records"):
+        period, start = record["period"], record["date"]
+        if period == "daily":
+            if last_day is not None and start <= last_day:
+                continue
+        else:
+            done = exported.get(period, {}).get(_summary_key(period, start), {})
+            record.update({column: record[column] - done.get(column, 0) for column in SUMMED_COLUMNS})
+            if record["days"] <= 0:  # Özetteki tüm günler aktarılmış
+                continue
+        for tier, key in _summaries_of(period, start):
+            totals = exported.setdefault(tier, {}).setdefault(key, {})
+            for column in SUMMED_COLUMNS:
+                totals[column] = totals.get(column, 0) + int(record[column])
+        rows.append(record)
+    return pd.DataFrame(rows, columns=frame.columns).astype(DAILY_DTYPES)
+
+
+def daily_frame(score_data, after=None, before=None):
+    """Puan geçmişi tipli tablo olarak: başlangıcı after'dan sonra, before'dan önce olan dönemler.
+
+    Ham günler "daily", özetlenmiş dönemler "weekly"/"monthly" satırlarıdır
+    (date: dönem başı). Cevap süresi histogramları alınmaz.
+    """
+    frame = history_frame(score_data)
+    if frame.empty:
+        return pd.DataFrame({"date": pd.Series(dtype="object"),
+                             **{column: pd.Series(dtype=dtype) for column, dtype in DAILY_DTYPES.items()}})
+    starts = frame.index.date
+    keep = [(after is None or start > after) and (before is None or start < before) for start in starts]
+    frame = frame[keep]
+    frame = frame.reindex(columns=list(DAILY_DTYPES), fill_value=0).astype(DAILY_DTYPES)
+    frame.insert(0, "date", frame.index.date)
+    return frame.reset_index(drop=True)
+
+
+def _answer_text(answer):
+    if answer is None:
+        return None
+    if isinstance(answer, list):  # Eş anlamlı sorularda işaretlenen seçenekler
+        return " | ".join(str(option) for option in answer)
+    return str(answer)
+
+
+def _optional_text(value):
+    return None if value is None else str(value)
+
+
+def session_events(path, skip=0):
+    """Oturum kaydındaki cevaplar soru bilgileriyle: (satırlar, toplam cevap sayısı).
+
+    İlk skip cevap (önceki aktarımlarda yazılanlar) atlanır.
+    """
+    header, events = read_session(path)
+    session = os.path.splitext(os.path.basename(path))[0]
+    questions = {}
+    rows = []
+    answers = 0
+    for event in events:
+        kind = event.get("event")
+        if kind == "question":
+            questions[event["serial"]] = event
+            continue
+        if kind != "answer":
+            continue
+        answers += 1
+        if answers <= skip:
+            continue
+        question = questions.get(event["serial"], {})
+        rows.append({
+            "session": session,
+            "seed": header.get("seed"),
+            "started": header.get("started"),
+            "answered_at": event.get("at"),
+            "serial": event["serial"],
+            "section": question.get("section"),
+            "test_type": question.get("type"),
+            "item_id": _optional_text(question.get("item_id")),
+            "question_id": _optional_text(question.get("question_id")),
+            "answer": _answer_text(event.get("answer")),
+            "correct": bool(event.get("correct")),
+            "response_time": event.get("response_time"),
+            "free_text": "expected" in event,
+            "match": event.get("match"),
+            "distance": event.get("distance"),
+        })
+    return rows, answers
+
+
+def event_frame(rows):
+    """Cevap olayı satırlarından tipli tablo"""
+    frame = pd.DataFrame(rows, columns=list(EVENT_DTYPES))
+    for column in ("started", "answered_at"):
+        frame[column] = pd.to_datetime(frame[column], errors="coerce")
+    return frame.astype(EVENT_DTYPES)
+
+
+# -------------------- Dosyalar --------------------
+
+def _write_table(table, path, fmt):
+    # Yarım yazılmış dosya okuyuculara görünmesin: gizli geçici dosyaya yaz, sonra taşı
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f".{name}.tmp")
+    if fmt == "parquet":
+        pa_parquet.write_table(table, temp_path)
+    else:
+        pa_feather.write_feather(table, temp_path)
+    os.replace(temp_path, path)
+
+
+def _read_file(path, fmt):
+    return pa_parquet.read_table(path) if fmt == "parquet" else pa_feather.read_table(path)
+
+
+def _compact(partition, fmt, sort_key):
+    """Bölümdeki parça sayısı COMPACT_PARTS'ı geçtiyse parçaları tek dosyada birleştir"""
+    extension = FORMATS[fmt]
+    parts = sorted(name for name in os.listdir(partition) if name.startswith("part-") and name.endswith(extension))
+    if len(parts) <= COMPACT_PARTS:
+        return None
+    table = pa.concat_tables([_read_file(os.path.join(partition, name), fmt) for name in parts])
+    table = table.sort_by([(sort_key, "ascending")])
+    path = os.path.join(partition, f"part-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}-merged{extension}")
+    _write_table(table, path, fmt)
+    for name in parts:
+        os.remove(os.path.join(partition, name))
+    return path
+
+
+def _write_part(frame, schema, directory, table_name, learner, part_name, fmt, sort_key):
+    partition = os.path.join(directory, table_name, f"learner={learner}")
+    os.makedirs(partition, exist_ok=True)
+    path = os.path.join(partition, f"part-{part_name}{FORMATS[fmt]}")
+    _write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False), path, fmt)
+    return _compact(partition, fmt, sort_key) or path
+
+
+def _load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(state, path):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def export_history(score_data, directory=ANALYTICS_DIR, learner=None, fmt="parquet", today=None,
+                   session_dir=SESSION_DIR):
+    """Yeni günleri ve yeni cevap olaylarını dışa aktar; yazılanların özetini döndür"""
+    _require_pyarrow()
+    if fmt not in FORMATS:
+        raise ValueError(f"Bilinmeyen biçim: {fmt} (parquet veya arrow)")
+    learner = _safe_name(learner or default_learner())
+    today = today or date.today()
+    os.makedirs(directory, exist_ok=True)
+    state_path = os.path.join(directory, STATE_FILE)
+    state = _load_state(state_path)
+    if state.setdefault("format", fmt) != fmt:  # Tek veri kümesinde biçimler karışmasın
+        raise ValueError(f"{directory} klasörü {state['format']} biçiminde; başka bir klasör seçin")
+    learner_state = state.setdefault("learners", {}).setdefault(learner, {"last_day": None, "sessions": {}})
+    exported = learner_state.setdefault("summaries", {})
+
+    report = {"learner": learner, "format": fmt, "daily_rows": 0, "event_rows": 0, "files": []}
+
+    last_day = learner_state["last_day"]
+    daily = unexported_rows(daily_frame(score_data, before=today),
+                            date.fromisoformat(last_day) if last_day else None, exported)
+    if len(daily):
+        first = daily["date"].iloc[0]
+        end = max(_period_end(period, start) for period, start in zip(daily["period"], daily["date"]))
+        report["files"].append(_write_part(daily, _daily_schema(), directory, "daily", learner,
+                                           f"{first.isoformat()}_{end.isoformat()}", fmt, "date"))
+        raw_days = daily["date"][daily["period"] == "daily"]
+        if len(raw_days):
+            learner_state["last_day"] = raw_days.max().isoformat()
+        report["daily_rows"] = len(daily)
+    report["last_day"] = learner_state["last_day"]
+
+    rows = []
+    sessions = learner_state["sessions"]
+    if session_dir and os.path.isdir(session_dir):
+        for name in sorted(os.listdir(session_dir)):
+            path = os.path.join(session_dir, name)
+            if not name.endswith(".jsonl"):
+                continue
+            size = os.path.getsize(path)
+            exported = sessions.get(name, {"answers": 0, "size": 0})
+            if size == exported["size"]:  # Son aktarımdan beri değişmemiş
+                continue
+            new_rows, answers = session_events(path, skip=exported["answers"])
+            rows.extend(new_rows)
+            sessions[name] = {"answers": answers, "size": size}
+    if rows:
+        part_name = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        report["files"].append(_write_part(event_frame(rows), _event_schema(), directory, "events", learner,
+                                           part_name, fmt, "started"))
+        report["event_rows"] = len(rows)
+
+    _save_state(state, state_path)
+    return report
+
+
+def load_table(directory=ANALYTICS_DIR, table="daily"):
+    """Dışa aktarılmış tabloyu (tüm öğrencilerle) DataFrame olarak oku"""
+    _require_pyarrow()
+    state = _load_state(os.path.join(directory, STATE_FILE))
+    path = os.path.join(directory, table)
+    if not os.path.isdir(path):
+        return pd.DataFrame()
+    fmt = "ipc" if state.get("format") == "arrow" else "parquet"
+    return pa_dataset.dataset(path, format=fmt, partitioning="hive").to_table().to_pandas()
@@ -0,0 +1,203 @@
+import os
+import re
+import time
+import unicodedata
+from functools import lru_cache
+
+from session_log import read_session
+
+# -------------------- Yazılı Cevap Eşleştirme --------------------
+# Boşluk doldurma ve kelime kartı sorularında cevap seçenekten seçilmek yerine
+# yazılabilir. Yazılan cevap doğru cevapla karşılaştırılmadan önce normalize
+# edilir:
+#   - Türkçe küçük harf: "I" -> "ı", "İ" -> "i" (str.lower() "İ"yi "i̇" yapar)
+#   - noktalama boşluğa çevrilir, kesme işareti silinir, boşluklar teke indirilir
+#   - fold=True ise aksanlar atılır: ı->i, ş->s, ğ->g, ç->c, ö->o, ü->u, é->e...
+#
+# Sonuç üç türlüdür:
+#   "exact": aksanlar dahil aynı (büyük/küçük harf ve noktalama farkı hariç)
+#   "close": aksansız hâlleri arasındaki düzenleme uzaklığı eşiğin içinde
+#            (uzaklık 0 ise sadece aksan farkı vardır)
+#   "wrong": eşiğin dışında
+# Eşik, cevap uzunluğunun max_ratio'su ile max_distance'ın küçüğüdür; kısa
+# cevaplarda (EXACT_LENGTH ve altı) sadece aksan farkı kabul edilir.
+#
+# Düzenleme uzaklığı Myers'ın bit-paralel algoritmasıyla (Hyyrö'nün Levenshtein
+# uyarlaması) hesaplanır: doğru cevabın her karakteri bir bit, yazılan cevabın
+# her karakteri için birkaç tamsayı işlemi yapılır (O(n), uzun cevaplarda da
+# Python'un büyük tamsayılarıyla). Doğru cevabın normalize hâli ve bit
+# maskeleri önbellekte tutulur; geçmiş cevaplar toplu eşleştirilirken aynı
+# doğru cevap tekrar tekrar hazırlanmaz.
+#
+# Yazılı cevaplar oturum kaydına doğru cevap ve eşleşme sonucuyla yazılır
+# (bkz. session_log); rematch_sessions geçmiş cevapları başka eşiklerle
+# yeniden değerlendirir (python cli.py match oturumlar/*.jsonl).
+
+DEFAULT_MAX_DISTANCE = 2   # Kabul edilen en fazla harf hatası
+DEFAULT_MAX_RATIO = 0.25   # Cevap uzunluğuna göre en fazla hata oranı
+EXACT_LENGTH = 3           # Bu uzunluğa kadar cevaplarda harf hatası kabul edilmez
+ALTERNATIVE_SEPARATORS = re.compile(r"[,;/]")  # "ödenek, tahsisat" gibi birden fazla karşılık
+
+_TURKISH_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+_TURKISH_FOLD = str.maketrans("ışğçöüâîû", "isgcouaiu")
+_APOSTROPHES = str.maketrans("", "", "'’`")
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+
+
+def normalize(text, fold=True):
+    """Karşılaştırma için Türkçe kurallarıyla küçük harfe çevrilmiş, sadeleşmiş metin"""
+    text = text.translate(_TURKISH_UPPER).lower().translate(_APOSTROPHES)
+    if fold:
+        text = text.translate(_TURKISH_FOLD)
+        if not text.isascii():  # Diğer aksanlar (é, ñ, ...)
+            text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+@lru_cache(maxsize=4096)
+def _pattern_masks(pattern):
+    """Desendeki her karakterin geçtiği konumların bit maskesi"""
+    masks = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def edit_distance(pattern, text, limit=None):
+    """pattern ile text arasındaki Levenshtein uzaklığı (bit-paralel).
+
+    limit verilirse uzaklığın limit'i aştığı anlaşıldığında limit + 1 döner.
+    """
+    m = len(pattern)
+    if m == 0 or not text:
+        return max(m, len(text))
+    if limit is not None and abs(m - len(text)) > limit:
+        return limit + 1
+
+    masks = _pattern_masks(pattern)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp, vn = mask, 0  # Dikey farklar: +1 ve -1 olan satırlar
+    score = m
+    remaining = len(text)
+    for char in text:
+        eq = masks.get(char, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | ~(xh | vp)
+        hn = vp & xh
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        hp = (hp << 1) | 1
+        hn <<= 1
+        vp = (hn | ~(xv | hp)) & mask
+        vn = hp & xv
+        remaining -= 1
+        # Kalan her karakter uzaklığı en fazla 1 azaltabilir
+        if limit is not None and score - remaining > limit:
+            return limit + 1
+    return score
+
+
+def allowed_distance(length, max_distance=DEFAULT_MAX_DISTANCE, max_ratio=DEFAULT_MAX_RATIO):
+    """length karakterlik cevapta kabul edilen harf hatası sayısı"""
+    if length <= EXACT_LENGTH:
+        return 0
+    return min(max_distance, int(length * max_ratio))
+
+
+@lru_cache(maxsize=4096)
+def _prepare_expected(expected):
+    """Doğru cevabın karşılıkları: ((karşılık, normalize, aksansız normalize), ...)"""
+    alternatives = [part.strip() for part in ALTERNATIVE_SEPARATORS.split(expected) if part.strip()] or [expected]
+    return tuple((alternative, normalize(alternative, fold=False), normalize(alternative))
+                 for alternative in alternatives)
+
+
+def match_answer(answer, expected, max_distance=DEFAULT_MAX_DISTANCE, max_ratio=DEFAULT_MAX_RATIO):
+    """Yazılan cevabı doğru cevapla karşılaştır: (sonuç, uzaklık, eşleşen karşılık).
+
+    expected virgül, noktalı virgül veya eğik çizgiyle ayrılmış birden fazla
+    karşılık içerebilir; en yakın karşılık döner. Boş cevap her zaman "wrong"dur.
+    """
+    alternatives = _prepare_expected(expected)
+    exact = normalize(answer, fold=False)
+    if not exact:
+        return "wrong", None, alternatives[0][0]
+    for alternative, alternative_exact, _ in alternatives:
+        if alternative_exact == exact:
+            return "exact", 0, alternative
+
+    folded = normalize(answer)
+    best = None
+    for alternative, _, target in alternatives:
+        limit = allowed_distance(len(target), max_distance, max_ratio)
+        distance = edit_distance(target, folded, limit)
+        if distance <= limit and (best is None or distance < best[1]):
+            best = ("close", distance, alternative)
+    return best or ("wrong", None, alternatives[0][0])
+
+
+def match_many(pairs, max_distance=DEFAULT_MAX_DISTANCE, max_ratio=DEFAULT_MAX_RATIO):
+    """(cevap, doğru cevap) çiftlerini toplu eşleştir: sonuçların listesi"""
+    return [match_answer(answer, expected, max_distance, max_ratio) for answer, expected in pairs]
+
+
+# -------------------- Ayarlar --------------------
+
+# Yazılı cevap verilebilen (bölüm, soru türü) çiftleri
+FREE_TEXT_TYPES = {("paragraph", "fill_blank"), ("sentence", "fill_blank"), ("word", "en_to_tr"), ("word", "tr_to_en")}
+
+
+def accepts_free_text(section, test_type):
+    return (section, test_type) in FREE_TEXT_TYPES
+
+
+def match_settings(score_data):
+    """Puan verisindeki eşik ayarları (match_answer'ın anahtar kelime argümanları)"""
+    return {
+        "max_distance": score_data.get("free_text_max_distance", DEFAULT_MAX_DISTANCE),
+        "max_ratio": score_data.get("free_text_max_ratio", DEFAULT_MAX_RATIO),
+    }
+
+
+# -------------------- Geçmiş Cevaplar --------------------
+
+def rematch_sessions(paths, max_distance=DEFAULT_MAX_DISTANCE, max_ratio=DEFAULT_MAX_RATIO, limit=50):
+    """Oturum kayıtlarındaki yazılı cevapları verilen eşiklerle yeniden eşleştir.
+
+    Eşik ayarlarını denemek için: kayıttaki sonuçla yeni sonucun farklı
+    olduğu cevaplar (ilk limit tanesi) rapora yazılır.
+    """
+    counts = {"sessions": 0, "answers": 0, "exact": 0, "close": 0, "wrong": 0,
+              "newly_accepted": 0, "newly_rejected": 0}
+    changed = []
+    elapsed = 0.0
+    for path in paths:
+        _, events = read_session(path)
+        counts["sessions"] += 1
+        for event in events:
+            if event.get("event") != "answer" or "expected" not in event or not isinstance(event["answer"], str):
+                continue
+            started = time.perf_counter()
+            verdict, distance, _ = match_answer(event["answer"], event["expected"], max_distance, max_ratio)
+            elapsed += time.perf_counter() - started
+            counts["answers"] += 1
+            counts[verdict] += 1
+            accepted = verdict != "wrong"
+            if accepted == event["correct"]:
+                continue
+            counts["newly_accepted" if accepted else "newly_rejected"] += 1
+            if len(changed) < limit:
+                changed.append({"file": os.path.basename(path), "serial": event.get("serial"),
+                                "answer": event["answer"], "expected": event["expected"],
+                                "recorded": event.get("match"), "verdict": verdict, "distance": distance})
+    return {
+        "max_distance": max_distance,
+        "max_ratio": max_ratio,
+        **counts,
+        "changed": changed,
+        "mean_us": round(elapsed / counts["answers"] * 1e6, 2) if counts["answers"] else None,
+    }
@@ -0,0 +1,467 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import time
+from collections import OrderedDict
+from datetime import date
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from data_files import ensure_today, load_data, track_data_files
+from distractors import get_distractor_index
+from paragraph_schema import ParagraphBank
+from paragraph_store import get_text
+from questions import QuestionState, find_question
+from quiz import generate_synonym_question, pick_paragraph_question
+from ratings import get_rating_model, rating_key
+from response_times import response_key
+from score_history import history_totals
+from sentence_engine import generate_sentence_questions
+from session_log import SessionRecorder, data_counts, new_seed
+from answer_match import accepts_free_text, match_answer, match_settings
+from store import get_store
+from word_quiz import WORD_QUESTION_TYPES, generate_word_question, record_word_miss
+
+# -------------------- Yerel JSON HTTP API --------------------
+# Streamlit arayüzü olmadan (mobil istemci, betik) soru çözmek için asyncio
+# tabanlı küçük bir HTTP sunucusu. Arayüzle aynı veri dosyalarını, aynı
+# depoyu (store) ve aynı soru seçim mantığını (quiz, sentence_engine)
+# kullanır; istek başına betik yeniden çalışmadığı için tek çekirdekte
+# saniyede binlerce istek karşılanır.
+#
+#   GET  /questions/paragraph?type=en_to_tr[&paragraph_id=3]
+#   GET  /questions/sentence?type=fill_blank
+#   GET  /questions/synonym
+#   GET  /questions/word?type=en_to_tr|tr_to_en
+#   POST /answers      {"token": "...", "answer": "..." | ["...", ...], "free_text": false}
+#                      (free_text: boşluk doldurma ve kelime kartında yazılan cevap, bkz. answer_match)
+#   GET  /stats
+#
+# Cevaplar bellekte hemen işlenir, dosyalara FLUSH_INTERVAL aralıklarla
+# (diğer süreçlerin değişiklikleriyle birleştirilerek) yazılır.
+#
+# Çalıştırma: python api_server.py --port 8765 [--seed 42] [--record]
+# --record ile sorular ve cevaplar oturum kaydına yazılır (bkz. session_log).
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+REFRESH_INTERVAL = 0.5   # Diğer süreçlerin değişikliklerini kontrol aralığı (sn)
+FLUSH_INTERVAL = 1.0     # Bekleyen değişiklikleri diske yazma aralığı (sn)
+MAX_PENDING = 10000      # Cevap bekleyen en fazla soru (eskiler düşer)
+MAX_BODY = 64 * 1024     # En büyük istek gövdesi (bayt)
+
+QUESTION_TYPES = ("en_to_tr", "tr_to_en", "fill_blank")
+POINTS = {"paragraph": 1, "sentence": 1, "synonym": 2, "word": 1}
+COUNTER_KEYS = {"sentence": "sentence_test_answered", "synonym": "synonym_test_answered",
+                "word": "word_test_answered"}
+
+
+class ApiError(Exception):
+    """İstemciye JSON hata mesajıyla dönen hata"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _question_type(params):
+    test_type = params.get("type", "en_to_tr")
+    if test_type not in QUESTION_TYPES:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Geçersiz soru türü: {test_type}")
+    return test_type
+
+
+class QuizService:
+    """Soru dağıtma ve cevap işleme (HTTP katmanından bağımsız)"""
+
+    def __init__(self, store, rng=None, recorder=None, ratings=None):
+        self.store = store
+        self.rng = rng or random.Random()
+        self.recorder = recorder       # Oturum kaydı (bkz. session_log)
+        self.ratings = ratings         # Verilmezse süreç genelindeki derece modeli
+        self.pending = OrderedDict()   # token -> QuestionState
+        self.bank = None
+        self.dirty = set()             # Diske yazılmamış koleksiyonlar
+        self._last_refresh = 0.0
+
+    # -------------------- Veri --------------------
+
+    def prepare(self):
+        """İlk yüklemeyi yap, aralıklarla diğer süreçlerin değişikliklerini al"""
+        store = self.store
+        if not store.loaded:
+            if load_data(store):
+                self.dirty.update(("paragraflar", "score_data", "synonyms"))
+            self.bank = None
+
+        now = time.monotonic()
+        if now - self._last_refresh >= REFRESH_INTERVAL:
+            self._last_refresh = now
+            # Kendi değişikliklerimiz üzerine yazılmasın diye önce kaydet
+            self.flush()
+            if "paragraflar" in store.refresh():
+                self.bank = None
+
+        if self.bank is None:
+            with store.read():
+                self.bank = ParagraphBank(store.paragraflar)
+
+    def flush(self):
+        """Bekleyen değişiklikleri dosyalara yaz"""
+        while self.dirty:
+            self.store.save_file(self.dirty.pop())
+
+    def _register(self, state, payload):
+        token = str(state.serial)
+        state.mark_shown()  # Cevap süresi istemciye gönderimden itibaren ölçülür
+        self.pending[token] = state
+        while len(self.pending) > MAX_PENDING:
+            self.pending.popitem(last=False)
+        if self.recorder is not None:
+            self.recorder.question(state)
+        payload.update({
+            "token": token,
+            "section": state.section,
+            "type": state.test_type,
+            "options": list(state.options),
+        })
+        return payload
+
+    def add_pending(self, state):
+        """Hazır soru durumunu cevap bekleyenlere ekle, token'ını döndür"""
+        return self._register(state, {})["token"]
+
+    # -------------------- Sorular --------------------
+
+    def next_paragraph_question(self, params):
+        test_type = _question_type(params)
+        bank = self.bank
+        if "paragraph_id" in params:
+            try:
+                paragraph_id = int(params["paragraph_id"])
+            except ValueError:
+                raise ApiError(HTTPStatus.BAD_REQUEST, "paragraph_id sayı olmalı")
+            if paragraph_id not in bank.by_id:
+                raise ApiError(HTTPStatus.NOT_FOUND, "Paragraf bulunamadı")
+        else:
+            candidate_ids = bank.paragraph_ids(test_type)
+            if not candidate_ids:
+                raise ApiError(HTTPStatus.NOT_FOUND, "Hiçbir paragrafta bu türde soru bulunamadı!")
+            paragraph_id = self.rng.choice(candidate_ids)
+
+        paragraf = bank.by_id[paragraph_id]
+        used_before = list(paragraf.get("used_questions", []))
+        result = pick_paragraph_question(self.store, bank, paragraf, test_type, rng=self.rng)
+        if paragraf.get("used_questions", []) != used_before:
+            self.dirty.add("paragraflar")  # Tüm sorular kullanıldığı için kayıtlar sıfırlandı
+        if result is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, "Bu paragrafta bu türde soru yok")
+        question, question_text, _, options, question_key = result
+
+        state = QuestionState("paragraph", test_type, options, item_id=paragraph_id,
+                              question_id=question.get("id"), question_key=question_key)
+        return self._register(state, {
+            "question": question_text,
+            "paragraph": {"id": paragraph_id, "title": paragraf.get("title", ""),
+                          "text": get_text(paragraf, "paragraph")},
+        })
+
+    def _distractors(self):
+        return get_distractor_index(self.store.words, self.store.version("words"))
+
+    def next_sentence_question(self, params):
+        test_type = _question_type(params)
+        words = self.store.words
+        questions = generate_sentence_questions(words, test_type, 1, rng=self.rng,
+                                                distractors=self._distractors(), with_words=True)
+        if not questions:
+            raise ApiError(HTTPStatus.NOT_FOUND, "Cümle testi için yeterli kelime yok")
+        question_text, correct_answer, options, word = questions[0]
+        state = QuestionState("sentence", test_type, options, item_id=word,
+                              question_text=question_text, correct_answer=correct_answer)
+        return self._register(state, {"question": question_text})
+
+    def next_word_question(self, params):
+        test_type = params.get("type", "en_to_tr")
+        if test_type not in WORD_QUESTION_TYPES:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Geçersiz soru türü: {test_type}")
+        result = generate_word_question(self._distractors(), test_type, self.rng)
+        if result is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, "Kelime kartı için yeterli kelime yok")
+        question_text, correct_answer, options, word = result
+        state = QuestionState("word", test_type, options, item_id=word,
+                              question_text=question_text, correct_answer=correct_answer)
+        return self._register(state, {"question": question_text})
+
+    def next_synonym_question(self, params):
+        question, question_text, _, options, _ = generate_synonym_question(self.store.synonyms, self.rng)
+        if question is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, "Eş anlamlı soru bulunamadı")
+        state = QuestionState("synonym", question.get("type", "synonym"), options, item_id=question.get("id"))
+        return self._register(state, {"question": question_text, "multiple": True})
+
+    # -------------------- Cevaplar --------------------
+
+    def submit_answer(self, body):
+        token = str(body.get("token", ""))
+        state = self.pending.get(token)
+        if state is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, "Soru bulunamadı veya süresi doldu")
+        answer = body.get("answer")
+        free_text = bool(body.get("free_text"))
+        if free_text and not (accepts_free_text(state.section, state.test_type) and isinstance(answer, str)):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Bu soruya yazılı cevap verilemez")
+        # Cevap biçimi puanlamadan önce denetlenir; hatalı istekte soru bekleyen kalır
+        multiple = state.section == "synonym" and isinstance(answer, list)
+        if not (isinstance(answer, str) or multiple and all(isinstance(option, str) for option in answer)):
+            raise ApiError(HTTPStatus.BAD_REQUEST,
+                           "answer metin olmalı" + (" (veya metin listesi)" if state.section == "synonym" else ""))
+
+        store = self.store
+        match = None
+        today = date.today()
+        result = {}
+        with store.write():
+            if state.section == "paragraph":
+                paragraf = self.bank.by_id.get(state.item_id)
+                question = find_question(paragraf, state.question_id) if paragraf else None
+                if question is None:
+                    del self.pending[token]
+                    raise ApiError(HTTPStatus.GONE, "Soru bu arada silinmiş")
+                if free_text:
+                    match = self._match(answer, question["correct_answer"])
+                    is_correct = match[0] != "wrong"
+                else:
+                    is_correct = answer == question["correct_answer"]
+                if store.mark_question_used(paragraf, state.question_key):
+                    self.dirty.add("paragraflar")
+                result["correct_answer"] = question["correct_answer"]
+                counter_key = f"{state.test_type}_answered"
+            elif state.section in ("sentence", "word"):
+                if free_text:
+                    match = self._match(answer, state.correct_answer)
+                    is_correct = match[0] != "wrong"
+                else:
+                    is_correct = answer == state.correct_answer
+                result["correct_answer"] = state.correct_answer
+                counter_key = COUNTER_KEYS[state.section]
+                if state.section == "word" and not is_correct:
+                    record_word_miss(store.words, state.item_id)
+                    self.dirty.add("words")
+            else:
+                question = next((q for q in store.synonyms if q.get("id") == state.item_id), None)
+                if question is None:
+                    del self.pending[token]
+                    raise ApiError(HTTPStatus.GONE, "Soru bu arada silinmiş")
+                selected = answer if isinstance(answer, list) else [answer]
+                is_correct = set(question["correct_answers"]) == set(selected)
+                result["correct_answers"] = question["correct_answers"]
+                result["solution"] = question.get("solution", "")
+                counter_key = COUNTER_KEYS["synonym"]
+
+            ensure_today(store.score_data, today)
+            store.record_answer(today.strftime("%Y-%m-%d"), counter_key, is_correct, POINTS[state.section],
+                                (response_key(state.section, state.test_type), state.response_time()))
+            result["correct"] = is_correct
+            result["total_score"] = store.score_data["total_score"]
+            if match is not None:
+                result["match"], result["distance"] = match[0], match[1]
+        del self.pending[token]  # Cevap puanlandı
+        state.mark_answered(answer, is_correct, match)
+        self.dirty.add("score_data")
+        if self.recorder is not None:
+            self.recorder.answer(state.serial, answer, is_correct, state.response_time(), match)
+
+        key = rating_key(state)
+        if key is not None:
+            ratings = self.ratings or get_rating_model()
+            result["success_probability"] = round(ratings.record(key, is_correct), 3)
+        return result
+
+    def _match(self, answer, expected):
+        """Yazılı cevabın eşleşmesi: (sonuç, uzaklık, doğru cevap)"""
+        verdict, distance, _ = match_answer(answer, expected, **match_settings(self.store.score_data))
+        return verdict, distance, expected
+
+    # -------------------- İstatistik --------------------
+
+    def stats(self, params):
+        store = self.store
+        with store.read():
+            score_data = store.score_data
+            today_str = date.today().strftime("%Y-%m-%d")
+            return {
+                "total_score": score_data.get("total_score", 0),
+                "today": score_data.get("daily", {}).get(today_str, {}),
+                "questions_answered_today": score_data.get("questions_answered_today", 0),
+                "correct_streak": score_data.get("correct_streak", 0),
+                "wrong_streak": score_data.get("wrong_streak", 0),
+                "history": history_totals(score_data),
+                "paragraphs": len(store.paragraflar),
+                "words": len(store.words),
+                "synonyms": len(store.synonyms),
+            }
+
+
+# -------------------- HTTP Katmanı --------------------
+
+class ApiServer:
+    """asyncio üzerinde keep-alive destekli minimal HTTP/1.1 sunucusu"""
+
+    def __init__(self, service):
+        self.service = service
+        self.routes = {
+            ("GET", "/questions/paragraph"): service.next_paragraph_question,
+            ("GET", "/questions/sentence"): service.next_sentence_question,
+            ("GET", "/questions/synonym"): service.next_synonym_question,
+            ("GET", "/questions/word"): service.next_word_question,
+            ("POST", "/answers"): service.submit_answer,
+            ("GET", "/stats"): service.stats,
+        }
+
+    def dispatch(self, method, target, body):
+        """İsteği işle: (durum, JSON yükü) döner"""
+        url = urlsplit(target)
+        handler = self.routes.get((method, url.path))
+        if handler is None:
+            if any(path == url.path for _, path in self.routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Desteklenmeyen metod"}
+            return HTTPStatus.NOT_FOUND, {"error": "Bulunamadı"}
+        try:
+            self.service.prepare()
+            if method == "POST":
+                try:
+                    argument = json.loads(body or b"{}")
+                except ValueError:
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "Geçersiz JSON")
+                if not isinstance(argument, dict):
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "JSON nesnesi bekleniyor")
+            else:
+                argument = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            return HTTPStatus.OK, handler(argument)
+        except ApiError as e:
+            return e.status, {"error": e.message}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.LimitOverrunError:
+                    self._write(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {"error": "Başlık çok büyük"}, False)
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    self._write(writer, HTTPStatus.BAD_REQUEST, {"error": "Geçersiz istek"}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self._write(writer, HTTPStatus.BAD_REQUEST, {"error": "Geçersiz Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    self._write(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Gövde çok büyük"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                status, payload = self.dispatch(method, target, body)
+                self._write(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write(writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+        )
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, service=None):
+    """Sunucuyu başlat; iptal edilene kadar çalışır"""
+    if service is None:
+        store = get_store()
+        track_data_files(store)
+        service = QuizService(store)
+    api = ApiServer(service)
+    server = await asyncio.start_server(api.handle, host, port)
+
+    async def flush_periodically():
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            service.flush()
+
+    # SIGINT/SIGTERM: sunucuyu durdur, bekleyen değişiklikleri yaz
+    loop = asyncio.get_running_loop()
+    serving = asyncio.current_task()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, serving.cancel)
+        except (NotImplementedError, RuntimeError):  # Windows
+            pass
+
+    flusher = asyncio.create_task(flush_periodically())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        service.flush()
+        if service.recorder is not None:
+            service.recorder.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="YDS soru API'si (yerel JSON HTTP sunucusu)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", default=".", help="Veri dosyalarının bulunduğu klasör")
+    parser.add_argument("--seed", type=int, help="Soru seçimi için tohum (verilmezse rastgele)")
+    parser.add_argument("--record", action="store_true", help="Oturumu kaydet (oturumlar/ klasörüne)")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.data_dir)
+    seed = new_seed() if args.seed is None else args.seed
+    store = get_store()
+    track_data_files(store)
+    service = QuizService(store, rng=random.Random(seed))
+    if args.record:
+        service.prepare()
+        with store.read():
+            counts = data_counts(store)
+        service.recorder = SessionRecorder.in_directory(seed, counts)
+        print(f"Oturum kaydı: {service.recorder.path}")
+    print(f"API http://{args.host}:{args.port} adresinde çalışıyor (tohum {seed}, durdurmak için Ctrl+C)")
+    try:
+        asyncio.run(serve(args.host, args.port, service))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,27 +3,73 @@ import json
 import os
 import random
 import shutil
-import zipfile
 from datetime import datetime
 import pandas as pd
 
-# -------------------- Dosya Yolları --------------------
-DATA_FILE = "paragraflar.json"
-SCORE_FILE = "puan_paragraf.json"
-BACKUP_DATA_FILE = "paragraflar_backup.json"
-BACKUP_SCORE_FILE = "puan_paragraf_backup.json"
-WORDS_FILE = "kelimeler.json"
-SYNONYM_FILE = "es_anlamli.json"  # Eş anlamlı kelimeler
+import data_files
+from analytics_export import ANALYTICS_DIR, export_history
+from answer_match import accepts_free_text, allowed_distance, match_answer, match_settings
+from data_files import (BACKUP_DATA_FILE, BACKUP_SCORE_FILE, DATA_FILE, SCORE_FILE, SYNONYM_FILE, WORDS_FILE,
+                        default_score_data, ensure_today, import_paragraphs, import_scores, import_synonyms,
+                        import_words, track_data_files)
+from dedup import get_duplicate_index, paragraph_text, synonym_text
+from distractors import get_distractor_index
+from exam import (DEFAULT_BLUEPRINT, EXAM_DURATION_MINUTES, EXAM_PAGE_SIZE, SECTION_POINTS, blueprint_size,
+                  build_exam)
+from migrations import SCHEMA_VERSION, migrate
+from paragraph_ingest import ingest_paragraphs
+from paragraph_store import detach_texts, get_text, with_texts
+from questions import QuestionState, assign_item_ids, find_question
+from quiz import (generate_synonym_question, pick_adaptive_paragraph_question, pick_adaptive_synonym_questions,
+                  pick_adaptive_words, pick_paragraph_question)
+from ratings import DEFAULT_TARGET_SUCCESS, get_rating_model, rating_key
+from response_times import response_key, response_time_stats
+from score_history import (DEFAULT_RAW_DAYS, MIN_RAW_DAYS, chart_series, compact_history, history_frame,
+                           history_totals, history_version)
+from sentence_engine import generate_sentence_questions, word_text
+from session_log import SessionRecorder, data_counts, new_seed
+from store import get_store
+from validation import summarize, synonym_errors, validate_collections
+from word_quiz import generate_word_questions, record_word_miss, word_rating_type
 
 # -------------------- Varsayılan Kelimeler --------------------
+# Kelime türü (pos) verilmezse Türkçe karşılıktan tahmin edilir (-mek/-mak -> fiil)
 DEFAULT_WORDS = [
-    "communication", "technology", "environment", "education", "health",
-    "development", "research", "society", "economy", "culture",
-    "innovation", "sustainable", "effective", "significant", "essential",
-    "analyze", "improve", "create", "discover", "implement",
-    "challenge", "opportunity", "solution", "benefit", "impact",
-    "global", "modern", "traditional", "digital", "natural",
-    "popular", "successful", "important", "necessary", "possible"
+    {"en": "communication", "tr": "iletişim", "wrong_count": 0},
+    {"en": "technology", "tr": "teknoloji", "wrong_count": 0},
+    {"en": "environment", "tr": "çevre", "wrong_count": 0},
+    {"en": "education", "tr": "eğitim", "wrong_count": 0},
+    {"en": "health", "tr": "sağlık", "wrong_count": 0},
+    {"en": "development", "tr": "gelişme", "wrong_count": 0},
+    {"en": "research", "tr": "araştırma", "wrong_count": 0},
+    {"en": "society", "tr": "toplum", "wrong_count": 0},
+    {"en": "economy", "tr": "ekonomi", "wrong_count": 0},
+    {"en": "culture", "tr": "kültür", "wrong_count": 0},
+    {"en": "innovation", "tr": "yenilik", "wrong_count": 0},
+    {"en": "sustainable", "tr": "sürdürülebilir", "pos": "adj", "wrong_count": 0},
+    {"en": "effective", "tr": "etkili", "pos": "adj", "wrong_count": 0},
+    {"en": "significant", "tr": "önemli", "pos": "adj", "wrong_count": 0},
+    {"en": "essential", "tr": "gerekli", "pos": "adj", "wrong_count": 0},
+    {"en": "analyze", "tr": "analiz etmek", "wrong_count": 0},
+    {"en": "improve", "tr": "geliştirmek", "wrong_count": 0},
+    {"en": "create", "tr": "yaratmak", "wrong_count": 0},
+    {"en": "discover", "tr": "keşfetmek", "wrong_count": 0},
+    {"en": "implement", "tr": "uygulamak", "wrong_count": 0},
+    {"en": "challenge", "tr": "zorluk", "wrong_count": 0},
+    {"en": "opportunity", "tr": "fırsat", "wrong_count": 0},
+    {"en": "solution", "tr": "çözüm", "wrong_count": 0},
+    {"en": "benefit", "tr": "fayda", "wrong_count": 0},
+    {"en": "impact", "tr": "etki", "wrong_count": 0},
+    {"en": "global", "tr": "küresel", "pos": "adj", "wrong_count": 0},
+    {"en": "modern", "tr": "modern", "pos": "adj", "wrong_count": 0},
+    {"en": "traditional", "tr": "geleneksel", "pos": "adj", "wrong_count": 0},
+    {"en": "digital", "tr": "dijital", "pos": "adj", "wrong_count": 0},
+    {"en": "natural", "tr": "doğal", "pos": "adj", "wrong_count": 0},
+    {"en": "popular", "tr": "popüler", "pos": "adj", "wrong_count": 0},
+    {"en": "successful", "tr": "başarılı", "pos": "adj", "wrong_count": 0},
+    {"en": "important", "tr": "önemli", "pos": "adj", "wrong_count": 0},
+    {"en": "necessary", "tr": "gerekli", "pos": "adj", "wrong_count": 0},
+    {"en": "possible", "tr": "mümkün", "pos": "adj", "wrong_count": 0}
 ]
 
 # -------------------- Varsayılan Eş Anlamlı Kelimeler --------------------
@@ -76,14 +122,12 @@ DEFAULT_SYNONYMS = [
 def load_synonyms():
     """Eş anlamlı kelimeler dosyasını yükle"""
     try:
-        if os.path.exists(SYNONYM_FILE):
-            with open(SYNONYM_FILE, "r", encoding="utf-8") as f:
-                synonyms = json.load(f)
-                return synonyms if isinstance(synonyms, list) and synonyms else DEFAULT_SYNONYMS
+        synonyms = store.load_file("synonyms")
+        if synonyms is not None:
+            return synonyms if isinstance(synonyms, list) and synonyms else DEFAULT_SYNONYMS
         else:
             # Varsayılan eş anlamlı kelimeleri kaydet
-            with open(SYNONYM_FILE, "w", encoding="utf-8") as f:
-                json.dump(DEFAULT_SYNONYMS, f, ensure_ascii=False, indent=2)
+            store.save_file("synonyms", DEFAULT_SYNONYMS)
             return DEFAULT_SYNONYMS
     except Exception as e:
         st.error(f"Eş anlamlı kelimeler yüklenirken hata: {e}")
@@ -93,8 +137,7 @@ def load_synonyms():
 def save_synonyms(synonyms):
     """Eş anlamlı kelimeleri kaydet"""
     try:
-        with open(SYNONYM_FILE, "w", encoding="utf-8") as f:
-            json.dump(synonyms, f, ensure_ascii=False, indent=2)
+        store.save_file("synonyms", synonyms)
         return True
     except Exception as e:
         st.error(f"Eş anlamlı kelimeler kaydedilirken hata: {e}")
@@ -104,14 +147,12 @@ def save_synonyms(synonyms):
 def load_words():
     """Kelimeler dosyasını yükle"""
     try:
-        if os.path.exists(WORDS_FILE):
-            with open(WORDS_FILE, "r", encoding="utf-8") as f:
-                words = json.load(f)
-                return words if isinstance(words, list) and words else DEFAULT_WORDS
+        words = store.load_file("words")
+        if words is not None:
+            return words if isinstance(words, list) and words else DEFAULT_WORDS
         else:
             # Varsayılan kelimeleri kaydet
-            with open(WORDS_FILE, "w", encoding="utf-8") as f:
-                json.dump(DEFAULT_WORDS, f, ensure_ascii=False, indent=2)
+            store.save_file("words", DEFAULT_WORDS)
             return DEFAULT_WORDS
     except Exception as e:
         st.error(f"Kelimeler yüklenirken hata: {e}")
@@ -121,109 +162,48 @@ def load_words():
 def save_words(words):
     """Kelimeleri kaydet"""
     try:
-        with open(WORDS_FILE, "w", encoding="utf-8") as f:
-            json.dump(words, f, ensure_ascii=False, indent=2)
+        store.save_file("words", words)
         return True
     except Exception as e:
         st.error(f"Kelimeler kaydedilirken hata: {e}")
         return False
 
 
-def generate_sentence_question(words, question_type):
-    """Kelimelerden cümle soruları üret"""
-    if not words or len(words) < 3:
-        return None, None, None, None
+def distractor_index():
+    """Kelime listesinin güncel sürümüne eşitlenmiş çeldirici index'i"""
+    return get_distractor_index(words, store.version("words"))
 
-    # Rastgele 2-3 kelime seç
-    selected_words = random.sample(words, min(random.randint(2, 3), len(words)))
-
-    # Basit cümle şablonları
-    sentence_templates = {
-        "en_to_tr": [
-            f"Modern {selected_words[0]} helps people communicate better.",
-            f"The {selected_words[0]} of {selected_words[1] if len(selected_words) > 1 else 'society'} is very important.",
-            f"We need to {selected_words[0]} our {selected_words[1] if len(selected_words) > 1 else 'skills'}.",
-            f"This {selected_words[0]} creates new opportunities.",
-            f"Effective {selected_words[0]} requires good planning."
-        ],
-        "tr_to_en": [
-            f"Modern {selected_words[0]} insanların daha iyi iletişim kurmasına yardımcı olur.",
-            f"{selected_words[1] if len(selected_words) > 1 else 'Toplumun'} {selected_words[0]}'si çok önemlidir.",
-            f"{selected_words[1] if len(selected_words) > 1 else 'Becerilerimizi'} {selected_words[0]} etmemiz gerekiyor.",
-            f"Bu {selected_words[0]} yeni fırsatlar yaratır.",
-            f"Etkili {selected_words[0]} iyi planlama gerektirir."
-        ],
-        "fill_blank": [
-            f"Modern _____ helps people communicate better.",
-            f"The importance of _____ is very significant.",
-            f"We need to _____ our knowledge and skills.",
-            f"This new _____ creates many opportunities.",
-            f"Effective communication requires good _____."
-        ]
-    }
 
+def generate_sentence_question(words, question_type):
+    """Kelimelerden cümle sorusu üret: (kelime, soru, doğru_cevap, seçenekler)"""
     try:
-        if question_type == "en_to_tr":
-            question = random.choice(sentence_templates["en_to_tr"])
-            correct_answer = question  # Türkçe çeviri olacak (basitleştirilmiş)
-
-            # Genel çeviri şablonu
-            if "helps people communicate better" in question:
-                word = question.split()[1]  # Modern'dan sonraki kelime
-                correct_answer = f"Modern {word} insanların daha iyi iletişim kurmasına yardımcı olur."
-
-            options = [
-                correct_answer,
-                f"Eski {selected_words[0]} insanları ayırır.",
-                f"Basit {selected_words[0]} kimseye yardım etmez.",
-                f"Karmaşık {selected_words[0]} sorun yaratır."
-            ]
-
-        elif question_type == "tr_to_en":
-            question = f"Modern {selected_words[0]} insanların daha iyi iletişim kurmasına yardımcı olur."
-            correct_answer = f"Modern {selected_words[0]} helps people communicate better."
-            options = [
-                correct_answer,
-                f"Old {selected_words[0]} separates people.",
-                f"Simple {selected_words[0]} helps nobody.",
-                f"Complex {selected_words[0]} creates problems."
-            ]
-
-        elif question_type == "fill_blank":
-            templates = [
-                ("Modern _____ helps people communicate better.", selected_words[0]),
-                ("The importance of _____ is very significant.", selected_words[0]),
-                ("We need to _____ our knowledge and skills.", "improve"),
-                ("This new _____ creates many opportunities.", selected_words[0]),
-                ("Effective communication requires good _____.", "planning")
-            ]
-
-            template, answer = random.choice(templates)
-            question = template
-            correct_answer = answer
-
-            # Yanlış seçenekler üret
-            wrong_options = [w for w in selected_words if w != answer]
-            if len(wrong_options) < 3:
-                wrong_options.extend(["solution", "method", "system", "process", "result"])
-
-            options = [correct_answer] + random.sample(wrong_options, 3)
-
-        random.shuffle(options)
-        return question, question, correct_answer, options
-
+        generated = generate_sentence_questions(words, question_type, 1, rng=session_rng,
+                                                distractors=distractor_index(), with_words=True)
     except Exception as e:
         st.error(f"Cümle sorusu üretirken hata: {e}")
+        generated = []
+
+    if not generated:
         return None, None, None, None
 
+    question, correct_answer, options, word = generated[0]
+    return word, question, correct_answer, options
+
+
+# Arayüzün kaydettiği koleksiyonlar: (dosya, backup dosyası)
+SAVED_FILES = {
+    "paragraflar": (DATA_FILE, BACKUP_DATA_FILE),
+    "score_data": (SCORE_FILE, BACKUP_SCORE_FILE),
+}
 
-def create_backup():
-    """Veri dosyalarının backup'ını oluştur"""
+
+def create_backup(collections=tuple(SAVED_FILES)):
+    """Verilen koleksiyonların dosyalarının backup'ını oluştur"""
     try:
-        if os.path.exists(DATA_FILE):
-            shutil.copy2(DATA_FILE, BACKUP_DATA_FILE)
-        if os.path.exists(SCORE_FILE):
-            shutil.copy2(SCORE_FILE, BACKUP_SCORE_FILE)
+        for name in collections:
+            path, backup_path = SAVED_FILES[name]
+            if os.path.exists(path):
+                shutil.copy2(path, backup_path)
         return True
     except Exception as e:
         st.error(f"Backup oluşturulamadı: {e}")
@@ -233,36 +213,7 @@ def create_backup():
 def create_zip_backup():
     """ZIP formatında tam backup oluştur"""
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        zip_filename = f"yds_backup_{timestamp}.zip"
-        
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Ana dosyaları ekle
-            if os.path.exists(DATA_FILE):
-                zipf.write(DATA_FILE)
-            if os.path.exists(SCORE_FILE):
-                zipf.write(SCORE_FILE)
-            if os.path.exists(WORDS_FILE):
-                zipf.write(WORDS_FILE)
-            if os.path.exists(SYNONYM_FILE):
-                zipf.write(SYNONYM_FILE)
-                
-            # Backup dosyalarını da ekle
-            if os.path.exists(BACKUP_DATA_FILE):
-                zipf.write(BACKUP_DATA_FILE)
-            if os.path.exists(BACKUP_SCORE_FILE):
-                zipf.write(BACKUP_SCORE_FILE)
-                
-            # Meta bilgi dosyası
-            meta_info = {
-                "backup_date": timestamp,
-                "version": "3.0",
-                "files": ["paragraflar.json", "puan_paragraf.json", "kelimeler.json", "es_anlamli.json"]
-            }
-            
-            zipf.writestr("backup_info.json", json.dumps(meta_info, ensure_ascii=False, indent=2))
-            
-        return zip_filename
+        return data_files.create_zip_backup()
     except Exception as e:
         st.error(f"ZIP backup oluşturulamadı: {e}")
         return None
@@ -271,8 +222,7 @@ def create_zip_backup():
 def restore_from_zip(zip_file):
     """ZIP dosyasından veri geri yükle"""
     try:
-        with zipfile.ZipFile(zip_file, 'r') as zipf:
-            zipf.extractall(".")
+        data_files.restore_from_zip(zip_file, store)  # Sonraki çalıştırmada dosyalardan yeniden yüklenir
         return True
     except Exception as e:
         st.error(f"ZIP'ten geri yükleme başarısız: {e}")
@@ -286,24 +236,30 @@ def restore_from_backup():
             shutil.copy2(BACKUP_DATA_FILE, DATA_FILE)
         if os.path.exists(BACKUP_SCORE_FILE):
             shutil.copy2(BACKUP_SCORE_FILE, SCORE_FILE)
+        store.invalidate()  # Sonraki çalıştırmada dosyalardan yeniden yüklensin
         return True
     except Exception as e:
         st.error(f"Backup'tan geri yükleme başarısız: {e}")
         return False
 
 
-def safe_save_data():
-    """Verileri güvenli bir şekilde kaydet"""
+def safe_save_data(collections=tuple(SAVED_FILES)):
+    """Verileri güvenli bir şekilde kaydet.
+
+    collections: değişen koleksiyonlar (cevaplarda genellikle sadece score_data);
+    verilmezse paragraflar ve puanlar birlikte kaydedilir.
+    """
+    data = {"paragraflar": paragraflar, "score_data": score_data}
     try:
-        # Önce backup oluştur
-        create_backup()
-
-        if paragraflar is not None:
-            with open(DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump(paragraflar, f, ensure_ascii=False, indent=2)
-        if score_data is not None:
-            with open(SCORE_FILE, "w", encoding="utf-8") as f:
-                json.dump(score_data, f, ensure_ascii=False, indent=2)
+        # Kayıtlar yazma kilidi altında sırayla yapılır (eşzamanlı oturumlar)
+        with store.write():
+            # Önce backup oluştur
+            create_backup(collections)
+
+            # Başka süreçlerin değişiklikleri birleştirilerek yazılır (bkz. file_sync)
+            for name in collections:
+                if data[name] is not None:
+                    store.save_file(name, data[name])
         return True
     except Exception as e:
         st.error(f"Veri kaydedilirken hata: {e}")
@@ -369,7 +325,8 @@ def initialize_default_data():
                 "tr_to_en_answered": 0,
                 "fill_blank_answered": 0,
                 "sentence_test_answered": 0,  # Cümle testi sayacı
-                "synonym_test_answered": 0    # Eş anlamlı kelime testi sayacı
+                "synonym_test_answered": 0,   # Eş anlamlı kelime testi sayacı
+                "word_test_answered": 0       # Kelime kartı sayacı
             }
         },
         "last_check_date": "2025-01-15",
@@ -380,7 +337,8 @@ def initialize_default_data():
         "tr_to_en_answered": 0,
         "fill_blank_answered": 0,
         "sentence_test_answered": 0,  # Cümle testi sayacı
-        "synonym_test_answered": 0    # Eş anlamlı kelime testi sayacı
+        "synonym_test_answered": 0,   # Eş anlamlı kelime testi sayacı
+        "word_test_answered": 0       # Kelime kartı sayacı
     }
 
     return default_paragraflar, default_score_data
@@ -389,56 +347,25 @@ def initialize_default_data():
 def safe_load_data():
     """Verileri güvenli bir şekilde yükle"""
     paragraflar = []
-    score_data = {
-        "total_score": 0,
-        "daily": {},
-        "last_check_date": None,
-        "questions_answered_today": 0,
-        "correct_streak": 0,
-        "wrong_streak": 0,
-        "en_to_tr_answered": 0,
-        "tr_to_en_answered": 0,
-        "fill_blank_answered": 0,
-        "sentence_test_answered": 0,  # Yeni sayaç
-        "synonym_test_answered": 0    # Yeni sayaç
-    }
+    score_data = default_score_data()
 
     # Ana dosyaları yüklemeyi dene
     try:
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                paragraflar = json.load(f)
-                if not paragraflar:  # Boş dosya kontrolü
-                    st.warning("⚠️ Paragraflar dosyası boş, varsayılan veriler yükleniyor...")
-                    paragraflar, _ = initialize_default_data()
-
-                # Eski verilere used_questions ekle
-                for paragraf in paragraflar:
-                    if "used_questions" not in paragraf:
-                        paragraf["used_questions"] = []
+        loaded_paragraflar = store.load_file("paragraflar")
+        if loaded_paragraflar is not None:
+            paragraflar = loaded_paragraflar
+            if not paragraflar:  # Boş dosya kontrolü
+                st.warning("⚠️ Paragraflar dosyası boş, varsayılan veriler yükleniyor...")
+                paragraflar, _ = initialize_default_data()
         else:
             st.info("📝 İlk kez açılıyor, varsayılan veriler yükleniyor...")
             paragraflar, _ = initialize_default_data()
 
-        if os.path.exists(SCORE_FILE):
-            with open(SCORE_FILE, "r", encoding="utf-8") as f:
-                loaded_score = json.load(f)
-                for key in score_data.keys():
-                    if key in loaded_score:
-                        score_data[key] = loaded_score[key]
-
-                # Eski verilere yeni sayaçları ekle
-                if "sentence_test_answered" not in score_data:
-                    score_data["sentence_test_answered"] = 0
-                if "synonym_test_answered" not in score_data:
-                    score_data["synonym_test_answered"] = 0
-
-                # Günlük verilere de yeni sayaçları ekle
-                for daily_data in score_data.get("daily", {}).values():
-                    if "sentence_test_answered" not in daily_data:
-                        daily_data["sentence_test_answered"] = 0
-                    if "synonym_test_answered" not in daily_data:
-                        daily_data["synonym_test_answered"] = 0
+        loaded_score = store.load_file("score_data")
+        if loaded_score is not None:
+            for key in score_data.keys():
+                if key in loaded_score:
+                    score_data[key] = loaded_score[key]
         else:
             _, score_data = initialize_default_data()
 
@@ -474,106 +401,615 @@ def safe_load_data():
     if not isinstance(score_data, dict):
         score_data = initialize_default_data()[1]
 
+    # Bekleyen şema geçişlerini uygula (güncel veride kayıtlara dokunulmaz)
+    try:
+        if migrate(paragraflar, score_data):
+            st.info(f"🔄 Veriler şema sürümü {SCHEMA_VERSION}'e yükseltildi.")
+    except Exception as e:
+        st.error(f"Şema geçişi sırasında hata: {e}")
+
     return paragraflar, score_data
 
 
-def generate_paragraph_question(test_type, paragraf):
-    """Paragraf testleri için soru üret (aynı paragraftan birden fazla soru)"""
-    if not paragraf.get("questions"):
-        return None, None, None, None
+def generate_paragraph_question(test_type, paragraf, exclude=(), allow_reset=True):
+    """Paragraf testleri için soru üret (aynı paragraftan birden fazla soru)
 
-    # Test türüne uygun soruları filtrele
-    suitable_questions = [q for q in paragraf["questions"] if q["type"] == test_type]
+    exclude: seçilmeyecek soru anahtarları (örn. önceden hazırlanmış sorular)
+    allow_reset: tüm sorular kullanıldıysa used_questions sıfırlansın mı
+    """
+    result = pick_paragraph_question(store, paragraph_bank, paragraf, test_type, exclude, allow_reset,
+                                     rng=session_rng)
+    return result if result is not None else (None, None, None, None)
 
-    if not suitable_questions:
-        return None, None, None, None
-
-    # Kullanılmamış soruları bul
-    used_questions = paragraf.get("used_questions", [])
-    unused_questions = []
 
-    for i, question in enumerate(suitable_questions):
-        question_key = f"{test_type}_{i}"
-        if question_key not in used_questions:
-            unused_questions.append((i, question, question_key))
+# -------------------- İstatistik Önbelleği --------------------
+# Geçmiş tablosu ve grafik serileri geçmiş sürümüne göre önbelleğe alınır;
+# veri değişmedikçe her çalıştırmada yeniden hesaplanmaz.
 
-    # Eğer tüm sorular kullanıldıysa, sıfırla
-    if not unused_questions:
-        # Bu test türü için kullanılan soruları sıfırla
-        paragraf["used_questions"] = [q for q in used_questions if not q.startswith(f"{test_type}_")]
-        unused_questions = [(i, question, f"{test_type}_{i}") for i, question in enumerate(suitable_questions)]
+DETAIL_PAGE_SIZE = 30  # Detay tablosunda sayfa başına satır
 
-    if not unused_questions:
-        return None, None, None, None
 
-    # Rastgele kullanılmamış soru seç
-    question_index, selected_question, question_key = random.choice(unused_questions)
+@st.cache_data(max_entries=4, show_spinner=False)
+def cached_history_frame(_score_data, version):
+    """Birleştirilmiş geçmiş tablosu (version değişince yenilenir)"""
+    with store.read():
+        return history_frame(_score_data)
 
-    question_text = selected_question["question"]
-    correct_answer = selected_question["correct_answer"]
-    options = selected_question["options"].copy()
-    random.shuffle(options)
 
-    return selected_question, question_text, correct_answer, options, question_key
-
-
-def generate_synonym_question(synonyms):
-    """Eş anlamlı kelime sorusu üret"""
-    if not synonyms:
-        return None, None, None, None, None
-    
-    selected_question = random.choice(synonyms)
-    
-    question_text = selected_question["question"]
-    correct_answers = selected_question["correct_answers"]
-    options = selected_question["options"].copy()
-    solution = selected_question.get("solution", "")
-    
-    # Seçenekleri karıştır
-    random.shuffle(options)
-    
-    return selected_question, question_text, correct_answers, options, solution
+@st.cache_data(max_entries=12, show_spinner=False)
+def cached_chart_series(_score_data, version, resolution):
+    """Seçilen çözünürlükteki puan serisi (version değişince yenilenir)"""
+    return chart_series(cached_history_frame(_score_data, version), resolution)
 
 
 # -------------------- Ana Veriler --------------------
-paragraflar, score_data = safe_load_data()
-words = load_words()  # Kelimeleri yükle
-synonyms = load_synonyms()  # Eş anlamlı kelimeleri yükle
+# Veriler süreç genelindeki depoda tutulur (bkz. store); diskten tamamen
+# sadece ilk çalıştırmada veya geri yüklemeden sonra okunur, sonraki
+# çalıştırmalarda sadece başka süreçlerin değiştirdiği dosyalar yenilenir.
+# Tüm oturumlar aynı nesneleri paylaşır, değişiklikler depo kilidi altında
+# yapılır.
+store = get_store()
+track_data_files(store)
+paragraflar = store.paragraflar
+score_data = store.score_data
+words = store.words
+synonyms = store.synonyms
 
 current_time = datetime.now()
 today = current_time.date()
 today_str = today.strftime("%Y-%m-%d")
 
-# Günlük verileri kontrol et
-if "daily" not in score_data:
-    score_data["daily"] = {}
-
-if score_data.get("last_check_date") != today_str:
-    # Yeni gün için sıfırla
-    score_data["questions_answered_today"] = 0
-    score_data["last_check_date"] = today_str
-    score_data["correct_streak"] = 0
-    score_data["wrong_streak"] = 0
-    score_data["en_to_tr_answered"] = 0
-    score_data["tr_to_en_answered"] = 0
-    score_data["fill_blank_answered"] = 0
-    score_data["sentence_test_answered"] = 0
-    score_data["synonym_test_answered"] = 0
-
-if today_str not in score_data["daily"]:
-    score_data["daily"][today_str] = {
-        "score": 0,
-        "questions_answered": 0,
-        "correct": 0,
-        "wrong": 0,
-        "en_to_tr_answered": 0,
-        "tr_to_en_answered": 0,
-        "fill_blank_answered": 0,
-        "sentence_test_answered": 0,
-        "synonym_test_answered": 0
-    }
+with store.write():
+    needs_save = False
+    if not store.loaded:
+        loaded_paragraflar, loaded_score_data = safe_load_data()
+        loaded_synonyms = load_synonyms()  # Eş anlamlı kelimeleri yükle
+        if assign_item_ids(loaded_synonyms):
+            save_synonyms(loaded_synonyms)
+        store.set_data(loaded_paragraflar, loaded_score_data, load_words(), loaded_synonyms)
+        needs_save = True
+    else:
+        # Diğer süreçlerin değiştirdiği dosyaları (sadece onları) yeniden oku
+        store.refresh()
+
+    # Gün değiştiyse günlük sayaçları sıfırla, bugünün kaydını aç
+    if ensure_today(score_data, today):
+        needs_save = True
+
+    if needs_save:
+        safe_save_data()
+
+with store.read():
+    # Paragrafların test türü indeksi; depoda tutulur, paragraflar değişince yeniden kurulur
+    paragraph_bank = store.paragraph_bank()
+
+    # Oturum durumundaki id'lerden paragrafa erişim için indeks
+    paragraph_index = paragraph_bank.by_id
+    synonym_index = {q.get("id"): q for q in synonyms}
+
+    # Uyarlamalı seçim: sorular tahmini başarı olasılığı hedefe yakın olanlardan seçilir
+    adaptive_selection = bool(score_data.get("adaptive_selection", False))
+    target_success = score_data.get("target_success", DEFAULT_TARGET_SUCCESS)
+
+# Soru zorlukları ve öğrenci yeteneği (diğer süreçlerin cevapları da okunur)
+rating_model = get_rating_model()
+
+# -------------------- Oturum Tohumu ve Kaydı --------------------
+# Tüm soru seçimleri oturumun tohumlu üretecinden yapılır (bkz. session_log);
+# tohum Ayarlar'da görünür, ?seed=... ile verilebilir. Kayıt açıksa gösterilen
+# sorular ve cevaplar oturumlar/ klasörüne yazılır (cli.py replay ile oynatılır).
+
+def query_param(name):
+    """URL sorgu parametresi (yoksa None); st.query_params olmayan sürümlerde eski API kullanılır"""
+    if hasattr(st, "query_params"):
+        return st.query_params.get(name)
+    values = st.experimental_get_query_params().get(name)
+    return values[-1] if values else None
+
+
+if "session_rng" not in st.session_state:
+    try:
+        st.session_state.session_seed = int(query_param("seed"))
+    except (TypeError, ValueError):
+        st.session_state.session_seed = new_seed()
+    st.session_state.session_rng = random.Random(st.session_state.session_seed)
+session_rng = st.session_state.session_rng
+
+if score_data.get("record_sessions") and st.session_state.get("session_recorder") is None:
+    # Kayıt oturumun ortasında açıldıysa üreteç tohumuna döner: kayıt baştan oynatılabilsin
+    session_rng.seed(st.session_state.session_seed)
+    with store.read():
+        counts = data_counts(store)
+    st.session_state.session_recorder = SessionRecorder.in_directory(st.session_state.session_seed, counts)
+elif not score_data.get("record_sessions") and st.session_state.get("session_recorder") is not None:
+    st.session_state.session_recorder.close()
+    st.session_state.session_recorder = None
+session_recorder = st.session_state.get("session_recorder")
+
+
+def show_question(state):
+    """Soruyu gösterildi olarak işaretle; ilk gösterimde oturum kaydına yaz"""
+    if state.shown_at is None and session_recorder is not None:
+        session_recorder.question(state)
+    state.mark_shown()  # Cevap süresi gösterimden itibaren ölçülür
+
+
+# -------------------- Önceden Hazırlanan Sorular --------------------
+# Cevap verildikten sonra, kullanıcı geri bildirimi okurken sonraki sorular
+# hazırlanır; "Sonraki Soru" tıklandığında tampondan alınır. Hazırlanan
+# sorular used_questions'a sadece cevaplandıklarında eklenir.
+
+PREFETCH_SIZE = 3  # Her bölüm için önceden hazırlanacak soru sayısı
+
+
+def get_prefetch_buffer(section, test_type):
+    """Bölüm ve test türüne ait önceden hazırlanmış soru tamponu"""
+    buffers = st.session_state.setdefault("prefetch_buffers", {})
+    return buffers.setdefault((section, test_type), [])
+
+
+def make_paragraph_state(test_type, paragraph_id, result):
+    """generate_paragraph_question sonucundan soru durumu oluştur"""
+    return QuestionState(
+        "paragraph", test_type, result[3],
+        item_id=paragraph_id,
+        question_id=result[0]["id"],
+        question_key=result[4]
+    )
+
+
+def prefetch_paragraph_questions(test_type, paragraph_id):
+    """Aktif paragraftan sonraki soruları hazırla"""
+    buffer = get_prefetch_buffer("paragraph", test_type)
+    buffer[:] = [s for s in buffer if s.item_id == paragraph_id]
+
+    paragraf = paragraph_index.get(paragraph_id)
+    while paragraf is not None and len(buffer) < PREFETCH_SIZE:
+        result = generate_paragraph_question(test_type, paragraf,
+                                             exclude={s.question_key for s in buffer}, allow_reset=False)
+        if result[0] is None:
+            break
+        buffer.append(make_paragraph_state(test_type, paragraph_id, result))
+
+
+def take_prefetched_paragraph_question(test_type, paragraph_id):
+    """Tampondan aktif paragrafa ait, hâlâ kullanılmamış bir soru al"""
+    buffer = get_prefetch_buffer("paragraph", test_type)
+    paragraf = paragraph_index.get(paragraph_id)
+    while buffer:
+        state = buffer.pop(0)
+        if (paragraf is not None and state.item_id == paragraph_id
+                and state.question_key not in paragraf.get("used_questions", [])
+                and find_question(paragraf, state.question_id) is not None):
+            return state
+    return None
+
+
+def prefetch_sentence_questions(test_type):
+    """Sonraki cümle sorularını hazırla"""
+    buffer = get_prefetch_buffer("sentence", test_type)
+    missing = PREFETCH_SIZE - len(buffer)
+    if missing > 0:
+        targets = None
+        if adaptive_selection:
+            targets = pick_adaptive_words(rating_model, words, test_type, missing, target_success,
+                                          rng=session_rng) or None
+        # Eksik soruların hepsi tek bir toplu çağrıyla üretilir
+        generated = generate_sentence_questions(words, test_type, missing, rng=session_rng,
+                                                distractors=distractor_index(),
+                                                targets=targets, with_words=True)
+        for question, correct_answer, options, word in generated:
+            buffer.append(QuestionState("sentence", test_type, options, item_id=word,
+                                        question_text=question, correct_answer=correct_answer))
+
+
+def prefetch_word_questions(test_type):
+    """Sonraki kelime kartlarını hazırla (seçenekler çeldirici havuzlarından)"""
+    buffer = get_prefetch_buffer("word", test_type)
+    missing = PREFETCH_SIZE - len(buffer)
+    if missing > 0:
+        targets = None
+        if adaptive_selection:
+            targets = pick_adaptive_words(rating_model, words, word_rating_type(test_type), missing,
+                                          target_success, rng=session_rng) or None
+        generated = generate_word_questions(distractor_index(), test_type, missing,
+                                            rng=session_rng, targets=targets)
+        for question, correct_answer, options, word in generated:
+            buffer.append(QuestionState("word", test_type, options, item_id=word,
+                                        question_text=question, correct_answer=correct_answer))
+
+
+def prefetch_synonym_questions(current_id=None):
+    """Sonraki eş anlamlı soruları hazırla (az önce sorulanı tekrar etmeden)"""
+    buffer = get_prefetch_buffer("synonym", None)
+    if adaptive_selection and len(buffer) < PREFETCH_SIZE:
+        exclude = {s.item_id for s in buffer} | {current_id}
+        for question in pick_adaptive_synonym_questions(rating_model, synonym_index, PREFETCH_SIZE - len(buffer),
+                                                        target_success, exclude, rng=session_rng):
+            options = question["options"].copy()
+            session_rng.shuffle(options)
+            buffer.append(QuestionState("synonym", question.get("type", "synonym"), options,
+                                        item_id=question["id"]))
+
+    buffered_ids = {s.item_id for s in buffer}
+    candidates = [q for q in synonyms if q.get("id") != current_id and q.get("id") not in buffered_ids]
+    while candidates and len(buffer) < PREFETCH_SIZE:
+        result = generate_synonym_question(candidates, session_rng)
+        candidates.remove(result[0])
+        buffer.append(QuestionState("synonym", result[0].get("type", "synonym"), result[3],
+                                    item_id=result[0]["id"]))
+
+
+def take_prefetched_question(section, test_type, index):
+    """Tampondan, kaynağı hâlâ mevcut olan bir soru al"""
+    buffer = get_prefetch_buffer(section, test_type)
+    while buffer:
+        state = buffer.pop(0)
+        if index is None or state.item_id in index:
+            return state
+    return None
+
+
+# -------------------- Buton Callback'leri --------------------
+# Cevapla / Sonraki Soru butonları on_click ile çalışır: Streamlit callback'i
+# script'ten önce çalıştırır, böylece her tıklama tek bir script çalıştırması
+# yapar (st.rerun() ile ikinci bir yükle/kaydet/sidebar turu gerekmez).
+
+
+def record_answer(is_correct, points, counter_key, state=None, changed=()):
+    """Cevap sonucunu puan ve sayaçlara işle, kaydet.
+
+    state verilirse gösterimden cevaba kadar geçen süre histograma eklenir.
+    changed: puanlar dışında değişen koleksiyonlar (örn. kullanılan soru işareti
+    eklendiyse "paragraflar"); sadece bunlar ve puanlar diske yazılır.
+    """
+    response_time = None
+    if state is not None and state.shown_at is not None:
+        response_time = (response_key(state.section, state.test_type), state.response_time())
+    with store.write():
+        store.record_answer(today_str, counter_key, is_correct, points, response_time)
+        safe_save_data(("score_data",) + tuple(changed))
+    if session_recorder is not None and state is not None:
+        session_recorder.answer(state.serial, state.selected, is_correct, state.response_time(), state.match)
+
+    # Soru zorluğu ve öğrenci yeteneği (kendi günlük dosyasına eklenir)
+    key = rating_key(state) if state is not None else None
+    if key is not None:
+        rating_model.record(key, is_correct)
+
+
+def read_answer(answer_key, expected, free_text=False):
+    """Seçilen veya yazılan cevap: (cevap, doğru mu, yazılı cevabın eşleşmesi)"""
+    answer = st.session_state.get(answer_key)
+    if not free_text:
+        return answer, answer == expected, None
+    answer = (answer or "").strip()
+    verdict, distance, _ = match_answer(answer, expected, **match_settings(score_data))
+    return answer, verdict != "wrong", (verdict, distance, expected)
+
+
+def set_free_text_mode(widget_key):
+    """Yazılı cevap modunu sayfalar arasında ortak tut"""
+    st.session_state.free_text_mode = st.session_state[widget_key]
+
+
+def free_text_toggle(page):
+    """Yazılı cevap modu kutusu"""
+    widget_key = f"{page}_free_text_toggle"
+    st.checkbox("✍️ Cevabı yazarak ver (küçük yazım hataları ve Türkçe karakter farkları kabul edilir)",
+                value=st.session_state.get("free_text_mode", False), key=widget_key,
+                on_change=set_free_text_mode, args=(widget_key,))
+
+
+def show_answer_input(state, page, submit):
+    """Seçenekleri veya yazılı cevap kutusunu ve Cevapla butonunu göster"""
+    free_text = st.session_state.get("free_text_mode", False) and accepts_free_text(state.section, state.test_type)
+    if free_text:
+        answer_key = state.widget_key(f"{page}_answer_text")
+        st.text_input("Cevabınız:", key=answer_key)
+    else:
+        answer_key = state.widget_key(f"{page}_answer_radio")
+        st.radio(
+            "Seçenekler:",
+            state.options,
+            key=answer_key
+        )
+
+    col1, col2 = st.columns([1, 4])
+    with col1:
+        st.button("Cevapla", key=f"{page}_answer_btn", type="primary",
+                  on_click=submit, args=(answer_key, free_text))
+
+
+def show_free_text_result(state):
+    """Yazılı cevapta yazılan cevabı ve kabul edilen yazım farkını göster"""
+    if state.match is None:
+        return
+    verdict, distance, expected = state.match
+    if verdict == "close":
+        detail = "Türkçe karakter farkı" if distance == 0 else f"{distance} harf farkı"
+        st.info(f"✍️ Yazdığınız **{state.selected}** kabul edildi ({detail}), doğru yazılışı: **{expected}**")
+    elif verdict == "wrong":
+        st.caption(f"✍️ Yazdığınız: {state.selected or '(boş)'}")
+
+
+def select_paragraph_test_type(test_type):
+    """Paragraf test türünü seç"""
+    st.session_state.selected_paragraph_test_type = test_type
+    st.session_state.current_paragraph_question = None
+
+
+def submit_paragraph_answer(answer_key, free_text=False):
+    """Paragraf sorusunun cevabını işle"""
+    state = st.session_state.current_paragraph_question
+    if state is None or state.answered:
+        return
+
+    paragraf = paragraph_index.get(state.item_id)
+    question = find_question(paragraf, state.question_id) if paragraf else None
+    if question is None:  # Soru bu arada silinmiş
+        st.session_state.current_paragraph_question = None
+        return
+
+    selected_answer, is_correct, match = read_answer(answer_key, question["correct_answer"], free_text)
+
+    # Kullanılan soru işareti ve puan tek yazma işleminde kaydedilir
+    with store.write():
+        marked = store.mark_question_used(paragraf, state.question_key)
+        state.mark_answered(selected_answer, is_correct, match)
+        record_answer(is_correct, 1, f"{state.test_type}_answered", state,
+                      changed=("paragraflar",) if marked else ())
+    prefetch_paragraph_questions(state.test_type, state.item_id)
+
+
+def next_paragraph_question(new_paragraph=False):
+    """Sonraki paragraf sorusuna geç"""
+    st.session_state.current_paragraph_question = None
+    if new_paragraph:
+        st.session_state.active_paragraph_id = None  # Yeni paragraf seçilsin
+
+
+def back_to_paragraph_menu():
+    """Paragraf test menüsüne dön"""
+    st.session_state.selected_paragraph_test_type = None
+    st.session_state.current_paragraph_question = None
+    st.session_state.active_paragraph_id = None
+
+
+def select_sentence_test_type(test_type):
+    """Cümle test türünü seç"""
+    st.session_state.selected_sentence_test_type = test_type
+    st.session_state.current_sentence_question = None
+
+
+def submit_sentence_answer(answer_key, free_text=False):
+    """Cümle sorusunun cevabını işle"""
+    state = st.session_state.current_sentence_question
+    if state is None or state.answered:
+        return
+
+    selected_answer, is_correct, match = read_answer(answer_key, state.correct_answer, free_text)
+
+    # Puanlama (cümle testleri için aynı puanlama)
+    state.mark_answered(selected_answer, is_correct, match)
+    record_answer(is_correct, 1, "sentence_test_answered", state)
+    prefetch_sentence_questions(state.test_type)
+
+
+def next_sentence_question():
+    """Sonraki cümle sorusuna geç"""
+    st.session_state.current_sentence_question = None
+
+
+def back_to_sentence_menu():
+    """Cümle test menüsüne dön"""
+    st.session_state.selected_sentence_test_type = None
+    st.session_state.current_sentence_question = None
+
+
+def select_word_test_type(test_type):
+    """Kelime kartı yönünü seç"""
+    st.session_state.selected_word_test_type = test_type
+    st.session_state.current_word_question = None
+
+
+def submit_word_answer(answer_key, free_text=False):
+    """Kelime kartı cevabını işle; yanlışta kelimenin wrong_count'u artar"""
+    state = st.session_state.current_word_question
+    if state is None or state.answered:
+        return
+
+    selected_answer, is_correct, match = read_answer(answer_key, state.correct_answer, free_text)
+    state.mark_answered(selected_answer, is_correct, match)
+    if not is_correct:
+        with store.write():
+            st.session_state.word_wrong_count = record_word_miss(words, state.item_id)
+            save_words(words)
+    record_answer(is_correct, 1, "word_test_answered", state)
+    prefetch_word_questions(state.test_type)
+
+
+def next_word_question():
+    """Sonraki kelime kartına geç"""
+    st.session_state.current_word_question = None
+
+
+def back_to_word_menu():
+    """Kelime kartı menüsüne dön"""
+    st.session_state.selected_word_test_type = None
+    st.session_state.current_word_question = None
+
+
+def submit_synonym_answer():
+    """Eş anlamlı sorunun cevabını işle"""
+    state = st.session_state.current_synonym_question
+    if state is None or state.answered:
+        return
+
+    question = synonym_index.get(state.item_id)
+    if question is None:  # Soru bu arada silinmiş
+        st.session_state.current_synonym_question = None
+        return
+
+    selected_answers = [
+        option for i, option in enumerate(state.options)
+        if st.session_state.get(state.widget_key("synonym_option", f"_{i}"))
+    ]
+    is_correct = set(question["correct_answers"]) == set(selected_answers)
+
+    # Eş anlamlı testler 2 puan
+    state.mark_answered(tuple(selected_answers), is_correct)
+    record_answer(is_correct, 2, "synonym_test_answered", state)
+    prefetch_synonym_questions(state.item_id)
+
+
+def next_synonym_question():
+    """Sonraki eş anlamlı soruya geç"""
+    st.session_state.current_synonym_question = None
+
+
+def start_exam():
+    """Plana göre yeni deneme sınavı hazırla"""
+    exam, shortages = build_exam(paragraph_bank, words, synonyms, rng=session_rng,
+                                 distractors=distractor_index())
+    if session_recorder is not None:
+        for state in exam.questions:
+            session_recorder.question(state)
+    st.session_state.exam = exam
+    st.session_state.exam_shortages = shortages
+    st.session_state.exam_page = 0
+
+
+def change_exam_page(delta):
+    """Sınav sayfasını değiştir"""
+    exam = st.session_state.exam
+    st.session_state.exam_page = min(max(st.session_state.exam_page + delta, 0), exam.page_count() - 1)
+
+
+def set_exam_answer(index, widget_key):
+    """Tek seçimli sınav sorusunun cevabını sakla (sayfa değişince widget silinir)"""
+    st.session_state.exam.answers[index] = st.session_state.get(widget_key)
+
+
+def set_exam_synonym_answer(index):
+    """Eş anlamlı sınav sorusunda işaretlenen seçenekleri sakla"""
+    exam = st.session_state.exam
+    state = exam.questions[index]
+    exam.answers[index] = [
+        option for i, option in enumerate(state.options)
+        if st.session_state.get(state.widget_key("exam_answer", f"_{i}"))
+    ] or None
+
+
+def submit_exam():
+    """Sınavı puanla; cevaplanan soruları puan ve sayaçlara tek kayıtta işle"""
+    exam = st.session_state.get("exam")
+    if exam is None or exam.submitted:
+        return
+
+    result = exam.score()
+    counter_keys = {"sentence": "sentence_test_answered", "synonym": "synonym_test_answered"}
+    changed = {"score_data"}
+    with store.write():
+        for state, answered, is_correct in zip(exam.questions, result["answered"], result["correct"]):
+            if not answered:
+                continue  # Boş bırakılan sorular sayılmaz
+            if state.section == "paragraph":
+                paragraf = paragraph_index.get(state.item_id)
+                if paragraf is None:
+                    continue
+                if store.mark_question_used(paragraf, state.question_key):
+                    changed.add("paragraflar")
+            counter_key = counter_keys.get(state.section, f"{state.test_type}_answered")
+            store.record_answer(today_str, counter_key, bool(is_correct), SECTION_POINTS[state.section])
+        safe_save_data(tuple(changed))
+
+    for state, answered, is_correct, answer in zip(exam.questions, result["answered"], result["correct"],
+                                                   result["answers"]):
+        if answered and session_recorder is not None:
+            session_recorder.answer(state.serial, answer, bool(is_correct))
+        key = rating_key(state)
+        if answered and key is not None:
+            rating_model.record(key, bool(is_correct))
+
+
+def end_exam():
+    """Sınav sonuç ekranından çık"""
+    st.session_state.exam = None
+    st.session_state.exam_page = 0
+
+
+def add_paragraph(paragraf):
+    """Paragrafı ekle (id depo kilidi altında verilir), sorularını üret ve kaydet"""
+    with store.write():
+        store.add_item("paragraflar", paragraf, assign_id=True)
+        detach_texts([paragraf])
+
+        # Cümlelerden çeviri ve boşluk doldurma sorularını üret (sadece yeni paragraf işlenir)
+        if ingest_paragraphs(paragraflar):
+            store.touch("paragraflar")
+        saved = safe_save_data()
+
+    if saved:
+        return "success", (f"✅ Paragraf kaydedildi: **{paragraf['title']}** "
+                           f"({len(paragraf['questions'])} soru üretildi)")
+    return "error", "❌ Kayıt sırasında hata oluştu!"
+
+
+def add_synonym_question(question):
+    """Eş anlamlı soruyu ekle ve kaydet"""
+    with store.write():
+        store.add_item("synonyms", question, assign_id=True)
+        saved = save_synonyms(synonyms)
+
+    if saved:
+        return "success", "✅ Eş anlamlı soru kaydedildi!"
+    return "error", "❌ Kayıt sırasında hata oluştu!"
+
+
+def find_similar_items(name, item):
+    """Eklenecek öğeye benzeyen kayıtlar: [(id, benzerlik), ...]"""
+    text_of = paragraph_text if name == "paragraflar" else synonym_text
+    with store.write():  # Index depo kilidi altında eşitlenir
+        return get_duplicate_index(name, getattr(store, name), text_of).query(text_of(item))
+
+
+def save_pending_item():
+    """Benzer kayıt uyarısına rağmen bekleyen öğeyi kaydet"""
+    pending = st.session_state.get("pending_item")
+    st.session_state.pending_item = None
+    if pending is not None:
+        name, item, _ = pending
+        add = add_paragraph if name == "paragraflar" else add_synonym_question
+        st.session_state.content_message = add(item)
+
+
+def discard_pending_item():
+    """Benzer kayıt bulunan öğeyi eklemekten vazgeç"""
+    st.session_state.pending_item = None
+
+
+def show_pending_item(name):
+    """Benzer kayıt bulunduğu için bekletilen öğe için uyarı ve seçenekler"""
+    pending = st.session_state.get("pending_item")
+    if pending is None or pending[0] != name:
+        return
+    _, _, matches = pending
+    index = paragraph_index if name == "paragraflar" else synonym_index
+    title_key = "title" if name == "paragraflar" else "question"
+    similar = ", ".join(
+        f"**{index[item_id][title_key] if item_id in index else f'#{item_id}'}** (%{score * 100:.0f})"
+        for item_id, score in matches[:5]
+    )
+    st.warning(f"⚠️ Çok benzer kayıt zaten var: {similar}")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("💾 Yine de Kaydet", key=f"save_pending_{name}", type="primary",
+                  use_container_width=True, on_click=save_pending_item)
+    with col2:
+        st.button("❌ Vazgeç", key=f"discard_pending_{name}", use_container_width=True,
+                  on_click=discard_pending_item)
 
-safe_save_data()
 
 # -------------------- Streamlit Arayüz --------------------
 
@@ -606,6 +1042,7 @@ with st.sidebar:
     st.write(f"🇹🇷➡️🇺🇸 **TR→EN:** {tr_en_current}")
     st.write(f"📝 **Boşluk Doldurma:** {fill_blank_current}")
     st.write(f"✏️ **Cümle Testi:** {sentence_current}")
+    st.write(f"🃏 **Kelime Kartı:** {score_data.get('word_test_answered', 0)}")
     st.write(f"🔗 **Eş Anlamlı:** {synonym_current}")
 
     # Seri durumu
@@ -618,7 +1055,7 @@ with st.sidebar:
 # Ana menü
 menu = st.sidebar.radio(
     "📋 Menü",
-    ["🏠 Ana Sayfa", "📝 Paragraf Testleri", "✏️ Cümle Testleri", "🔗 Eş Anlamlı Testler", "📊 İstatistikler", "➕ İçerik Ekle", "🔧 Ayarlar"],
+    ["🏠 Ana Sayfa", "📝 Paragraf Testleri", "✏️ Cümle Testleri", "🃏 Kelime Kartları", "🔗 Eş Anlamlı Testler", "🎓 Deneme Sınavı", "📊 İstatistikler", "➕ İçerik Ekle", "🔧 Ayarlar"],
     key="main_menu"
 )
 
@@ -692,157 +1129,128 @@ elif menu == "📝 Paragraf Testleri":
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        if st.button("🇺🇸➡️🇹🇷 İngilizce → Türkçe", use_container_width=True,
-                     type="primary" if st.session_state.selected_paragraph_test_type == "en_to_tr" else "secondary"):
-            st.session_state.selected_paragraph_test_type = "en_to_tr"
-            st.session_state.current_paragraph_question = None
+        st.button("🇺🇸➡️🇹🇷 İngilizce → Türkçe", use_container_width=True,
+                  type="primary" if st.session_state.selected_paragraph_test_type == "en_to_tr" else "secondary",
+                  on_click=select_paragraph_test_type, args=("en_to_tr",))
 
     with col2:
-        if st.button("🇹🇷➡️🇺🇸 Türkçe → İngilizce", use_container_width=True,
-                     type="primary" if st.session_state.selected_paragraph_test_type == "tr_to_en" else "secondary"):
-            st.session_state.selected_paragraph_test_type = "tr_to_en"
-            st.session_state.current_paragraph_question = None
+        st.button("🇹🇷➡️🇺🇸 Türkçe → İngilizce", use_container_width=True,
+                  type="primary" if st.session_state.selected_paragraph_test_type == "tr_to_en" else "secondary",
+                  on_click=select_paragraph_test_type, args=("tr_to_en",))
 
     with col3:
-        if st.button("📝 Boşluk Doldurma", use_container_width=True,
-                     type="primary" if st.session_state.selected_paragraph_test_type == "fill_blank" else "secondary"):
-            st.session_state.selected_paragraph_test_type = "fill_blank"
-            st.session_state.current_paragraph_question = None
+        st.button("📝 Boşluk Doldurma", use_container_width=True,
+                  type="primary" if st.session_state.selected_paragraph_test_type == "fill_blank" else "secondary",
+                  on_click=select_paragraph_test_type, args=("fill_blank",))
+
+    if st.session_state.selected_paragraph_test_type == "fill_blank":
+        free_text_toggle("paragraph")
 
     # Test seçilmişse soruyu göster
     if st.session_state.selected_paragraph_test_type:
         st.divider()
 
         # Mevcut soruyu kontrol et, yoksa yeni soru üret
-        if "current_paragraph_question" not in st.session_state or st.session_state.current_paragraph_question is None:
-            # Eğer aktif paragraf varsa ondan soru bul, yoksa yeni paragraf seç
-            if "active_paragraph" not in st.session_state or st.session_state.active_paragraph is None:
-                st.session_state.active_paragraph = random.choice(paragraflar)
+        if st.session_state.get("current_paragraph_question") is None:
+            test_type = st.session_state.selected_paragraph_test_type
 
-            result = generate_paragraph_question(st.session_state.selected_paragraph_test_type,
-                                                 st.session_state.active_paragraph)
+            candidate_ids = paragraph_bank.paragraph_ids(test_type)
+            if not candidate_ids:
+                st.error("Hiçbir paragrafta bu türde soru bulunamadı!")
+                st.session_state.selected_paragraph_test_type = None
+                st.stop()
 
-            if result is None or result[0] is None:  # Bu türde soru yoksa
+            # Eğer aktif paragraf varsa ondan soru bul, yoksa yeni paragraf seç
+            adaptive_result = None
+            if st.session_state.get("active_paragraph_id") not in paragraph_index:
+                adaptive = None
+                if adaptive_selection:
+                    adaptive = pick_adaptive_paragraph_question(rating_model, paragraph_bank, test_type, target_success,
+                                                                rng=session_rng)
+                if adaptive is not None:
+                    st.session_state.active_paragraph_id, adaptive_result = adaptive
+                else:
+                    st.session_state.active_paragraph_id = session_rng.choice(candidate_ids)
+
+            # Önceden hazırlanmış soru varsa onu kullan
+            prefetched = None
+            if adaptive_result is None:
+                prefetched = take_prefetched_paragraph_question(test_type, st.session_state.active_paragraph_id)
+            if prefetched is not None:
+                result = None
+            elif adaptive_result is not None:
+                result = adaptive_result
+            else:
+                result = generate_paragraph_question(test_type, paragraph_index[st.session_state.active_paragraph_id])
+
+            if prefetched is not None:
+                st.session_state.current_paragraph_question = prefetched
+            elif result is None or result[0] is None:  # Bu türde soru yoksa
                 st.warning(
-                    f"Bu paragraf için {st.session_state.selected_paragraph_test_type} türünde soru kalmadı! Yeni paragraf seçiliyor...")
-                st.session_state.active_paragraph = random.choice(paragraflar)
-                result = generate_paragraph_question(st.session_state.selected_paragraph_test_type,
-                                                     st.session_state.active_paragraph)
+                    f"Bu paragraf için {test_type} türünde soru kalmadı! Yeni paragraf seçiliyor...")
+                st.session_state.active_paragraph_id = session_rng.choice(candidate_ids)
+                result = generate_paragraph_question(test_type, paragraph_index[st.session_state.active_paragraph_id])
 
                 if result is None or result[0] is None:
                     st.error("Hiçbir paragrafta bu türde soru bulunamadı!")
                     st.session_state.selected_paragraph_test_type = None
                     st.stop()
 
-            st.session_state.current_paragraph_question = {
-                "paragraph": st.session_state.active_paragraph,
-                "question_obj": result[0],
-                "question_text": result[1],
-                "correct_answer": result[2],
-                "options": result[3],
-                "question_key": result[4],
-                "answered": False,
-                "result_message": ""
-            }
+            if prefetched is None:
+                st.session_state.current_paragraph_question = make_paragraph_state(
+                    test_type, st.session_state.active_paragraph_id, result)
 
-        question_data = st.session_state.current_paragraph_question
+        state = st.session_state.current_paragraph_question
+        show_question(state)
+        active_paragraph = paragraph_index.get(state.item_id)
+        question = find_question(active_paragraph, state.question_id) if active_paragraph else None
+        if question is None:  # Paragraf veya soru silinmişse yenisini seç
+            st.session_state.current_paragraph_question = None
+            st.session_state.active_paragraph_id = None
+            st.rerun()
 
         # Paragrafı göster
-        st.subheader(f"📄 {question_data['paragraph']['title']}")
+        st.subheader(f"📄 {active_paragraph['title']}")
         with st.expander("Paragrafı Oku", expanded=True):
-            st.write(question_data['paragraph']['paragraph'])
+            st.write(get_text(active_paragraph, 'paragraph'))
 
             # Türkçe çevirisini göster (sadece boşluk doldurma testinde)
-            if st.session_state.selected_paragraph_test_type == "fill_blank":
+            if state.test_type == "fill_blank":
                 with st.expander("Türkçe Çeviri"):
-                    st.write(question_data['paragraph']['turkish_translation'])
+                    st.write(get_text(active_paragraph, 'turkish_translation'))
 
         st.divider()
 
         # Soruyu göster
         st.subheader("Soru:")
-        st.write(question_data["question_text"])
+        st.write(question["question"])
 
         # Cevap verilmemişse seçenekleri göster
-        if not question_data["answered"]:
-            selected_answer = st.radio(
-                "Seçenekler:",
-                question_data["options"],
-                key=f"paragraph_answer_radio_{st.session_state.selected_paragraph_test_type}_{hash(str(question_data))}"
-            )
-
-            col1, col2 = st.columns([1, 4])
-            with col1:
-                if st.button("Cevapla", key="paragraph_answer_btn", type="primary"):
-                    # Cevabı işle
-                    is_correct = selected_answer == question_data["correct_answer"]
-
-                    # Kullanılan soruyu işaretle
-                    if question_data["question_key"] not in question_data["paragraph"]["used_questions"]:
-                        question_data["paragraph"]["used_questions"].append(question_data["question_key"])
-
-                    # Sayaçları güncelle
-                    score_data["questions_answered_today"] += 1
-                    test_type = st.session_state.selected_paragraph_test_type
-
-                    if test_type == "en_to_tr":
-                        score_data["en_to_tr_answered"] += 1
-                        score_data["daily"][today_str]["en_to_tr_answered"] += 1
-                    elif test_type == "tr_to_en":
-                        score_data["tr_to_en_answered"] += 1
-                        score_data["daily"][today_str]["tr_to_en_answered"] += 1
-                    elif test_type == "fill_blank":
-                        score_data["fill_blank_answered"] += 1
-                        score_data["daily"][today_str]["fill_blank_answered"] += 1
-
-                    # Puanlama
-                    if is_correct:
-                        score_data["total_score"] += 1
-                        score_data["daily"][today_str]["score"] += 1
-                        score_data["daily"][today_str]["correct"] += 1
-                        score_data["correct_streak"] += 1
-                        score_data["wrong_streak"] = 0
-                        question_data["result_message"] = "✅ Doğru! (+1 puan)"
-                    else:
-                        score_data["daily"][today_str]["wrong"] += 1
-                        score_data["wrong_streak"] += 1
-                        score_data["correct_streak"] = 0
-                        question_data[
-                            "result_message"] = f"❌ Yanlış! Doğru cevap: **{question_data['correct_answer']}**"
-
-                    score_data["daily"][today_str]["questions_answered"] += 1
-                    question_data["answered"] = True
-                    safe_save_data()
-                    st.rerun()
+        if not state.answered:
+            show_answer_input(state, "paragraph", submit_paragraph_answer)
 
         # Cevap verildiyse sonucu göster
         else:
-            if "✅" in question_data["result_message"]:
-                st.success(question_data["result_message"])
+            if state.is_correct:
+                st.success("✅ Doğru! (+1 puan)")
             else:
-                st.error(question_data["result_message"])
+                st.error(f"❌ Yanlış! Doğru cevap: **{question['correct_answer']}**")
+            show_free_text_result(state)
 
             # Sonraki soru butonu
             col1, col2, col3 = st.columns([1, 1, 1])
             with col1:
-                if st.button("🔄 Aynı Paragraf - Sonraki Soru", key="next_paragraph_question", type="primary",
-                             use_container_width=True):
-                    st.session_state.current_paragraph_question = None
-                    # Aktif paragrafı koruyarak devam et
-                    st.rerun()
+                # Aktif paragrafı koruyarak devam et
+                st.button("🔄 Aynı Paragraf - Sonraki Soru", key="next_paragraph_question", type="primary",
+                          use_container_width=True, on_click=next_paragraph_question)
 
             with col2:
-                if st.button("📄 Yeni Paragraf", key="new_paragraph", use_container_width=True):
-                    st.session_state.current_paragraph_question = None
-                    st.session_state.active_paragraph = None  # Yeni paragraf seçilsin
-                    st.rerun()
+                st.button("📄 Yeni Paragraf", key="new_paragraph", use_container_width=True,
+                          on_click=next_paragraph_question, kwargs={"new_paragraph": True})
 
             with col3:
-                if st.button("🏠 Test Menüsüne Dön", key="back_to_paragraph_menu", use_container_width=True):
-                    st.session_state.selected_paragraph_test_type = None
-                    st.session_state.current_paragraph_question = None
-                    st.session_state.active_paragraph = None
-                    st.rerun()
+                st.button("🏠 Test Menüsüne Dön", key="back_to_paragraph_menu", use_container_width=True,
+                          on_click=back_to_paragraph_menu)
     else:
         st.info("👆 Yukarıdaki butonlardan bir paragraf test türü seçin")
 
@@ -864,54 +1272,60 @@ elif menu == "✏️ Cümle Testleri":
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        if st.button("🇺🇸➡️🇹🇷 Cümle Çevirisi (EN→TR)", use_container_width=True,
-                     type="primary" if st.session_state.selected_sentence_test_type == "sentence_en_to_tr" else "secondary"):
-            st.session_state.selected_sentence_test_type = "sentence_en_to_tr"
-            st.session_state.current_sentence_question = None
+        st.button("🇺🇸➡️🇹🇷 Cümle Çevirisi (EN→TR)", use_container_width=True,
+                  type="primary" if st.session_state.selected_sentence_test_type == "sentence_en_to_tr" else "secondary",
+                  on_click=select_sentence_test_type, args=("sentence_en_to_tr",))
 
     with col2:
-        if st.button("🇹🇷➡️🇺🇸 Cümle Çevirisi (TR→EN)", use_container_width=True,
-                     type="primary" if st.session_state.selected_sentence_test_type == "sentence_tr_to_en" else "secondary"):
-            st.session_state.selected_sentence_test_type = "sentence_tr_to_en"
-            st.session_state.current_sentence_question = None
+        st.button("🇹🇷➡️🇺🇸 Cümle Çevirisi (TR→EN)", use_container_width=True,
+                  type="primary" if st.session_state.selected_sentence_test_type == "sentence_tr_to_en" else "secondary",
+                  on_click=select_sentence_test_type, args=("sentence_tr_to_en",))
 
     with col3:
-        if st.button("📝 Cümle Boşluk Doldurma", use_container_width=True,
-                     type="primary" if st.session_state.selected_sentence_test_type == "sentence_fill_blank" else "secondary"):
-            st.session_state.selected_sentence_test_type = "sentence_fill_blank"
-            st.session_state.current_sentence_question = None
+        st.button("📝 Cümle Boşluk Doldurma", use_container_width=True,
+                  type="primary" if st.session_state.selected_sentence_test_type == "sentence_fill_blank" else "secondary",
+                  on_click=select_sentence_test_type, args=("sentence_fill_blank",))
+
+    if st.session_state.selected_sentence_test_type == "sentence_fill_blank":
+        free_text_toggle("sentence")
 
     # Test seçilmişse soruyu göster
     if st.session_state.selected_sentence_test_type:
         st.divider()
 
         # Mevcut soruyu kontrol et, yoksa yeni soru üret
-        if "current_sentence_question" not in st.session_state or st.session_state.current_sentence_question is None:
+        if st.session_state.get("current_sentence_question") is None:
             # Test türünü dönüştür (sentence_ prefix'ini kaldır)
             test_type = st.session_state.selected_sentence_test_type.replace("sentence_", "")
-            result = generate_sentence_question(words, test_type)
+            if adaptive_selection:
+                prefetch_sentence_questions(test_type)  # İlk soru da uyarlamalı seçilir
+            state = take_prefetched_question("sentence", test_type, None)
 
-            if result[0] is None:  # Soru üretilemezse
-                st.error("Cümle sorusu üretilemiyor! Kelime listesini kontrol edin.")
-                st.session_state.selected_sentence_test_type = None
-                st.stop()
+            if state is None:
+                result = generate_sentence_question(words, test_type)
 
-            st.session_state.current_sentence_question = {
-                "question_obj": result[0],
-                "question_text": result[1],
-                "correct_answer": result[2],
-                "options": result[3],
-                "answered": False,
-                "result_message": ""
-            }
+                if result[0] is None:  # Soru üretilemezse
+                    st.error("Cümle sorusu üretilemiyor! Kelime listesini kontrol edin.")
+                    st.session_state.selected_sentence_test_type = None
+                    st.stop()
 
-        question_data = st.session_state.current_sentence_question
+                state = QuestionState(
+                    "sentence", test_type, result[3],
+                    item_id=result[0],
+                    question_text=result[1],
+                    correct_answer=result[2]
+                )
+
+            st.session_state.current_sentence_question = state
+
+        state = st.session_state.current_sentence_question
+        show_question(state)
 
         # Kelime listesini göster
         with st.expander("📝 Kullanılan Kelimeler", expanded=False):
             # Son 10 kelimeyi göster
             recent_words = words[-10:] if len(words) >= 10 else words
-            st.write(", ".join(recent_words))
+            st.write(", ".join(word_text(w) for w in recent_words))
             if len(words) > 10:
                 st.write(f"... ve {len(words) - 10} kelime daha")
 
@@ -919,67 +1333,29 @@ elif menu == "✏️ Cümle Testleri":
 
         # Soruyu göster
         st.subheader("Soru:")
-        st.write(question_data["question_text"])
+        st.write(state.question_text)
 
-        # Cevap verilmemişse seçenekleri göster
-        if not question_data["answered"]:
-            selected_answer = st.radio(
-                "Seçenekler:",
-                question_data["options"],
-                key=f"sentence_answer_radio_{st.session_state.selected_sentence_test_type}_{hash(str(question_data))}"
-            )
-
-            col1, col2 = st.columns([1, 4])
-            with col1:
-                if st.button("Cevapla", key="sentence_answer_btn", type="primary"):
-                    # Cevabı işle
-                    is_correct = selected_answer == question_data["correct_answer"]
-
-                    # Sayaçları güncelle
-                    score_data["questions_answered_today"] += 1
-                    score_data["sentence_test_answered"] += 1
-                    score_data["daily"][today_str]["sentence_test_answered"] += 1
-
-                    # Puanlama (cümle testleri için aynı puanlama)
-                    if is_correct:
-                        score_data["total_score"] += 1
-                        score_data["daily"][today_str]["score"] += 1
-                        score_data["daily"][today_str]["correct"] += 1
-                        score_data["correct_streak"] += 1
-                        score_data["wrong_streak"] = 0
-                        question_data["result_message"] = "✅ Doğru! (+1 puan)"
-                    else:
-                        score_data["daily"][today_str]["wrong"] += 1
-                        score_data["wrong_streak"] += 1
-                        score_data["correct_streak"] = 0
-                        question_data[
-                            "result_message"] = f"❌ Yanlış! Doğru cevap: **{question_data['correct_answer']}**"
-
-                    score_data["daily"][today_str]["questions_answered"] += 1
-                    question_data["answered"] = True
-                    safe_save_data()
-                    st.rerun()
+        # Cevap verilmemişse seçenekleri (veya yazılı cevap kutusunu) göster
+        if not state.answered:
+            show_answer_input(state, "sentence", submit_sentence_answer)
 
         # Cevap verildiyse sonucu göster
         else:
-            if "✅" in question_data["result_message"]:
-                st.success(question_data["result_message"])
+            if state.is_correct:
+                st.success("✅ Doğru! (+1 puan)")
             else:
-                st.error(question_data["result_message"])
+                st.error(f"❌ Yanlış! Doğru cevap: **{state.correct_answer}**")
+            show_free_text_result(state)
 
             # Sonraki soru butonu
             col1, col2 = st.columns([1, 1])
             with col1:
-                if st.button("🔄 Sonraki Cümle Sorusu", key="next_sentence_question", type="primary",
-                             use_container_width=True):
-                    st.session_state.current_sentence_question = None
-                    st.rerun()
+                st.button("🔄 Sonraki Cümle Sorusu", key="next_sentence_question", type="primary",
+                          use_container_width=True, on_click=next_sentence_question)
 
             with col2:
-                if st.button("🏠 Test Menüsüne Dön", key="back_to_sentence_menu", use_container_width=True):
-                    st.session_state.selected_sentence_test_type = None
-                    st.session_state.current_sentence_question = None
-                    st.rerun()
+                st.button("🏠 Test Menüsüne Dön", key="back_to_sentence_menu", use_container_width=True,
+                          on_click=back_to_sentence_menu)
     else:
         st.info("👆 Yukarıdaki butonlardan bir cümle test türü seçin")
 
@@ -990,12 +1366,93 @@ elif menu == "✏️ Cümle Testleri":
             cols = st.columns(5)
             for i, word in enumerate(words):
                 with cols[i % 5]:
-                    st.write(f"• {word}")
+                    st.write(f"• {word_text(word)}")
                 if (i + 1) % 10 == 0:  # Her 10 kelimede bir boşluk bırak
                     st.write("")
         else:
             st.info("Henüz kelime eklenmemiş.")
 
+# -------------------- Kelime Kartları --------------------
+
+elif menu == "🃏 Kelime Kartları":
+    st.header("🃏 Kelime Kartları")
+    st.info("Kelimelerinizin çevirisini seçin. Yanlış seçenekler benzer kelimelerden gelir.")
+
+    if len(words) < 4:
+        st.warning("⚠️ Kelime kartları için Türkçe karşılığı olan en az 4 kelime olmalı!")
+        st.stop()
+
+    if "selected_word_test_type" not in st.session_state:
+        st.session_state.selected_word_test_type = None
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.button("🇺🇸➡️🇹🇷 Kelime (EN→TR)", use_container_width=True,
+                  type="primary" if st.session_state.selected_word_test_type == "en_to_tr" else "secondary",
+                  on_click=select_word_test_type, args=("en_to_tr",))
+
+    with col2:
+        st.button("🇹🇷➡️🇺🇸 Kelime (TR→EN)", use_container_width=True,
+                  type="primary" if st.session_state.selected_word_test_type == "tr_to_en" else "secondary",
+                  on_click=select_word_test_type, args=("tr_to_en",))
+
+    if st.session_state.selected_word_test_type:
+        free_text_toggle("word")
+        st.divider()
+
+        # Mevcut kartı kontrol et, yoksa tampondan al (tampon boşsa doldurulur)
+        if st.session_state.get("current_word_question") is None:
+            test_type = st.session_state.selected_word_test_type
+            state = take_prefetched_question("word", test_type, None)
+            if state is None:
+                prefetch_word_questions(test_type)
+                state = take_prefetched_question("word", test_type, None)
+
+            if state is None:  # Kart üretilemezse
+                st.error("Kelime kartı üretilemiyor! Türkçe karşılığı olan en az 4 kelime gerekli.")
+                st.session_state.selected_word_test_type = None
+                st.stop()
+
+            st.session_state.current_word_question = state
+
+        state = st.session_state.current_word_question
+        show_question(state)
+
+        st.subheader("Kelime:")
+        st.markdown(f"### {state.question_text}")
+
+        if not state.answered:
+            show_answer_input(state, "word", submit_word_answer)
+
+        else:
+            if state.is_correct:
+                st.success("✅ Doğru! (+1 puan)")
+            else:
+                wrong_count = st.session_state.get("word_wrong_count")
+                st.error(f"❌ Yanlış! Doğru cevap: **{state.correct_answer}**"
+                         + (f" (bu kelimede {wrong_count}. yanlış)" if wrong_count else ""))
+            show_free_text_result(state)
+
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                st.button("🔄 Sonraki Kart", key="next_word_question", type="primary",
+                          use_container_width=True, on_click=next_word_question)
+
+            with col2:
+                st.button("🏠 Test Menüsüne Dön", key="back_to_word_menu", use_container_width=True,
+                          on_click=back_to_word_menu)
+    else:
+        st.info("👆 Yukarıdaki butonlardan bir yön seçin")
+
+        # En çok yanlış yapılan kelimeler
+        missed = sorted((w for w in words if isinstance(w, dict) and w.get("wrong_count", 0) > 0),
+                        key=lambda w: w["wrong_count"], reverse=True)[:10]
+        if missed:
+            st.subheader("❌ En Çok Yanlış Yapılan Kelimeler")
+            for word in missed:
+                st.write(f"• **{word['en']}** → {word.get('tr', '')} ({word['wrong_count']} yanlış)")
+
 # -------------------- Eş Anlamlı Testler --------------------
 
 elif menu == "🔗 Eş Anlamlı Testler":
@@ -1007,95 +1464,69 @@ elif menu == "🔗 Eş Anlamlı Testler":
         st.stop()
 
     # Mevcut soruyu kontrol et, yoksa yeni soru üret
-    if "current_synonym_question" not in st.session_state or st.session_state.current_synonym_question is None:
-        result = generate_synonym_question(synonyms)
-
-        if result[0] is None:  # Soru üretilemezse
-            st.error("Eş anlamlı kelime sorusu üretilemiyor!")
-            st.stop()
-
-        st.session_state.current_synonym_question = {
-            "question_obj": result[0],
-            "question_text": result[1],
-            "correct_answers": result[2],
-            "options": result[3],
-            "solution": result[4],
-            "answered": False,
-            "selected_answers": [],
-            "result_message": ""
-        }
+    if st.session_state.get("current_synonym_question") is None:
+        if adaptive_selection:
+            prefetch_synonym_questions()  # İlk soru da uyarlamalı seçilir
+        state = take_prefetched_question("synonym", None, synonym_index)
 
-    question_data = st.session_state.current_synonym_question
+        if state is None:
+            result = generate_synonym_question(synonyms, session_rng)
+
+            if result[0] is None:  # Soru üretilemezse
+                st.error("Eş anlamlı kelime sorusu üretilemiyor!")
+                st.stop()
+
+            state = QuestionState(
+                "synonym", result[0].get("type", "synonym"), result[3],
+                item_id=result[0]["id"]
+            )
+
+        st.session_state.current_synonym_question = state
+
+    state = st.session_state.current_synonym_question
+    show_question(state)
+    question = synonym_index.get(state.item_id)
+    if question is None:  # Soru silinmişse yenisini seç
+        st.session_state.current_synonym_question = None
+        st.rerun()
 
     # Soruyu göster
     st.subheader("Soru:")
-    st.write(question_data["question_text"])
+    st.write(question["question"])
 
     # Cevap verilmemişse seçenekleri göster
-    if not question_data["answered"]:
+    if not state.answered:
         st.write("**Seçenekler:** (Birden fazla seçenek işaretleyebilirsiniz)")
         
-        selected_options = []
-        for option in question_data["options"]:
-            if st.checkbox(option, key=f"synonym_option_{option}_{hash(str(question_data))}"):
-                selected_options.append(option)
-
-        question_data["selected_answers"] = selected_options
+        for i, option in enumerate(state.options):
+            st.checkbox(option, key=state.widget_key("synonym_option", f"_{i}"))
 
         col1, col2 = st.columns([1, 4])
         with col1:
-            if st.button("Cevapla", key="synonym_answer_btn", type="primary"):
-                # Cevabı işle
-                correct_answers_set = set(question_data["correct_answers"])
-                selected_answers_set = set(question_data["selected_answers"])
-                
-                is_correct = correct_answers_set == selected_answers_set
-
-                # Sayaçları güncelle
-                score_data["questions_answered_today"] += 1
-                score_data["synonym_test_answered"] += 1
-                score_data["daily"][today_str]["synonym_test_answered"] += 1
-
-                # Puanlama
-                if is_correct:
-                    score_data["total_score"] += 2  # Eş anlamlı testler 2 puan
-                    score_data["daily"][today_str]["score"] += 2
-                    score_data["daily"][today_str]["correct"] += 1
-                    score_data["correct_streak"] += 1
-                    score_data["wrong_streak"] = 0
-                    question_data["result_message"] = "✅ Doğru! (+2 puan)"
-                else:
-                    score_data["daily"][today_str]["wrong"] += 1
-                    score_data["wrong_streak"] += 1
-                    score_data["correct_streak"] = 0
-                    correct_answers_str = ", ".join(question_data["correct_answers"])
-                    question_data["result_message"] = f"❌ Yanlış! Doğru cevaplar: **{correct_answers_str}**"
-
-                score_data["daily"][today_str]["questions_answered"] += 1
-                question_data["answered"] = True
-                safe_save_data()
-                st.rerun()
+            st.button("Cevapla", key="synonym_answer_btn", type="primary",
+                      on_click=submit_synonym_answer)
 
     # Cevap verildiyse sonucu göster
     else:
-        if "✅" in question_data["result_message"]:
-            st.success(question_data["result_message"])
+        if state.is_correct:
+            st.success("✅ Doğru! (+2 puan)")
         else:
-            st.error(question_data["result_message"])
+            correct_answers_str = ", ".join(question["correct_answers"])
+            st.error(f"❌ Yanlış! Doğru cevaplar: **{correct_answers_str}**")
 
         # Çözümü göster
-        if question_data["solution"]:
+        if question.get("solution"):
             with st.expander("💡 Çözüm"):
-                st.write(question_data["solution"])
+                st.write(question["solution"])
 
         # Seçilen ve doğru cevapları karşılaştır
         with st.expander("📊 Cevap Analizi"):
             col1, col2 = st.columns(2)
             with col1:
                 st.write("**Sizin Seçtikleriniz:**")
-                if question_data["selected_answers"]:
-                    for answer in question_data["selected_answers"]:
-                        if answer in question_data["correct_answers"]:
+                if state.selected:
+                    for answer in state.selected:
+                        if answer in question["correct_answers"]:
                             st.write(f"✅ {answer}")
                         else:
                             st.write(f"❌ {answer}")
@@ -1104,51 +1535,203 @@ elif menu == "🔗 Eş Anlamlı Testler":
             
             with col2:
                 st.write("**Doğru Cevaplar:**")
-                for answer in question_data["correct_answers"]:
+                for answer in question["correct_answers"]:
                     st.write(f"✅ {answer}")
 
         # Sonraki soru butonu
         col1, col2 = st.columns([1, 1])
         with col1:
-            if st.button("🔄 Sonraki Soru", key="next_synonym_question", type="primary",
-                         use_container_width=True):
-                st.session_state.current_synonym_question = None
-                st.rerun()
+            st.button("🔄 Sonraki Soru", key="next_synonym_question", type="primary",
+                      use_container_width=True, on_click=next_synonym_question)
 
         with col2:
-            if st.button("🏠 Ana Menüye Dön", key="back_to_main_menu", use_container_width=True):
-                st.session_state.current_synonym_question = None
-                st.rerun()
+            st.button("🏠 Ana Menüye Dön", key="back_to_main_menu", use_container_width=True,
+                      on_click=next_synonym_question)
+
+# -------------------- Deneme Sınavı --------------------
+
+elif menu == "🎓 Deneme Sınavı":
+    st.header("🎓 YDS Deneme Sınavı")
+
+    section_labels = {
+        ("paragraph", "en_to_tr"): "📝 Paragraf (EN→TR)",
+        ("paragraph", "tr_to_en"): "📝 Paragraf (TR→EN)",
+        ("paragraph", "fill_blank"): "📝 Paragraf Boşluk Doldurma",
+        ("sentence", "en_to_tr"): "✏️ Cümle Çevirisi (EN→TR)",
+        ("sentence", "tr_to_en"): "✏️ Cümle Çevirisi (TR→EN)",
+        ("sentence", "fill_blank"): "✏️ Cümle Boşluk Doldurma",
+        ("synonym", "synonym"): "🔗 Eş Anlamlı",
+    }
+
+    exam = st.session_state.get("exam")
+
+    if exam is None:
+        st.info(f"Gerçek YDS gibi {blueprint_size()} soru, {EXAM_DURATION_MINUTES} dakika. "
+                "Sınav tek seferde hazırlanır, sonunda toplu puanlanır.")
+
+        st.subheader("📋 Sınav Planı")
+        for section, test_type, count in DEFAULT_BLUEPRINT:
+            st.write(f"• {section_labels.get((section, test_type), test_type)}: **{count}** soru "
+                     f"({SECTION_POINTS[section]} puan)")
+
+        st.button("🚀 Sınavı Başlat", key="start_exam", type="primary", on_click=start_exam)
+
+    elif not exam.submitted:
+        if exam.expired():
+            # Süre doldu: verilen cevaplarla otomatik teslim
+            submit_exam()
+            st.rerun()
+
+        for (section, test_type), missing in st.session_state.get("exam_shortages", {}).items():
+            st.warning(f"⚠️ {section_labels.get((section, test_type), test_type)}: "
+                       f"bankada yeterli soru yok, {missing} soru eksik.")
+
+        @st.fragment(run_every=1)
+        def exam_timer():
+            remaining = int(exam.remaining_seconds())
+            if remaining <= 0:
+                st.rerun()  # Tüm sayfa yeniden çalışır ve sınav teslim edilir
+            hours, rest = divmod(remaining, 3600)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("⏱️ Kalan Süre", f"{hours}:{rest // 60:02d}:{rest % 60:02d}")
+            with col2:
+                answered_count = sum(answer is not None for answer in exam.answers)
+                st.metric("✍️ Cevaplanan", f"{answered_count} / {len(exam)}")
+
+        exam_timer()
+        st.divider()
+
+        page = min(st.session_state.get("exam_page", 0), exam.page_count() - 1)
+        first = page * EXAM_PAGE_SIZE
+        for index in range(first, min(first + EXAM_PAGE_SIZE, len(exam))):
+            state = exam.questions[index]
+            answer = exam.answers[index]
+            st.markdown(f"**{index + 1}.** _{section_labels.get((state.section, state.test_type), '')}_")
+
+            if state.section == "paragraph":
+                paragraf = paragraph_index.get(state.item_id)
+                question = find_question(paragraf, state.question_id) if paragraf else None
+                if question is None:
+                    st.warning("Bu soru sınav sırasında silinmiş.")
+                    continue
+                with st.expander(f"📄 {paragraf['title']}"):
+                    st.write(get_text(paragraf, "paragraph"))
+                st.write(question["question"])
+            elif state.section == "sentence":
+                st.write(state.question_text)
+            else:
+                question = synonym_index.get(state.item_id)
+                if question is None:
+                    st.warning("Bu soru sınav sırasında silinmiş.")
+                    continue
+                st.write(question["question"])
+
+            if state.section == "synonym":
+                for i, option in enumerate(state.options):
+                    st.checkbox(option, value=bool(answer) and option in answer,
+                                key=state.widget_key("exam_answer", f"_{i}"),
+                                on_change=set_exam_synonym_answer, args=(index,))
+            else:
+                radio_key = state.widget_key("exam_answer")
+                st.radio("Seçenekler:", state.options, key=radio_key, label_visibility="collapsed",
+                         index=state.options.index(answer) if answer in state.options else None,
+                         on_change=set_exam_answer, args=(index, radio_key))
+            st.divider()
+
+        # Sayfalama
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("⬅️ Önceki", key="exam_prev_page", use_container_width=True,
+                      disabled=page == 0, on_click=change_exam_page, args=(-1,))
+        with col2:
+            st.write(f"Sayfa {page + 1} / {exam.page_count()}")
+        with col3:
+            st.button("Sonraki ➡️", key="exam_next_page", use_container_width=True,
+                      disabled=page >= exam.page_count() - 1, on_click=change_exam_page, args=(1,))
+
+        st.button("📤 Sınavı Bitir ve Teslim Et", key="submit_exam", type="primary",
+                  use_container_width=True, on_click=submit_exam)
+
+    else:
+        result = exam.result
+        st.success(f"✅ Sınav tamamlandı! (+{result['score']} puan)")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("✅ Doğru", result["correct_count"])
+        with col2:
+            st.metric("❌ Yanlış", result["wrong_count"])
+        with col3:
+            st.metric("⬜ Boş", result["empty_count"])
+        with col4:
+            st.metric("🎯 Başarı", f"{result['percent']:.1f}%")
+
+        section_names = {"paragraph": "📝 Paragraf", "sentence": "✏️ Cümle", "synonym": "🔗 Eş Anlamlı"}
+        st.subheader("📊 Bölüm Sonuçları")
+        st.dataframe(pd.DataFrame([
+            {"Bölüm": section_names[section], "Soru": counts["questions"], "Doğru": counts["correct"],
+             "Yanlış": counts["wrong"], "Boş": counts["questions"] - counts["correct"] - counts["wrong"]}
+            for section, counts in result["sections"].items()
+        ]), use_container_width=True, hide_index=True)
+
+        with st.expander("🔍 Cevap Anahtarı"):
+            for index, state in enumerate(exam.questions):
+                answer = result["answers"][index]
+                given = ", ".join(answer) if isinstance(answer, list) else (answer or "—")
+                mark = "✅" if result["correct"][index] else ("⬜" if not result["answered"][index] else "❌")
+                st.write(f"{mark} **{index + 1}.** Cevabınız: {given} | "
+                         f"Doğru: **{', '.join(exam.correct_options(index))}**")
+
+        st.button("🔁 Yeni Sınav", key="end_exam", type="primary", on_click=end_exam)
 
 # -------------------- İstatistikler --------------------
 
 elif menu == "📊 İstatistikler":
     st.header("📊 İstatistikler")
 
-    tab1, tab2 = st.tabs(["📈 Günlük", "📊 Genel"])
+    tab1, tab2, tab3 = st.tabs(["📈 Günlük", "📊 Genel", "⏱️ Cevap Süreleri"])
 
     with tab1:
         st.subheader("📈 Günlük İstatistikler")
-        if score_data["daily"]:
-            daily_df = pd.DataFrame.from_dict(score_data["daily"], orient="index")
-            daily_df.index = pd.to_datetime(daily_df.index)
-            daily_df = daily_df.sort_index()
+        # Ham günler ile haftalık/aylık özetler birleştirilir
+        version = history_version(score_data)
+        daily_df = cached_history_frame(score_data, version)
+        if not daily_df.empty:
+            with store.read():
+                history = history_totals(score_data)
 
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("📅 Toplam Gün", len(daily_df))
-                st.metric("❓ Toplam Soru", daily_df["questions_answered"].sum())
+                st.metric("📅 Toplam Gün", history["days"])
+                st.metric("❓ Toplam Soru", history["questions_answered"])
 
             with col2:
-                st.metric("💰 Toplam Puan", daily_df["score"].sum())
-                avg_daily = daily_df["score"].mean()
+                st.metric("💰 Toplam Puan", history["score"])
+                avg_daily = history["score"] / history["days"] if history["days"] else 0
                 st.metric("📊 Günlük Ortalama", f"{avg_daily:.1f}")
 
             st.subheader("📈 Günlük Puan Grafiği")
-            st.line_chart(daily_df["score"])
+            resolution_labels = {"daily": "📅 Günlük", "weekly": "🗓️ Haftalık", "monthly": "📆 Aylık"}
+            resolution = st.radio(
+                "Çözünürlük",
+                list(resolution_labels),
+                format_func=resolution_labels.get,
+                horizontal=True,
+                key="chart_resolution"
+            )
+            # Günlük görünümde özet satırları gün başına ortalama olarak çizilir
+            # ve uzun geçmiş şekli korunarak seyreltilir
+            st.line_chart(cached_chart_series(score_data, version, resolution))
 
             st.subheader("📋 Günlük Detay Tablosu")
-            st.dataframe(daily_df.iloc[::-1])
+            if (daily_df["period"] != "daily").any():
+                st.caption(f"ℹ️ {score_data.get('raw_history_days', DEFAULT_RAW_DAYS)} günden eski kayıtlar haftalık/aylık özet olarak gösterilir.")
+            page_count = max(1, -(-len(daily_df) // DETAIL_PAGE_SIZE))
+            page = st.number_input(f"Sayfa (toplam {page_count})", min_value=1, max_value=page_count,
+                                   value=1, step=1, key="history_page")
+            start = (int(page) - 1) * DETAIL_PAGE_SIZE
+            st.dataframe(daily_df.iloc[::-1].iloc[start:start + DETAIL_PAGE_SIZE])
         else:
             st.info("📝 Henüz günlük veri yok.")
 
@@ -1161,9 +1744,12 @@ elif menu == "📊 İstatistikler":
             st.metric("💰 Toplam Puan", score_data["total_score"])
             st.metric("📄 Paragraf Sayısı", len(paragraflar))
 
+        with store.read():
+            history = history_totals(score_data)
+
         with col2:
-            total_dogru = sum(v.get("correct", 0) for v in score_data["daily"].values())
-            total_yanlis = sum(v.get("wrong", 0) for v in score_data["daily"].values())
+            total_dogru = history["correct"]
+            total_yanlis = history["wrong"]
             st.metric("✅ Toplam Doğru", total_dogru)
             st.metric("❌ Toplam Yanlış", total_yanlis)
 
@@ -1174,14 +1760,14 @@ elif menu == "📊 İstatistikler":
             else:
                 st.metric("🎯 Genel Başarı", "0%")
 
-            aktif_gunler = len([d for d in score_data["daily"].values() if d.get("questions_answered", 0) > 0])
+            aktif_gunler = history["active_days"]
             st.metric("📅 Aktif Gün", aktif_gunler)
 
         with col4:
             combo = score_data.get("correct_streak", 0)
             st.metric("🔥 Mevcut Seri", combo)
 
-            total_soru = sum(v.get("questions_answered", 0) for v in score_data["daily"].values())
+            total_soru = history["questions_answered"]
             st.metric("❓ Toplam Soru", total_soru)
 
         # Test türlerine göre istatistikler
@@ -1197,6 +1783,7 @@ elif menu == "📊 İstatistikler":
         with col2:
             st.markdown("**✏️ Cümle Testleri:**")
             st.write(f"✏️ Toplam Cümle Testi: {score_data.get('sentence_test_answered', 0)}")
+            st.write(f"🃏 Toplam Kelime Kartı: {score_data.get('word_test_answered', 0)}")
             st.write(f"📝 Kelime Sayısı: {len(words)}")
 
         with col3:
@@ -1204,11 +1791,34 @@ elif menu == "📊 İstatistikler":
             st.write(f"🔗 Toplam Eş Anlamlı: {score_data.get('synonym_test_answered', 0)}")
             st.write(f"📚 Soru Sayısı: {len(synonyms)}")
 
+    with tab3:
+        st.subheader("⏱️ Cevap Süresi Dağılımı")
+        range_labels = {7: "Son 7 gün", 30: "Son 30 gün", None: "Tüm geçmiş"}
+        days = st.radio("Dönem", list(range_labels), format_func=range_labels.get,
+                        horizontal=True, key="response_time_range")
+        with store.read():
+            histogram_df, summary_df = response_time_stats(score_data, days, today)
+
+        if histogram_df.empty:
+            st.info("📝 Bu dönem için cevap süresi kaydı yok.")
+        else:
+            st.dataframe(summary_df, use_container_width=True)
+            selected_types = st.multiselect("Test türleri", list(histogram_df.columns),
+                                            default=list(histogram_df.columns), key="response_time_types")
+            if selected_types:
+                st.bar_chart(histogram_df[selected_types], sort=False)  # Kovalar süre sırasıyla
+            st.caption("ℹ️ Süre, sorunun ekranda ilk göründüğü andan cevaplanana kadar ölçülür.")
+
 # -------------------- İçerik Ekle --------------------
 
 elif menu == "➕ İçerik Ekle":
     st.header("➕ İçerik Ekle")
 
+    # "Yine de Kaydet" callback'inin sonucu
+    message = st.session_state.pop("content_message", None)
+    if message is not None:
+        getattr(st, message[0])(message[1])
+
     tab1, tab2, tab3, tab4 = st.tabs(["➕ Yeni Paragraf", "🔗 Eş Anlamlı Soru", "📚 İçerik Listesi", "📝 Kelime Yönetimi"])
 
     with tab1:
@@ -1239,29 +1849,29 @@ elif menu == "➕ İçerik Ekle":
 
             if submitted:
                 if title.strip() and paragraph.strip() and turkish_translation.strip():
-                    # Yeni paragraf ekle
-                    new_id = max([p.get("id", 0) for p in paragraflar], default=0) + 1
-
+                    # Yeni paragraf ekle (id depo kilidi altında verilir)
                     yeni_paragraf = {
-                        "id": new_id,
                         "title": title.strip(),
                         "paragraph": paragraph.strip(),
                         "turkish_translation": turkish_translation.strip(),
-                        "questions": [],  # Sorular ayrıca eklenecek
+                        "questions": [],  # Sorular metinden otomatik üretilir
                         "added_date": today_str,
                         "difficulty": difficulty,
                         "used_questions": []  # Kullanılan soruları takip et
                     }
 
-                    paragraflar.append(yeni_paragraf)
-
-                    if safe_save_data():
-                        st.success(f"✅ Paragraf kaydedildi: **{title}**")
+                    # Çok benzer paragraf varsa kullanıcıya sorulur
+                    matches = find_similar_items("paragraflar", yeni_paragraf)
+                    if matches:
+                        st.session_state.pending_item = ("paragraflar", yeni_paragraf, matches)
                     else:
-                        st.error("❌ Kayıt sırasında hata oluştu!")
+                        status, message = add_paragraph(yeni_paragraf)
+                        getattr(st, status)(message)
                 else:
                     st.warning("⚠️ Tüm alanları doldurun.")
 
+        show_pending_item("paragraflar")
+
     with tab2:
         st.subheader("🔗 Yeni Eş Anlamlı Soru Ekle")
 
@@ -1304,46 +1914,58 @@ elif menu == "➕ İçerik Ekle":
                     options = [opt.strip() for opt in options_text.strip().split('\n') if opt.strip()]
                     correct_answers = [ans.strip() for ans in correct_answers_text.strip().split(',') if ans.strip()]
 
-                    # Doğru cevapların seçeneklerde olup olmadığını kontrol et
-                    if all(ans in options for ans in correct_answers):
-                        new_id = max([q.get("id", 0) for q in synonyms], default=0) + 1
-
-                        yeni_soru = {
-                            "id": new_id,
-                            "type": test_type,
-                            "question": question_text.strip(),
-                            "options": options,
-                            "correct_answers": correct_answers,
-                            "solution": solution_text.strip() or f"Doğru cevaplar: {', '.join(correct_answers)}"
-                        }
-
-                        synonyms.append(yeni_soru)
+                    yeni_soru = {
+                        "type": test_type,
+                        "question": question_text.strip(),
+                        "options": options,
+                        "correct_answers": correct_answers,
+                        "solution": solution_text.strip() or f"Doğru cevaplar: {', '.join(correct_answers)}"
+                    }
 
-                        if save_synonyms(synonyms):
-                            st.success(f"✅ Eş anlamlı soru kaydedildi!")
+                    # İçe aktarmadaki kontrollerin aynısı (doğru cevaplar seçeneklerde mi, tekrar var mı)
+                    errors = synonym_errors(yeni_soru)
+                    if not errors:
+                        # Aynı kök ve seçeneklerle soru varsa kullanıcıya sorulur
+                        matches = find_similar_items("synonyms", yeni_soru)
+                        if matches:
+                            st.session_state.pending_item = ("synonyms", yeni_soru, matches)
                         else:
-                            st.error("❌ Kayıt sırasında hata oluştu!")
+                            status, message = add_synonym_question(yeni_soru)
+                            getattr(st, status)(message)
                     else:
-                        st.error("❌ Doğru cevaplar seçenekler arasında bulunmuyor!")
+                        st.error("❌ " + "; ".join(error["message"] for error in errors))
                 else:
                     st.warning("⚠️ Soru metni, seçenekler ve doğru cevaplar alanlarını doldurun.")
 
+        show_pending_item("synonyms")
+
     with tab3:
         st.subheader("📚 İçerik Listesi")
 
         # Paragraflar
         if paragraflar:
+            if st.button("🤖 Otomatik Soruları Güncelle", key="ingest_paragraphs",
+                         help="Metni değişen veya henüz işlenmemiş paragraflar için soru üretir"):
+                with store.write():
+                    updated_count = ingest_paragraphs(paragraflar)
+                    if updated_count:
+                        store.touch("paragraflar")
+                    saved = updated_count and safe_save_data()
+                if saved:
+                    st.success(f"✅ {updated_count} paragrafın soruları güncellendi!")
+                else:
+                    st.info("Tüm paragrafların soruları güncel.")
+
             st.write("**📄 Paragraflar:**")
             for i, paragraf in enumerate(paragraflar, 1):
                 with st.expander(f"{i}. {paragraf['title']} ({paragraf.get('difficulty', 'intermediate')})"):
+                    paragraph = get_text(paragraf, 'paragraph')
+                    translation = get_text(paragraf, 'turkish_translation')
                     st.write("**İngilizce:**")
-                    st.write(paragraf['paragraph'][:200] + "..." if len(paragraf['paragraph']) > 200 else paragraf[
-                        'paragraph'])
+                    st.write(paragraph[:200] + "..." if len(paragraph) > 200 else paragraph)
 
                     st.write("**Türkçe:**")
-                    st.write(
-                        paragraf['turkish_translation'][:200] + "..." if len(paragraf['turkish_translation']) > 200 else
-                        paragraf['turkish_translation'])
+                    st.write(translation[:200] + "..." if len(translation) > 200 else translation)
 
                     st.write(f"**Soru Sayısı:** {len(paragraf.get('questions', []))}")
                     st.write(f"**Kullanılan Sorular:** {len(paragraf.get('used_questions', []))}")
@@ -1352,7 +1974,7 @@ elif menu == "➕ İçerik Ekle":
                     # Kullanılan soruları sıfırla butonu
                     if paragraf.get('used_questions', []):
                         if st.button(f"🔄 Soruları Sıfırla", key=f"reset_questions_{paragraf['id']}"):
-                            paragraf['used_questions'] = []
+                            store.reset_used_questions(paragraf)
                             safe_save_data()
                             st.success("✅ Bu paragrafın kullanılan soruları sıfırlandı!")
                             st.rerun()
@@ -1370,7 +1992,7 @@ elif menu == "➕ İçerik Ekle":
 
                     # Soru silme butonu
                     if st.button(f"🗑️ Sil", key=f"delete_synonym_{soru['id']}"):
-                        synonyms.remove(soru)
+                        store.remove_item("synonyms", soru)
                         if save_synonyms(synonyms):
                             st.success("✅ Soru silindi!")
                             st.rerun()
@@ -1390,12 +2012,12 @@ elif menu == "➕ İçerik Ekle":
             with st.form("add_word_form"):
                 new_word = st.text_input("Yeni Kelime Ekle", placeholder="örn: innovation")
                 if st.form_submit_button("➕ Ekle"):
-                    if new_word.strip() and new_word.strip().lower() not in [w.lower() for w in words]:
-                        words.append(new_word.strip().lower())
+                    if new_word.strip() and store.add_items("words", [new_word.strip().lower()],
+                                                            key=lambda w: word_text(w).lower()):
                         if save_words(words):
                             st.success(f"✅ Kelime eklendi: **{new_word.strip()}**")
                             st.rerun()
-                    elif new_word.strip().lower() in [w.lower() for w in words]:
+                    elif new_word.strip().lower() in [word_text(w).lower() for w in words]:
                         st.warning("⚠️ Bu kelime zaten mevcut!")
                     else:
                         st.warning("⚠️ Geçerli bir kelime girin!")
@@ -1407,11 +2029,7 @@ elif menu == "➕ İçerik Ekle":
                 if st.form_submit_button("📝 Toplu Ekle"):
                     if bulk_words.strip():
                         new_words = [w.strip().lower() for w in bulk_words.split(",") if w.strip()]
-                        added_count = 0
-                        for word in new_words:
-                            if word and word not in [w.lower() for w in words]:
-                                words.append(word)
-                                added_count += 1
+                        added_count = store.add_items("words", new_words, key=lambda w: word_text(w).lower())
 
                         if save_words(words):
                             st.success(f"✅ {added_count} kelime eklendi!")
@@ -1422,18 +2040,17 @@ elif menu == "➕ İçerik Ekle":
         with col2:
             # Kelime silme
             if words:
-                selected_word = st.selectbox("Silmek için kelime seçin:", words)
+                selected_word = st.selectbox("Silmek için kelime seçin:", words, format_func=word_text)
                 if st.button("🗑️ Kelimeyi Sil", type="secondary"):
-                    words.remove(selected_word)
+                    store.remove_item("words", selected_word)
                     if save_words(words):
-                        st.success(f"✅ Kelime silindi: **{selected_word}**")
+                        st.success(f"✅ Kelime silindi: **{word_text(selected_word)}**")
                         st.rerun()
 
             # Tüm kelimeleri sıfırla
             if st.button("🔄 Varsayılanlara Dön", type="secondary"):
                 if st.button("⚠️ EMİNİM!", key="reset_words_confirm"):
-                    words.clear()
-                    words.extend(DEFAULT_WORDS)
+                    store.replace("words", DEFAULT_WORDS)
                     if save_words(words):
                         st.success("✅ Kelimeler varsayılana döndürüldü!")
                         st.rerun()
@@ -1445,7 +2062,7 @@ elif menu == "➕ İçerik Ekle":
             cols = st.columns(5)
             for i, word in enumerate(words):
                 with cols[i % 5]:
-                    st.write(f"• {word}")
+                    st.write(f"• {word_text(word)}")
         else:
             st.info("Henüz kelime eklenmemiş.")
 
@@ -1507,6 +2124,7 @@ elif menu == "🔧 Ayarlar":
             st.write(f"💾 Puan backup: {'✅' if os.path.exists(BACKUP_SCORE_FILE) else '❌'}")
 
             if st.button("🔄 Verileri Yenile", use_container_width=True):
+                store.invalidate()  # Dosyalardan yeniden yükle
                 st.rerun()
 
         st.divider()
@@ -1551,41 +2169,62 @@ elif menu == "🔧 Ayarlar":
                 try:
                     success_messages = []
 
-                    if uploaded_paragraflar:
-                        paragraflar_data = json.load(uploaded_paragraflar)
+                    # Listeler içe aktarılmadan önce denetlenir; hatalı dosya içe aktarılmaz
+                    uploaded_lists = {}
+                    for collection, uploaded in (("paragraflar", uploaded_paragraflar), ("words", uploaded_words),
+                                                 ("synonyms", uploaded_synonyms)):
+                        if uploaded:
+                            uploaded_lists[collection] = json.load(uploaded)
+                    report = validate_collections(
+                        {collection: items for collection, items in uploaded_lists.items() if isinstance(items, list)})
+                    rejected = {error["collection"] for error in report["errors"]}
+                    if rejected:
+                        st.error(f"❌ {report['error_count']} içerik hatası bulundu, hatalı dosyalar içe aktarılmadı:")
+                        for line in summarize(report):
+                            st.write(f"- {line}")
+                        st.download_button(
+                            "⬇️ Doğrulama Raporunu İndir",
+                            json.dumps(report, ensure_ascii=False, indent=2),
+                            "dogrulama_raporu.json",
+                            "application/json"
+                        )
+
+                    if uploaded_paragraflar and "paragraflar" not in rejected:
+                        paragraflar_data = uploaded_lists["paragraflar"]
                         if isinstance(paragraflar_data, list):
-                            paragraflar.clear()
-                            paragraflar.extend(paragraflar_data)
+                            merged_count = import_paragraphs(store, paragraflar_data)
                             success_messages.append("✅ Paragraflar içe aktarıldı!")
+                            if merged_count:
+                                success_messages.append(f"🔀 {merged_count} benzer paragraf birleştirildi.")
                         else:
                             st.error("❌ Paragraflar verisi hatalı format!")
 
                     if uploaded_puan:
                         puan_data = json.load(uploaded_puan)
                         if isinstance(puan_data, dict):
-                            score_data.clear()
-                            score_data.update(puan_data)
+                            import_scores(store, puan_data)  # Eski puan.json biçimi de kabul edilir
                             success_messages.append("✅ Puan verileri içe aktarıldı!")
                         else:
                             st.error("❌ Puan verisi hatalı format!")
 
-                    if uploaded_words:
-                        words_data = json.load(uploaded_words)
+                    if uploaded_words and "words" not in rejected:
+                        words_data = uploaded_lists["words"]
                         if isinstance(words_data, list):
-                            words.clear()
-                            words.extend(words_data)
+                            import_words(store, words_data)
                             save_words(words)
                             success_messages.append("✅ Kelimeler içe aktarıldı!")
                         else:
                             st.error("❌ Kelimeler verisi hatalı format!")
 
-                    if uploaded_synonyms:
-                        synonyms_data = json.load(uploaded_synonyms)
+                    if uploaded_synonyms and "synonyms" not in rejected:
+                        synonyms_data = uploaded_lists["synonyms"]
                         if isinstance(synonyms_data, list):
-                            synonyms.clear()
-                            synonyms.extend(synonyms_data)
-                            save_synonyms(synonyms)
+                            with store.write():
+                                merged_count = import_synonyms(store, synonyms_data)
+                                save_synonyms(synonyms)
                             success_messages.append("✅ Eş anlamlı sorular içe aktarıldı!")
+                            if merged_count:
+                                success_messages.append(f"🔀 {merged_count} benzer eş anlamlı soru atlandı.")
                         else:
                             st.error("❌ Eş anlamlı verisi hatalı format!")
 
@@ -1593,7 +2232,8 @@ elif menu == "🔧 Ayarlar":
                         safe_save_data()
                         for msg in success_messages:
                             st.success(msg)
-                        st.rerun()
+                        if not rejected:  # Hata listesi ekranda kalsın
+                            st.rerun()
 
                 except Exception as e:
                     st.error(f"❌ İçe aktarma hatası: {e}")
@@ -1602,7 +2242,8 @@ elif menu == "🔧 Ayarlar":
             st.write("**📤 Veri Dışa Aktarma:**")
 
             if st.button("📤 Paragrafları İndir", use_container_width=True):
-                paragraflar_json = json.dumps(paragraflar, ensure_ascii=False, indent=2)
+                # Metinler dosyaya satır içi yazılır (metin dosyası olmadan da içe aktarılabilir)
+                paragraflar_json = json.dumps([with_texts(p) for p in paragraflar], ensure_ascii=False, indent=2)
                 st.download_button(
                     "⬇️ paragraflar.json İndir",
                     paragraflar_json,
@@ -1639,6 +2280,125 @@ elif menu == "🔧 Ayarlar":
 
         st.divider()
 
+        st.subheader("📊 Analiz İçin Dışa Aktarma")
+        st.write(f"Günlük istatistikler ve kayıtlı oturumlardaki cevaplar `{ANALYTICS_DIR}/` klasörüne Parquet "
+                 "olarak eklenir. Her aktarımda sadece yeni günler ve yeni cevaplar yazılır "
+                 "(`python cli.py analytics` ile de çalıştırılabilir).")
+        if st.button("📊 Yeni Günleri Aktar", key="export_analytics"):
+            try:
+                with store.read():
+                    report = export_history(score_data, today=today)
+            except (OSError, ValueError) as e:
+                st.error(f"Dışa aktarma hatası: {e}")
+            else:
+                st.success(f"✅ {report['daily_rows']} gün/dönem ve {report['event_rows']} cevap olayı eklendi "
+                           f"(son aktarılan gün: {report['last_day'] or '-'})")
+
+        st.divider()
+
+        st.subheader("🗜️ Puan Geçmişi")
+        st.write(f"📅 Ham gün: {len(score_data['daily'])} | 🗓️ Haftalık özet: {len(score_data.get('weekly', {}))} | 📆 Aylık özet: {len(score_data.get('monthly', {}))}")
+        raw_days = st.number_input(
+            "Ham tutulacak gün sayısı (daha eskiler haftalık/aylık özetlenir)",
+            min_value=MIN_RAW_DAYS,
+            value=int(score_data.get("raw_history_days", DEFAULT_RAW_DAYS)),
+            step=7,
+            key="raw_history_days"
+        )
+        if st.button("🗜️ Geçmişi Sıkıştır", key="compact_history"):
+            with store.write():
+                score_data["raw_history_days"] = int(raw_days)
+                moved = compact_history(score_data, today)
+                saved = safe_save_data()
+            if saved:
+                st.success(f"✅ {moved} kayıt özetlere taşındı!")
+
+        st.divider()
+
+        st.subheader("🎯 Uyarlamalı Soru Seçimi")
+        st.write(f"🧠 Tahmini yetenek: {rating_model.ability():+.2f} | "
+                 f"📊 Derecelendirilmiş soru: {max(len(rating_model.ratings) - 1, 0)}")
+        adaptive_enabled = st.checkbox(
+            "Soruları başarı olasılığına göre seç (zorluk, cevaplara göre öğrenilir)",
+            value=adaptive_selection,
+            key="adaptive_selection"
+        )
+        target_percent = st.slider(
+            "Hedef başarı olasılığı (%)",
+            min_value=50, max_value=90,
+            value=int(round(target_success * 100)),
+            step=5,
+            key="target_success"
+        )
+        if st.button("💾 Seçim Ayarlarını Kaydet", key="save_adaptive_settings"):
+            with store.write():
+                score_data["adaptive_selection"] = adaptive_enabled
+                score_data["target_success"] = target_percent / 100
+                saved = safe_save_data()
+            if saved:
+                st.success("✅ Soru seçimi ayarları kaydedildi!")
+
+        st.divider()
+
+        st.subheader("✍️ Yazılı Cevap Eşikleri")
+        st.write("Boşluk doldurma ve kelime kartlarında yazılan cevaplar, Türkçe karakter farkları "
+                 "(ı/i, ş/s, ğ/g...) yok sayılarak doğru cevapla karşılaştırılır.")
+        settings = match_settings(score_data)
+        max_distance = st.number_input("En fazla harf hatası", min_value=0, max_value=5,
+                                       value=int(settings["max_distance"]), step=1, key="free_text_max_distance")
+        max_ratio_percent = st.slider(
+            "Cevap uzunluğuna göre en fazla hata oranı (%)",
+            min_value=0, max_value=50,
+            value=int(round(settings["max_ratio"] * 100)),
+            step=5,
+            key="free_text_max_ratio"
+        )
+        st.caption("Örnek: " + ", ".join(
+            f"{length} harfte {allowed_distance(length, max_distance, max_ratio_percent / 100)}"
+            for length in (3, 5, 8, 12)) + " hata kabul edilir")
+        if st.button("💾 Eşikleri Kaydet", key="save_free_text_settings"):
+            with store.write():
+                score_data["free_text_max_distance"] = int(max_distance)
+                score_data["free_text_max_ratio"] = max_ratio_percent / 100
+                saved = safe_save_data()
+            if saved:
+                st.success("✅ Yazılı cevap eşikleri kaydedildi!")
+
+        st.divider()
+
+        st.subheader("🎲 Oturum Tohumu ve Kaydı")
+        st.write(f"🔢 Bu oturumun tohumu: **{st.session_state.session_seed}** "
+                 f"(aynı veriyle aynı soru sırası için `?seed={st.session_state.session_seed}`)")
+        seed_input = st.number_input("Tohum", min_value=0, max_value=2 ** 32 - 1,
+                                     value=int(st.session_state.session_seed), step=1, key="seed_input")
+        if st.button("🔁 Bu Tohumla Yeniden Başlat", key="reseed_session"):
+            st.session_state.session_seed = int(seed_input)
+            session_rng.seed(st.session_state.session_seed)
+            # Önceki üreteçle hazırlanmış sorular atılır
+            st.session_state.prefetch_buffers = {}
+            for key in ("current_paragraph_question", "current_sentence_question", "current_word_question",
+                        "current_synonym_question", "active_paragraph_id"):
+                st.session_state[key] = None
+            if session_recorder is not None:  # Yeni tohumla yeni kayıt başlar
+                session_recorder.close()
+                st.session_state.session_recorder = None
+            st.rerun()
+        record_enabled = st.checkbox(
+            "Oturumları kaydet (sorular ve cevaplar oturumlar/ klasörüne, `python cli.py replay` ile oynatılır)",
+            value=bool(score_data.get("record_sessions", False)),
+            key="record_sessions"
+        )
+        if session_recorder is not None:
+            st.caption(f"📼 Kayıt: {session_recorder.path}")
+        if st.button("💾 Kayıt Ayarını Kaydet", key="save_record_setting"):
+            with store.write():
+                score_data["record_sessions"] = record_enabled
+                saved = safe_save_data()
+            if saved:
+                st.rerun()
+
+        st.divider()
+
         st.subheader("⚠️ Tehlikeli İşlemler")
         st.warning("Bu işlemler geri alınamaz!")
 
@@ -1647,9 +2407,8 @@ elif menu == "🔧 Ayarlar":
         with col1:
             if st.button("🗑️ Tüm Verileri Sıfırla", type="secondary"):
                 if st.button("⚠️ EMİNİM, SİL!", key="confirm_reset"):
-                    paragraflar.clear()
-                    score_data.clear()
-                    score_data.update({
+                    store.replace("paragraflar", [])
+                    store.replace("score_data", {
                         "total_score": 0,
                         "daily": {},
                         "last_check_date": None,
@@ -1660,7 +2419,9 @@ elif menu == "🔧 Ayarlar":
                         "tr_to_en_answered": 0,
                         "fill_blank_answered": 0,
                         "sentence_test_answered": 0,
-                        "synonym_test_answered": 0
+                        "synonym_test_answered": 0,
+                        "word_test_answered": 0,
+                        "schema_version": SCHEMA_VERSION  # Eski puan.json tekrar aktarılmasın
                     })
                     if safe_save_data():
                         st.success("✅ Tüm veriler sıfırlandı!")
@@ -1669,8 +2430,7 @@ elif menu == "🔧 Ayarlar":
         with col2:
             if st.button("🔄 Tüm Soruları Sıfırla", type="secondary"):
                 if st.button("⚠️ EMİNİM, SIFIRLA!", key="confirm_reset_questions"):
-                    for paragraf in paragraflar:
-                        paragraf["used_questions"] = []
+                    store.reset_used_questions()
                     if safe_save_data():
                         st.success("✅ Tüm paragrafların kullanılan soruları sıfırlandı!")
                         st.rerun()
@@ -1678,8 +2438,7 @@ elif menu == "🔧 Ayarlar":
         with col3:
             if st.button("🔗 Eş Anlamlıları Sıfırla", type="secondary"):
                 if st.button("⚠️ EMİNİM, VARSAYILAN!", key="confirm_reset_synonyms"):
-                    synonyms.clear()
-                    synonyms.extend(DEFAULT_SYNONYMS)
+                    store.replace("synonyms", DEFAULT_SYNONYMS)
                     if save_synonyms(synonyms):
                         st.success("✅ Eş anlamlı sorular varsayılana döndürüldü!")
                         st.rerun()
@@ -0,0 +1,380 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from datetime import date
+
+from analytics_export import ANALYTICS_DIR, FORMATS, export_history
+from answer_match import DEFAULT_MAX_DISTANCE, DEFAULT_MAX_RATIO, rematch_sessions
+from api_server import QuizService
+from data_files import (create_zip_backup, import_paragraphs, import_scores, import_synonyms, import_words,
+                        load_data, restore_from_zip, track_data_files)
+from migrations import SCHEMA_VERSION
+from paragraph_schema import ParagraphBank
+from paragraph_store import PARAGRAPH_TEXT_FILE, with_texts
+from ratings import RATINGS_FILE, RatingModel
+from score_history import history_totals
+from session_log import replay_session
+from store import get_store
+from validation import summarize, validate_collections, validate_store
+
+# -------------------- Komut Satırı --------------------
+# Streamlit sunucusu olmadan toplu içerik ve veri işlemleri (gece işleri,
+# büyük bankalar). Arayüzle aynı dosyaları, depoyu ve içe aktarma/yedekleme
+# fonksiyonlarını (bkz. data_files) kullanır; çalışan uygulama süreçleriyle
+# aynı anda çalışabilir (kayıtlar birleştirilerek yazılır).
+#
+#   python cli.py import paragraflar yeni.jsonl --append
+#   python cli.py export paragraflar -o paragraflar.jsonl --jsonl
+#   python cli.py validate --report rapor.json
+#   python cli.py backup -o yedekler/
+#   python cli.py restore yds_backup_20250101_120000.zip
+#   python cli.py stats --json
+#   python cli.py replay oturumlar/20250101_120000_000000_42.jsonl --report tekrar.json
+#   python cli.py match oturumlar/*.jsonl --max-distance 1 --max-ratio 0.2
+#   python cli.py analytics -o /paylasilan/analiz --learner ayse
+#
+# JSONL (satır başına bir kayıt) dosyaları satır satır okunur ve yazılır;
+# JSON dizileri dışa aktarımda da kayıt kayıt yazılır.
+
+# Komut satırındaki adlar -> depodaki koleksiyon adları
+COLLECTIONS = {
+    "paragraflar": "paragraflar",
+    "puan": "score_data",
+    "kelimeler": "words",
+    "es_anlamli": "synonyms",
+}
+
+QUESTION_TYPES = ("en_to_tr", "tr_to_en", "fill_blank")
+
+
+def open_store():
+    """Dosyaları depoya yükle; şema geçişi olduysa sonucu hemen kaydet"""
+    store = get_store()
+    track_data_files(store)
+    if load_data(store):
+        for name in ("paragraflar", "score_data", "synonyms"):
+            store.save_file(name)
+    return store
+
+
+# -------------------- Okuma / Yazma --------------------
+
+def _read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from None
+
+
+def read_items(path):
+    """Dosyadaki kayıtlar: .jsonl satır satır okunur, diğerleri JSON dizisi olarak"""
+    if path.endswith(".jsonl"):
+        return _read_jsonl(path)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: JSON dizisi bekleniyordu")
+    return data
+
+
+def write_items(items, out, jsonl=False, transform=None):
+    """Kayıtları tek tek yaz (çıktının tamamı bellekte oluşturulmaz)"""
+    count = 0
+    if not jsonl:
+        out.write("[")
+    for item in items:
+        if transform is not None:
+            item = transform(item)
+        if jsonl:
+            out.write(json.dumps(item, ensure_ascii=False) + "\n")
+        else:
+            # JSON metinlerinde ham satır sonu olmaz: girinti güvenle eklenir
+            text = json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            out.write((",\n  " if count else "\n  ") + text)
+        count += 1
+    if not jsonl:
+        out.write("\n]\n" if count else "]\n")
+    return count
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def print_report(report):
+    for line in summarize(report, limit=20):
+        print(line)
+    print(f"{report['error_count']} sorun bulundu." if report["error_count"] else "Sorun bulunamadı.")
+
+
+# -------------------- Komutlar --------------------
+
+def cmd_import(args):
+    name = COLLECTIONS[args.collection]
+    store = open_store()
+    if name == "score_data":
+        with open(args.file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"{args.file}: JSON nesnesi bekleniyordu")
+        import_scores(store, data)
+        store.save_file("score_data")
+        print("Puan verileri içe aktarıldı.")
+        return 0
+
+    items = read_items(args.file)
+    if args.validate:
+        # Dosya içe aktarılmadan önce denetlenir; hata varsa depoya dokunulmaz
+        items = list(items)
+        report = validate_collections({name: items})
+        if args.report:
+            write_report(report, args.report)
+        if report["error_count"]:
+            print_report(report)
+            print("İçe aktarma iptal edildi.")
+            return 1
+    if name == "paragraflar":
+        merged = import_paragraphs(store, items, append=args.append)
+        store.save_file("paragraflar")
+        print(f"{len(store.paragraflar)} paragraf ({merged} benzer paragraf birleştirildi).")
+    elif name == "synonyms":
+        merged = import_synonyms(store, items, append=args.append)
+        store.save_file("synonyms")
+        print(f"{len(store.synonyms)} eş anlamlı soru ({merged} benzer soru atlandı).")
+    else:
+        added = import_words(store, items, append=args.append)
+        store.save_file("words")
+        print(f"{added} kelime içe aktarıldı (toplam {len(store.words)}).")
+    return 0
+
+
+def cmd_export(args):
+    name = COLLECTIONS[args.collection]
+    store = open_store()
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        with store.read():
+            if name == "score_data":
+                json.dump(store.score_data, out, ensure_ascii=False, indent=2)
+                out.write("\n")
+                count = 1
+            else:
+                # Paragraf metinleri satır içine alınır (metin dosyası olmadan da içe aktarılabilir)
+                transform = with_texts if name == "paragraflar" else None
+                count = write_items(getattr(store, name), out, args.jsonl, transform)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.output:
+        print(f"{count} kayıt yazıldı: {args.output}")
+    return 0
+
+
+def cmd_validate(args):
+    store = open_store()
+    report = validate_store(store, workers=args.workers)
+    # Şema sürümü kayıt bazında değil, puan dosyası için denetlenir
+    version = store.score_data.get("schema_version", 0)
+    report["schema_version"] = version
+    if version != SCHEMA_VERSION:
+        report["errors"].insert(0, {
+            "collection": "score_data", "index": None, "id": None, "question_id": None,
+            "code": "schema_version", "message": f"Şema sürümü {version}, beklenen {SCHEMA_VERSION}",
+        })
+        report["error_count"] += 1
+    if args.report:
+        write_report(report, args.report)
+    print_report(report)
+    return 1 if report["error_count"] else 0
+
+
+def cmd_backup(args):
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    print(create_zip_backup(args.output_dir))
+    return 0
+
+
+def cmd_restore(args):
+    restore_from_zip(args.file, get_store())
+    print(f"Geri yüklendi: {args.file}")
+    return 0
+
+
+def collect_stats(store):
+    """İçerik ve puan özetleri"""
+    bank = ParagraphBank(store.paragraflar)
+    score_data = store.score_data
+    return {
+        "paragraphs": len(store.paragraflar),
+        "paragraph_questions": {test_type: len(bank.question_refs(test_type)) for test_type in QUESTION_TYPES},
+        "words": len(store.words),
+        "synonyms": len(store.synonyms),
+        "text_file_bytes": os.path.getsize(PARAGRAPH_TEXT_FILE) if os.path.exists(PARAGRAPH_TEXT_FILE) else 0,
+        "total_score": score_data.get("total_score", 0),
+        "today": score_data.get("daily", {}).get(date.today().strftime("%Y-%m-%d"), {}),
+        "history": history_totals(score_data),
+    }
+
+
+def _print_stats(stats, indent=""):
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            print(f"{indent}{key}:")
+            _print_stats(value, indent + "  ")
+        else:
+            print(f"{indent}{key}: {value}")
+
+
+def cmd_stats(args):
+    store = open_store()
+    with store.read():
+        stats = collect_stats(store)
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+    else:
+        _print_stats(stats)
+    return 0
+
+
+def cmd_replay(args):
+    store = get_store()
+    track_data_files(store)
+    load_data(store)  # Tekrar sadece bellekte çalışır: veri dosyalarına yazılmaz
+    # Cevaplar derece modelinin geçici kopyasına işlenir
+    with tempfile.TemporaryDirectory() as directory:
+        ratings_path = os.path.join(directory, RATINGS_FILE)
+        if os.path.exists(RATINGS_FILE):
+            shutil.copyfile(RATINGS_FILE, ratings_path)
+        service = QuizService(store, ratings=RatingModel(ratings_path))
+        with store.read():
+            service.bank = ParagraphBank(store.paragraflar)
+        report = replay_session(args.file, service)
+    if args.report:
+        write_report(report, args.report)
+
+    if not report["data_matches"]:
+        print("Uyarı: veri kayıttaki veriyle aynı değil (kayıt sayıları farklı).")
+    print(f"Tohum {report['seed']}: {report['questions']} soru ({report['matched']} aynı seçildi, "
+          f"{report['diverged']} farklı), {report['answers']} cevap ({report['answer_mismatches']} farklı sonuç)")
+    for name, timing in report["timings"].items():
+        print(f"  {name}: {timing['count']} adım, medyan {timing['median_ms']} ms, en uzun {timing['max_ms']} ms")
+    failed = report["answer_mismatches"] or (args.strict and report["diverged"])
+    return 1 if failed else 0
+
+
+def cmd_match(args):
+    report = rematch_sessions(args.files, args.max_distance, args.max_ratio)
+    if args.report:
+        write_report(report, args.report)
+
+    print(f"{report['sessions']} oturum, {report['answers']} yazılı cevap "
+          f"(eşik: {report['max_distance']} harf, %{report['max_ratio'] * 100:.0f}): "
+          f"{report['exact']} tam, {report['close']} yakın, {report['wrong']} yanlış")
+    if report["answers"]:
+        print(f"Cevap başına ortalama {report['mean_us']} µs")
+    print(f"Kayıttakinden farklı: {report['newly_accepted']} yeni kabul, {report['newly_rejected']} yeni red")
+    for change in report["changed"][:10]:
+        print(f"  {change['file']} #{change['serial']}: {change['answer']!r} ~ {change['expected']!r} -> "
+              f"{change['verdict']}")
+    return 0
+
+
+def cmd_analytics(args):
+    store = open_store()
+    with store.read():
+        report = export_history(store.score_data, args.output_dir or ANALYTICS_DIR, args.learner, args.format)
+    print(f"{report['learner']}: {report['daily_rows']} gün/dönem, {report['event_rows']} cevap olayı yazıldı "
+          f"(son aktarılan gün: {report['last_day'] or '-'})")
+    for path in report["files"]:
+        print(f"  {path}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="YDS veri dosyaları için toplu işlemler")
+    parser.add_argument("--data-dir", default=".", help="Veri dosyalarının bulunduğu klasör")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("import", help="JSON/JSONL dosyasından içe aktar")
+    command.add_argument("collection", choices=COLLECTIONS)
+    command.add_argument("file")
+    command.add_argument("--append", action="store_true", help="Mevcut verinin yerine geçmek yerine ekle")
+    command.add_argument("--validate", action="store_true", help="Önce denetle, hata varsa içe aktarma")
+    command.add_argument("--report", help="Doğrulama raporunun yazılacağı JSON dosyası")
+    command.set_defaults(handler=cmd_import)
+
+    command = commands.add_parser("export", help="Koleksiyonu JSON/JSONL olarak dışa aktar")
+    command.add_argument("collection", choices=COLLECTIONS)
+    command.add_argument("-o", "--output", help="Çıktı dosyası (verilmezse standart çıktı)")
+    command.add_argument("--jsonl", action="store_true", help="Satır başına bir kayıt yaz")
+    command.set_defaults(handler=cmd_export)
+
+    command = commands.add_parser("validate", help="Veri dosyalarını denetle")
+    command.add_argument("--report", help="Raporun yazılacağı JSON dosyası")
+    command.add_argument("--workers", type=int, help="Paralel denetimde süreç sayısı")
+    command.set_defaults(handler=cmd_validate)
+
+    command = commands.add_parser("backup", help="ZIP yedeği oluştur")
+    command.add_argument("-o", "--output-dir", help="ZIP'in yazılacağı klasör")
+    command.set_defaults(handler=cmd_backup)
+
+    command = commands.add_parser("restore", help="ZIP yedeğini geri yükle")
+    command.add_argument("file")
+    command.set_defaults(handler=cmd_restore)
+
+    command = commands.add_parser("stats", help="İçerik ve puan özetini göster")
+    command.add_argument("--json", action="store_true", help="JSON olarak yaz")
+    command.set_defaults(handler=cmd_stats)
+
+    command = commands.add_parser("replay", help="Oturum kaydını yeniden oynat")
+    command.add_argument("file")
+    command.add_argument("--report", help="Raporun yazılacağı JSON dosyası")
+    command.add_argument("--strict", action="store_true", help="Farklı seçilen soru varsa da hata kodu döndür")
+    command.set_defaults(handler=cmd_replay)
+
+    command = commands.add_parser("match", help="Kayıtlı yazılı cevapları başka eşiklerle yeniden eşleştir")
+    command.add_argument("files", nargs="+")
+    command.add_argument("--max-distance", type=int, default=DEFAULT_MAX_DISTANCE, help="En fazla harf hatası")
+    command.add_argument("--max-ratio", type=float, default=DEFAULT_MAX_RATIO,
+                         help="Cevap uzunluğuna göre en fazla hata oranı")
+    command.add_argument("--report", help="Raporun yazılacağı JSON dosyası")
+    command.set_defaults(handler=cmd_match)
+
+    command = commands.add_parser("analytics", help="Günlük istatistikleri ve cevapları Parquet/Arrow'a ekle")
+    command.add_argument("-o", "--output-dir", help=f"Veri kümesi klasörü (varsayılan: {ANALYTICS_DIR})")
+    command.add_argument("--learner", help="Öğrenci adı (varsayılan: veri klasörünün adı)")
+    command.add_argument("--format", choices=FORMATS, default="parquet")
+    command.set_defaults(handler=cmd_analytics)
+
+    args = parser.parse_args(argv)
+    # Dosya argümanları çalıştırıldığı klasöre göredir, veri klasörüne geçmeden çözülür
+    for attr in ("file", "output", "output_dir", "report"):
+        if getattr(args, attr, None):
+            setattr(args, attr, os.path.abspath(getattr(args, attr)))
+    if getattr(args, "files", None):
+        args.files = [os.path.abspath(path) for path in args.files]
+    os.chdir(args.data_dir)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:  # Çıktı okuyan komut erken kapandı (örn. head)
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+import json
+import os
+import shutil
+import zipfile
+from datetime import datetime
+
+from answer_match import DEFAULT_MAX_DISTANCE, DEFAULT_MAX_RATIO
+from dedup import merge_near_duplicates, paragraph_text, synonym_text
+from file_sync import file_lock, keep_ours, merge_items_by_key, merge_reset_counter, merge_set, merge_with_rules
+from migrations import convert_legacy_score, empty_daily_entry, is_legacy_score, migrate
+from paragraph_ingest import ingest_paragraphs
+from paragraph_schema import compile_paragraph_bank, merge_paragraph
+from paragraph_store import PARAGRAPH_TEXT_FILE, detach_texts
+from questions import assign_item_ids
+from ratings import DEFAULT_TARGET_SUCCESS
+from score_history import DEFAULT_RAW_DAYS, compact_history
+from sentence_engine import word_text
+
+# -------------------- Veri Dosyaları --------------------
+# Streamlit arayüzü, HTTP API ve komut satırı aynı dosyaları aynı depo
+# (bkz. store) üzerinden kullanır. Bu modül arayüzden bağımsızdır.
+
+DATA_FILE = "paragraflar.json"
+SCORE_FILE = "puan_paragraf.json"
+WORDS_FILE = "kelimeler.json"
+SYNONYM_FILE = "es_anlamli.json"  # Eş anlamlı kelimeler
+BACKUP_DATA_FILE = "paragraflar_backup.json"
+BACKUP_SCORE_FILE = "puan_paragraf_backup.json"
+
+# ZIP yedeğine yazılma sırası: metin dosyası JSON'lardan sonra eklenir ki
+# yedekteki paragrafların text_ref'leri yedekteki metin dosyasında bulunsun
+BACKUP_FILES = (DATA_FILE, SCORE_FILE, WORDS_FILE, SYNONYM_FILE, BACKUP_DATA_FILE, BACKUP_SCORE_FILE,
+                PARAGRAPH_TEXT_FILE)
+BACKUP_VERSION = "3.0"
+
+IMPORT_CHUNK_SIZE = 1000  # İçe aktarmada metinler bu kadar paragrafta bir metin dosyasına taşınır
+
+DAILY_RESET_COUNTERS = (
+    "en_to_tr_answered",
+    "tr_to_en_answered",
+    "fill_blank_answered",
+    "sentence_test_answered",
+    "synonym_test_answered",
+    "word_test_answered",
+)
+
+
+def default_score_data():
+    """Boş puan verisi (yüklenen dosyadaki bilinen anahtarlar bunun üzerine yazılır)"""
+    return {
+        "total_score": 0,
+        "daily": {},
+        "last_check_date": None,
+        "questions_answered_today": 0,
+        "correct_streak": 0,
+        "wrong_streak": 0,
+        "en_to_tr_answered": 0,
+        "tr_to_en_answered": 0,
+        "fill_blank_answered": 0,
+        "sentence_test_answered": 0,  # Yeni sayaç
+        "synonym_test_answered": 0,   # Yeni sayaç
+        "word_test_answered": 0,      # Kelime kartları (bkz. word_quiz)
+        "schema_version": 0,          # Uygulanmış şema geçişi sayısı (bkz. migrations)
+        "weekly": {},                 # Haftalık özetler (bkz. score_history)
+        "monthly": {},                # Aylık özetler
+        "raw_history_days": DEFAULT_RAW_DAYS,
+        "history_version": 0,         # Grafik önbelleği anahtarı
+        "adaptive_selection": False,  # Uyarlamalı soru seçimi (bkz. ratings)
+        "target_success": DEFAULT_TARGET_SUCCESS,
+        "record_sessions": False,     # Oturum kaydı (bkz. session_log)
+        "free_text_max_distance": DEFAULT_MAX_DISTANCE,  # Yazılı cevap eşikleri (bkz. answer_match)
+        "free_text_max_ratio": DEFAULT_MAX_RATIO
+    }
+
+
+# Süreçler arası birleştirmede sayaç olmayan alanlar (bkz. file_sync.merge_values).
+# Puan verisinin üst düzeyinde sadece SCORE_COUNTERS farkla toplanır; günlük
+# sıfırlanan sayaçlar sıfırlamayı dikkate alır, seriler ve ayarlar (şema
+# sürümü dahil) son yazanın değerini alır. Günlük/haftalık/aylık kayıtlardaki
+# tüm sayılar sayaçtır.
+SCORE_COUNTERS = ("total_score", "history_version")
+PARAGRAPH_MERGE_RULES = {"used_questions": merge_set}
+SCORE_MERGE_RULES = {
+    **{key: keep_ours for key, value in default_score_data().items()
+       if isinstance(value, (int, float)) and not isinstance(value, bool) and key not in SCORE_COUNTERS},
+    "questions_answered_today": merge_reset_counter,
+    **{counter: merge_reset_counter for counter in DAILY_RESET_COUNTERS},
+}
+
+
+def track_data_files(store):
+    """Depodaki koleksiyonları dosyalarına ve birleştirme kurallarına bağla"""
+    store.track("paragraflar", DATA_FILE, merge_items_by_key("id", PARAGRAPH_MERGE_RULES))
+    store.track("score_data", SCORE_FILE, merge_with_rules(SCORE_MERGE_RULES))
+    store.track("words", WORDS_FILE, merge_items_by_key(lambda w: word_text(w).lower()))
+    store.track("synonyms", SYNONYM_FILE, merge_items_by_key("id"))
+
+
+def ensure_today(score_data, today):
+    """Gün değiştiyse günlük sayaçları sıfırla ve bugünün kaydını aç.
+
+    Değişiklik yapıldıysa True döner (kaydedilmesi gerekir).
+    """
+    today_str = today.strftime("%Y-%m-%d")
+    changed = False
+    if "daily" not in score_data:
+        score_data["daily"] = {}
+        changed = True
+
+    if score_data.get("last_check_date") != today_str:
+        # Yeni gün için sıfırla
+        score_data["questions_answered_today"] = 0
+        score_data["last_check_date"] = today_str
+        score_data["correct_streak"] = 0
+        score_data["wrong_streak"] = 0
+        for counter in DAILY_RESET_COUNTERS:
+            score_data[counter] = 0
+        # Ham tutma süresini aşan günleri haftalık/aylık özetlere taşı
+        compact_history(score_data, today)
+        changed = True
+
+    if today_str not in score_data["daily"]:
+        score_data["daily"][today_str] = empty_daily_entry()
+        changed = True
+    return changed
+
+
+def load_data(store):
+    """Arayüzsüz yükleme: dosyaları depoya oku, şema geçişlerini uygula.
+
+    Eksik dosyalar boş veriyle başlar (varsayılan içerik arayüzde oluşturulur).
+    Kaydedilmesi gereken bir değişiklik olduysa True döner.
+    """
+    with store.write():
+        paragraflar = store.load_file("paragraflar") or []
+        score_data = default_score_data()
+        loaded_score = store.load_file("score_data") or {}
+        for key in score_data:
+            if key in loaded_score:
+                score_data[key] = loaded_score[key]
+        words = store.load_file("words") or []
+        synonyms = store.load_file("synonyms") or []
+
+        changed = migrate(paragraflar, score_data) > 0
+        if assign_item_ids(synonyms):
+            changed = True
+        store.set_data(paragraflar, score_data, words, synonyms)
+        return changed
+
+
+# -------------------- Yedekleme --------------------
+
+def create_zip_backup(directory=None):
+    """Veri ve yedek dosyalarını zaman damgalı bir ZIP'e yaz; ZIP'in yolunu döner"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    zip_filename = f"yds_backup_{timestamp}.zip"
+    if directory:
+        zip_filename = os.path.join(directory, zip_filename)
+
+    with zipfile.ZipFile(zip_filename, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for path in BACKUP_FILES:
+            if os.path.exists(path):
+                zipf.write(path)
+
+        # Meta bilgi dosyası
+        meta_info = {
+            "backup_date": timestamp,
+            "version": BACKUP_VERSION,
+            "files": [DATA_FILE, SCORE_FILE, WORDS_FILE, SYNONYM_FILE, PARAGRAPH_TEXT_FILE]
+        }
+        zipf.writestr("backup_info.json", json.dumps(meta_info, ensure_ascii=False, indent=2))
+    return zip_filename
+
+
+def restore_from_zip(zip_file, store):
+    """ZIP yedeğini çalışma klasörüne aç; depo sonraki kullanımda dosyalardan yeniden yüklenir.
+
+    Her dosya önce geçici dosyaya açılıp os.replace ile yerine konur: metin
+    dosyası ParagraphTexts tarafından mmap ile açık olabilir, yerinde üzerine
+    yazmak okuyanı SIGBUS ile düşürebilir. Yeni inode sayesinde eşleme
+    (inode, boyut) kontrolüyle yeniden açılır.
+    """
+    with zipfile.ZipFile(zip_file, "r") as zipf:
+        for member in zipf.infolist():
+            path = member.filename
+            # Yedekte sadece çalışma klasöründeki düz dosyalar bulunur
+            if member.is_dir() or os.path.basename(path) != path or path in ("", ".", ".."):
+                continue
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with zipf.open(member) as source, open(temp_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+            with file_lock(path, exclusive=True):  # Eş zamanlı ekleme eski dosyaya yazılmasın
+                os.replace(temp_path, path)
+    store.invalidate()
+
+
+# -------------------- İçe Aktarma --------------------
+# İçe aktarılan veriler depodaki koleksiyonun yerine geçer (append=True ile
+# mevcut verilere eklenir). Fonksiyonlar kaydetmez; çağıran taraf ilgili
+# koleksiyonu kaydeder.
+
+def _chunks(items, size=IMPORT_CHUNK_SIZE):
+    chunk = []
+    for item in items:
+        if isinstance(item, dict):
+            chunk.append(item)
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_paragraphs(store, items, append=False):
+    """Paragrafları içe aktar: normalize et, benzerleri birleştir, soruları üret.
+
+    items herhangi bir yinelenebilir olabilir (örn. JSONL'den satır satır
+    okunan kayıtlar): metinler okundukça parça parça metin dosyasına
+    taşınır, bellekte sadece üst veriler birikir. Eklemede gelen id'ler yok
+    sayılır. Birleştirilen benzer paragraf sayısını döner.
+    """
+    imported = []
+    for chunk in _chunks(items):
+        if append:
+            for paragraf in chunk:
+                paragraf.pop("id", None)
+        detach_texts(chunk)
+        imported.extend(chunk)
+
+    with store.write():
+        store.replace("paragraflar", (list(store.paragraflar) if append else []) + imported)
+        paragraflar = store.paragraflar
+        compile_paragraph_bank(paragraflar)
+        # Benzer paragraflar birleştirilir (elle yazılmış sorular korunur)
+        merged_count = merge_near_duplicates(paragraflar, paragraph_text, merge_paragraph)
+        detach_texts(paragraflar)  # Normalizasyonda satır içi eklenen metinler
+        ingest_paragraphs(paragraflar)
+        store.touch("paragraflar")  # Birleştirme ve üretilen sorular indeksi değiştirir
+    return merged_count
+
+
+def import_synonyms(store, items, append=False):
+    """Eş anlamlı soruları içe aktar; atlanan benzer soru sayısını döner"""
+    imported = [item for chunk in _chunks(items) for item in chunk]
+    if append:
+        for question in imported:
+            question.pop("id", None)
+    with store.write():
+        store.replace("synonyms", (list(store.synonyms) if append else []) + imported)
+        merged_count = merge_near_duplicates(store.synonyms, synonym_text)
+        assign_item_ids(store.synonyms)
+    return merged_count
+
+
+def import_words(store, items, append=False):
+    """Kelimeleri içe aktar; eklemede sadece olmayan kelimeler eklenir. Eklenen sayıyı döner"""
+    imported = [item for item in items if isinstance(item, (str, dict))]
+    with store.write():
+        if append:
+            return store.add_items("words", imported, key=lambda w: word_text(w).lower())
+        store.replace("words", imported)
+        return len(imported)
+
+
+def import_scores(store, data):
+    """Puan verisini içe aktar (eski puan.json biçimi de kabul edilir)"""
+    if is_legacy_score(data):
+        data = convert_legacy_score(data)
+    with store.write():
+        store.replace("score_data", data)
+        migrate(store.paragraflar, store.score_data)
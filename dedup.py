@@ -0,0 +1,170 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from paragraph_store import get_text
+
+# -------------------- Benzer İçerik Tespiti --------------------
+# Paragraf metinleri ve eş anlamlı soruların (soru kökü + seçenekler)
+# normalize edilmiş kelime 3-gram kümeleri MinHash imzalarıyla özetlenir.
+# İmzalar LSH bantlarına bölünüp kovalara yerleştirilir; yeni bir metin
+# sadece aynı kovaya düşen adaylarla karşılaştırılır (tüm bankayla değil).
+# Benzerlik, imzalardaki eşit değerlerin oranıyla (Jaccard tahmini) ölçülür.
+#
+# NUM_PERM = BANDS x ROWS. 16 bant x 4 satırda Jaccard ~0.5 üzerindeki
+# çiftler büyük olasılıkla aday olur; DUPLICATE_THRESHOLD altındakiler elenir.
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3             # Kelime n-gram uzunluğu
+DUPLICATE_THRESHOLD = 0.8    # Bu tahmini benzerlik ve üstü "benzer" sayılır
+
+_PRIME = (1 << 31) - 1
+_seed = np.random.default_rng(20240611)  # Sabit tohum: imzalar süreçler arasında aynı
+_PERM_A = _seed.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_PERM_B = _seed.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_tokens(text):
+    """Küçük harfe çevrilmiş, noktalamadan arındırılmış kelimeler"""
+    return TOKEN_PATTERN.findall((text or "").casefold())
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Metnin kelime n-gram kümesi (kısa metinlerde metnin tamamı)"""
+    tokens = normalize_tokens(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(text):
+    """Metnin MinHash imzası (boş metinde None)"""
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+    return ((hashes[:, None] * _PERM_A + _PERM_B) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def similarity(signature_a, signature_b):
+    """İki imzadan tahmini Jaccard benzerliği"""
+    return float(np.count_nonzero(signature_a == signature_b)) / NUM_PERM
+
+
+def paragraph_text(paragraf):
+    """Paragrafın karşılaştırılan metni"""
+    return get_text(paragraf, "paragraph")
+
+
+def synonym_text(question):
+    """Eş anlamlı sorunun karşılaştırılan metni: kök + (sırasız) seçenekler.
+
+    Kökler çoğunlukla aynı kalıptadır; seçenekler eklenmezse farklı kelimeler
+    için sorulan sorular da benzer görünür.
+    """
+    return " ".join([question.get("question") or ""] + sorted(question.get("options") or []))
+
+
+class NearDuplicateIndex:
+    """Kimlik -> MinHash imzası ve LSH kovaları"""
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.signatures = {}                          # kimlik -> imza
+        self.buckets = [{} for _ in range(BANDS)]     # bant -> {bant baytları: {kimlik, ...}}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    @staticmethod
+    def _bands(signature):
+        return [band.tobytes() for band in signature.reshape(BANDS, ROWS)]
+
+    def add(self, key, text):
+        """Metni kimliğiyle indeksle (kimlik varsa yenilenir)"""
+        self.remove(key)
+        signature = minhash(text)
+        if signature is None:
+            return
+        self.signatures[key] = signature
+        for bucket, band in zip(self.buckets, self._bands(signature)):
+            bucket.setdefault(band, set()).add(key)
+
+    def remove(self, key):
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for bucket, band in zip(self.buckets, self._bands(signature)):
+            members = bucket.get(band)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del bucket[band]
+
+    def query(self, text, exclude=None):
+        """Metne benzeyen kayıtlar: [(kimlik, benzerlik), ...] (en benzer önce)"""
+        signature = minhash(text)
+        if signature is None:
+            return []
+        candidates = set()
+        for bucket, band in zip(self.buckets, self._bands(signature)):
+            candidates |= bucket.get(band, set())
+        candidates.discard(exclude)
+        matches = []
+        for key in candidates:
+            score = similarity(signature, self.signatures[key])
+            if score >= self.threshold:
+                matches.append((key, score))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def sync(self, items, text_of):
+        """Index'i id'li öğe listesine eşitle (sadece eklenen/silinen id'ler işlenir)"""
+        current = {item["id"]: item for item in items if isinstance(item, dict) and "id" in item}
+        for key in [key for key in self.signatures if key not in current]:
+            self.remove(key)
+        for key, item in current.items():
+            if key not in self.signatures:
+                self.add(key, text_of(item))
+        return self
+
+
+def merge_near_duplicates(items, text_of, merge=None, threshold=DUPLICATE_THRESHOLD):
+    """Listede birbirine benzeyen öğelerden ilkini tut, diğerlerini çıkar.
+
+    merge(tutulan, çıkarılan) verilirse çıkarılan öğe önce tutulana
+    birleştirilir. Liste yerinde değiştirilir; çıkarılan öğe sayısı döner.
+    """
+    index = NearDuplicateIndex(threshold)
+    kept = []
+    removed = 0
+    for item in items:
+        text = text_of(item)
+        matches = index.query(text)
+        if matches:
+            if merge is not None:
+                merge(kept[matches[0][0]], item)
+            removed += 1
+            continue
+        index.add(len(kept), text)
+        kept.append(item)
+    items[:] = kept
+    return removed
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_duplicate_index(name, items, text_of):
+    """Süreç genelinde paylaşılan, koleksiyona eşitlenmiş benzerlik index'i"""
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = _indexes[name] = NearDuplicateIndex()
+        return index.sync(items, text_of)
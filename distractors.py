@@ -0,0 +1,316 @@
+import os
+import threading
+import zlib
+
+import numpy as np
+
+from sentence_engine import prepare_word_pairs
+
+# -------------------- Çeldirici Motoru --------------------
+# Her kelime için karakter 3-gram, uzunluk ve kelime türü benzerliğine göre
+# önceden hesaplanmış bir yanlış seçenek havuzu tutulur. Benzerlikler NumPy
+# matrisleriyle blok blok hesaplanır; soru anında çeldirici seçimi sadece
+# havuzdan okuma (O(1)) işlemidir. Yeni kelimeler eklendiğinde sadece yeni
+# satırlar hesaplanır ve eski havuzlar vektörel olarak güncellenir.
+
+DISTRACTOR_CACHE_FILE = "kelime_celdiriciler.npz"
+
+NGRAM_DIM = 256      # 3-gram'ların hash'lendiği vektör boyutu
+POOL_SIZE = 8        # Kelime başına saklanan çeldirici sayısı
+BLOCK_SIZE = 256     # Benzerlik matrisi bu kadar satırlık bloklarla hesaplanır
+
+NGRAM_WEIGHT = 0.6
+LENGTH_WEIGHT = 0.2
+POS_WEIGHT = 0.2
+
+POS_CODES = {"noun": 0, "verb": 1, "adj": 2, "adv": 3}
+MAX_LENGTH = 31  # Daha uzun kelimeler bu uzunlukta sayılır
+
+
+def _shape_table():
+    """(uzunluk, tür) kodları arası benzerlik tablosu.
+
+    Uzunluk benzerliği min(a, b) / max(a, b); tür eşleşmesi sabit ağırlık.
+    """
+    lengths = np.repeat(np.arange(1, MAX_LENGTH + 1, dtype=np.float32), len(POS_CODES))
+    pos = np.tile(np.arange(len(POS_CODES)), MAX_LENGTH)
+    table = LENGTH_WEIGHT * (np.minimum.outer(lengths, lengths) / np.maximum.outer(lengths, lengths))
+    table += POS_WEIGHT * np.equal.outer(pos, pos)
+    return table.astype(np.float32)
+
+
+SHAPE_TABLE = _shape_table()
+
+
+def shape_code(word, pos):
+    """Kelimenin (uzunluk, tür) kodu"""
+    return (min(max(len(word), 1), MAX_LENGTH) - 1) * len(POS_CODES) + POS_CODES.get(pos, 0)
+
+
+def ngram_vector(word, dim=NGRAM_DIM):
+    """Kelimenin hash'lenmiş, normalize karakter 3-gram vektörü"""
+    vector = np.zeros(dim, dtype=np.float32)
+    padded = f"^{word.lower()}$"
+    for i in range(len(padded) - 2):
+        vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class DistractorIndex:
+    """Kelime -> benzer yanlış seçenekler havuzu"""
+
+    def __init__(self, pool_size=POOL_SIZE):
+        self.pool_size = pool_size
+        self.vocab = []          # İngilizce kelimeler (satır sırası)
+        self.row_of = {}         # kelime -> satır
+        self.tr_of = []          # satırdaki kelimenin Türkçe karşılığı (veya None)
+        self.features = np.zeros((0, NGRAM_DIM), dtype=np.float32)
+        self.shape = np.zeros(0, dtype=np.int16)  # (uzunluk, tür) kodu
+        self.meaning = np.zeros(0, dtype=np.int32)  # aynı Türkçe karşılık -> aynı kod (-1: yok)
+        self.pools = np.zeros((0, pool_size), dtype=np.int32)
+        self.scores = np.zeros((0, pool_size), dtype=np.float32)
+        self._meaning_codes = {}
+        self._next_meaning = 0
+        self._translated = None  # Türkçe karşılığı olan satırlar (değişiklikte yeniden hesaplanır)
+
+    def __len__(self):
+        return len(self.vocab)
+
+    # ---------- benzerlik ----------
+
+    def _same_meaning_groups(self):
+        """Aynı Türkçe karşılığı paylaşan satır grupları (kod -> satırlar)"""
+        codes, inverse, counts = np.unique(self.meaning, return_inverse=True, return_counts=True)
+        groups = {}
+        for row in np.flatnonzero((counts[inverse] > 1) & (self.meaning >= 0)):
+            groups.setdefault(int(self.meaning[row]), []).append(row)
+        return {code: np.array(rows) for code, rows in groups.items()}
+
+    def _similarity(self, rows, start=0, groups=None):
+        """rows satırlarının start'tan sonraki tüm sütunlarla benzerlik matrisi"""
+        sims = self.features[rows] @ (NGRAM_WEIGHT * self.features[start:]).T
+
+        # Uzunluk ve tür benzerliği küçük bir tablodan tek geçişte eklenir
+        sims += SHAPE_TABLE[self.shape[rows][:, None], self.shape[None, start:]]
+
+        # Kendisi ve aynı anlama gelen kelimeler çeldirici olamaz
+        own = (rows >= start)
+        sims[np.flatnonzero(own), rows[own] - start] = -np.inf
+        for i, row in enumerate(rows):
+            same = (groups or {}).get(int(self.meaning[row]))
+            if same is not None:
+                same = same[same >= start]
+                sims[i, same - start] = -np.inf
+        return sims
+
+    def _top_k(self, sims):
+        """Her satır için en benzer pool_size sütun (skora göre azalan)"""
+        k = min(self.pool_size, sims.shape[1])
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        pools = np.full((sims.shape[0], self.pool_size), -1, dtype=np.int32)
+        scores = np.full((sims.shape[0], self.pool_size), -np.inf, dtype=np.float32)
+        pools[:, :k] = top
+        scores[:, :k] = top_scores
+        pools[~np.isfinite(scores)] = -1
+        return pools, scores
+
+    def _compute_rows(self, rows, groups):
+        """Verilen satırların havuzlarını bloklar halinde yeniden hesapla"""
+        for start in range(0, len(rows), BLOCK_SIZE):
+            block = rows[start:start + BLOCK_SIZE]
+            self.pools[block], self.scores[block] = self._top_k(self._similarity(block, groups=groups))
+
+    # ---------- güncelleme ----------
+
+    def _meaning_code(self, tr):
+        """Türkçe karşılığın kodu; aynı karşılığa sahip kelimeler aynı kodu alır"""
+        if not tr:
+            return -1
+        key = tr.lower()
+        if key not in self._meaning_codes:
+            self._meaning_codes[key] = self._next_meaning
+            self._next_meaning += 1
+        return self._meaning_codes[key]
+
+    def add_words(self, words):
+        """Yeni kelimeleri ekle; sadece yeni satırlar hesaplanır"""
+        new_entries = []
+        for en, tr, pos in prepare_word_pairs(words):
+            key = en.lower()
+            if key not in self.row_of:
+                self.row_of[key] = len(self.vocab) + len(new_entries)
+                new_entries.append((en, tr, pos))
+        if not new_entries:
+            return 0
+
+        self._translated = None
+        old_count = len(self.vocab)
+        for en, tr, _ in new_entries:
+            self.vocab.append(en)
+            self.tr_of.append(tr)
+
+        self.features = np.vstack([self.features, np.stack([ngram_vector(e[0]) for e in new_entries])])
+        self.shape = np.concatenate([self.shape, np.array([shape_code(e[0], e[2]) for e in new_entries],
+                                                          dtype=np.int16)])
+        codes = [self._meaning_code(e[1]) for e in new_entries]
+        self.meaning = np.concatenate([self.meaning, np.array(codes, dtype=np.int32)])
+
+        self.pools = np.vstack([self.pools, np.full((len(new_entries), self.pool_size), -1, dtype=np.int32)])
+        self.scores = np.vstack([self.scores, np.full((len(new_entries), self.pool_size), -np.inf, dtype=np.float32)])
+
+        new_rows = np.arange(old_count, len(self.vocab))
+        groups = self._same_meaning_groups()
+        self._compute_rows(new_rows, groups)
+
+        # Eski kelimelerin havuzlarını yeni kelimelerle birleştir
+        if old_count:
+            old_rows = np.arange(old_count)
+            for start in range(0, old_count, BLOCK_SIZE):
+                block = old_rows[start:start + BLOCK_SIZE]
+                sims = self._similarity(block, old_count, groups)
+                merged_pools = np.hstack([self.pools[block], np.broadcast_to(new_rows, sims.shape)])
+                merged_scores = np.hstack([self.scores[block], sims])
+                order = np.argsort(-merged_scores, axis=1)[:, :self.pool_size]
+                pools = np.take_along_axis(merged_pools, order, axis=1)
+                scores = np.take_along_axis(merged_scores, order, axis=1)
+                pools[~np.isfinite(scores)] = -1
+                self.pools[block], self.scores[block] = pools, scores
+        return len(new_entries)
+
+    def remove_words(self, keys):
+        """Kelimeleri çıkar; sadece çıkan kelimeyi havuzunda tutan satırlar yeniden hesaplanır"""
+        removed = np.array(sorted(self.row_of[k] for k in keys if k in self.row_of), dtype=np.int32)
+        if not len(removed):
+            return 0
+
+        self._translated = None
+        keep = np.ones(len(self.vocab), dtype=bool)
+        keep[removed] = False
+        new_row = np.cumsum(keep) - 1
+
+        affected = np.isin(self.pools, removed).any(axis=1)[keep]
+        self.vocab = [w for w, k in zip(self.vocab, keep) if k]
+        self.tr_of = [t for t, k in zip(self.tr_of, keep) if k]
+        self.row_of = {w.lower(): i for i, w in enumerate(self.vocab)}
+        self.features = self.features[keep]
+        self.shape = self.shape[keep]
+        self.meaning = self.meaning[keep]
+        pools = self.pools[keep]
+        self.pools = np.where(pools >= 0, new_row[np.maximum(pools, 0)], -1).astype(np.int32)
+        self.scores = self.scores[keep]
+
+        if len(self.vocab):
+            self._compute_rows(np.flatnonzero(affected), self._same_meaning_groups())
+        return len(removed)
+
+    def sync(self, words):
+        """Index'i güncel kelime listesine eşitle (artımlı).
+
+        Türkçe karşılığı veya türü değişen kelimeler çıkarılıp yeniden eklenir.
+        """
+        current = {}
+        for en, tr, pos in prepare_word_pairs(words):
+            current.setdefault(en.lower(), (tr, shape_code(en, pos)))  # add_words gibi ilk kayıt geçerli
+        removed = [key for key, row in self.row_of.items()
+                   if current.get(key) != (self.tr_of[row], self.shape[row])]
+        changed = self.remove_words(removed)
+        changed += self.add_words(words)
+        return changed
+
+    # ---------- sorgu ----------
+
+    def pool(self, word):
+        """Kelimenin çeldirici havuzu (en benzer önce)"""
+        row = self.row_of.get(word.lower())
+        if row is None:
+            return []
+        return [self.vocab[i] for i in self.pools[row] if i >= 0]
+
+    def pick(self, word, count, rng):
+        """Havuzdan rastgele count çeldirici seç"""
+        candidates = self.pool(word)
+        return rng.sample(candidates, min(count, len(candidates)))
+
+    def translated_rows(self):
+        """Türkçe karşılığı olan satırların dizisi (kelime kartları için)"""
+        if self._translated is None:
+            self._translated = np.array([row for row, tr in enumerate(self.tr_of) if tr], dtype=np.int32)
+        return self._translated
+
+    def translation(self, word):
+        """Index'teki kelimenin Türkçe karşılığı"""
+        row = self.row_of.get(word.lower())
+        return self.tr_of[row] if row is not None else None
+
+    # ---------- önbellek ----------
+
+    def save(self, path=DISTRACTOR_CACHE_FILE):
+        """Index'i diske kaydet"""
+        np.savez_compressed(
+            path,
+            # Sabit genişlikli unicode diziler: yüklerken pickle gerekmez
+            vocab=np.array(self.vocab, dtype=str),
+            tr=np.array([t or "" for t in self.tr_of], dtype=str),
+            features=self.features, shape=self.shape,
+            meaning=self.meaning, pools=self.pools, scores=self.scores,
+        )
+
+    @classmethod
+    def load(cls, path=DISTRACTOR_CACHE_FILE, pool_size=POOL_SIZE):
+        """Diskteki index'i yükle (yoksa veya bozuksa boş index)"""
+        index = cls(pool_size)
+        if not os.path.exists(path):
+            return index
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if data["pools"].shape[1] != pool_size or data["features"].shape[1] != NGRAM_DIM:
+                    return index
+                index.vocab = [str(w) for w in data["vocab"]]
+                index.tr_of = [str(t) or None for t in data["tr"]]
+                index.features = data["features"]
+                index.shape = data["shape"]
+                index.meaning = data["meaning"]
+                index.pools = data["pools"]
+                index.scores = data["scores"]
+        except (OSError, ValueError, KeyError):
+            return cls(pool_size)
+        index.row_of = {w.lower(): i for i, w in enumerate(index.vocab)}
+        for tr, code in zip(index.tr_of, index.meaning):
+            if tr and code >= 0:
+                index._meaning_codes[tr.lower()] = int(code)
+        index._next_meaning = int(index.meaning.max(initial=-1)) + 1
+        return index
+
+
+_index = None
+_index_lock = threading.Lock()
+_synced = None  # Son eşitlenen kelime listesi ve sürümü
+
+
+def get_distractor_index(words, version=None):
+    """Süreç genelinde paylaşılan, kelime listesine eşitlenmiş index.
+
+    version kelime listesinin depo sürümüdür (bkz. store.DataStore.version);
+    liste ve sürüm değişmedikçe yeniden eşitlenmez, böylece soru başına
+    maliyet kelime sayısından bağımsızdır. version verilmezse her çağrıda
+    eşitlenir.
+    """
+    global _index, _synced
+    signature = (id(words), version) if version is not None else None
+    with _index_lock:
+        if _index is None:
+            _index = DistractorIndex.load()
+        if signature is None or signature != _synced:
+            if _index.sync(words):
+                try:
+                    _index.save()
+                except OSError:
+                    pass
+            _synced = signature
+        return _index
@@ -0,0 +1,193 @@
+import random
+import time
+
+import numpy as np
+
+from questions import QuestionState
+from sentence_engine import generate_sentence_questions
+
+# -------------------- YDS Deneme Sınavı --------------------
+# Sınav, bölüm/tür başına soru sayısını veren bir plana (blueprint) göre tek
+# seferde hazırlanır. Paragraf soruları ParagraphBank'in tür indeksinden,
+# eş anlamlı sorular listeden toplu örneklenir (rng.sample); cümle soruları
+# tek bir toplu generate_sentence_questions çağrısıyla üretilir. Banka
+# büyüklüğünden bağımsız olarak sadece seçilen sorular işlenir.
+#
+# Hazırlık sırasında cevap anahtarı (soru x seçenek) boolean matrisi olarak
+# çıkarılır; teslimde cevaplar aynı biçime çevrilip tüm sınav tek numpy
+# işlemiyle puanlanır. Tek doğrulu ve çok doğrulu (eş anlamlı) sorular aynı
+# kuralla değerlendirilir: işaretlenen seçenekler anahtarla birebir aynı olmalı.
+
+EXAM_DURATION_MINUTES = 180
+EXAM_PAGE_SIZE = 10
+
+# (bölüm, test türü, soru sayısı) -- toplam 80 soru, gerçek YDS gibi
+DEFAULT_BLUEPRINT = (
+    ("paragraph", "en_to_tr", 15),
+    ("paragraph", "tr_to_en", 15),
+    ("paragraph", "fill_blank", 10),
+    ("sentence", "en_to_tr", 10),
+    ("sentence", "tr_to_en", 10),
+    ("sentence", "fill_blank", 10),
+    ("synonym", "synonym", 10),
+)
+
+SECTIONS = ("paragraph", "sentence", "synonym")
+SECTION_POINTS = {"paragraph": 1, "sentence": 1, "synonym": 2}
+
+
+def blueprint_size(blueprint=DEFAULT_BLUEPRINT):
+    """Plandaki toplam soru sayısı"""
+    return sum(count for _, _, count in blueprint)
+
+
+class Exam:
+    """Hazırlanmış sınav: sorular, cevap anahtarı matrisi ve süre"""
+
+    def __init__(self, questions, answer_key, duration_minutes, started_at=None):
+        self.questions = questions            # [QuestionState, ...]
+        self.answer_key = answer_key          # (soru, seçenek) bool matrisi
+        self.section_codes = np.array([SECTIONS.index(q.section) for q in questions], dtype=np.int8)
+        self.points = np.array([SECTION_POINTS[q.section] for q in questions], dtype=np.int16)
+        self.duration = duration_minutes * 60
+        self.started_at = time.time() if started_at is None else started_at
+        self.answers = [None] * len(questions)  # Soru sırasına göre verilen cevaplar
+        self.result = None                    # Teslimden sonra score() sonucu
+
+    def __len__(self):
+        return len(self.questions)
+
+    @property
+    def submitted(self):
+        return self.result is not None
+
+    def remaining_seconds(self, now=None):
+        """Kalan süre (saniye, en az 0)"""
+        now = time.time() if now is None else now
+        return max(0.0, self.started_at + self.duration - now)
+
+    def expired(self, now=None):
+        return self.remaining_seconds(now) <= 0
+
+    def page_count(self, page_size=EXAM_PAGE_SIZE):
+        return max(1, -(-len(self.questions) // page_size))
+
+    def correct_options(self, index):
+        """Sorunun doğru seçenekleri (cevap anahtarından)"""
+        state = self.questions[index]
+        return [option for option, is_key in zip(state.options, self.answer_key[index]) if is_key]
+
+    def selection_matrix(self, answers):
+        """Cevapları (soru sırasına göre seçenek metni, liste veya None) matrise çevir"""
+        selected = np.zeros_like(self.answer_key)
+        for row, (state, answer) in enumerate(zip(self.questions, answers)):
+            if answer is None:
+                continue
+            chosen = answer if isinstance(answer, (list, tuple)) else (answer,)
+            for option in chosen:
+                if option in state.options:
+                    selected[row, state.options.index(option)] = True
+        return selected
+
+    def score(self, answers=None):
+        """Tüm sınavı tek geçişte puanla ve sonucu sakla"""
+        answers = self.answers if answers is None else answers
+        selected = self.selection_matrix(answers)
+        answered = selected.any(axis=1)
+        correct = answered & (selected == self.answer_key).all(axis=1)
+        wrong = answered & ~correct
+
+        sections = {}
+        correct_by_section = np.bincount(self.section_codes, weights=correct, minlength=len(SECTIONS))
+        wrong_by_section = np.bincount(self.section_codes, weights=wrong, minlength=len(SECTIONS))
+        total_by_section = np.bincount(self.section_codes, minlength=len(SECTIONS))
+        for code, section in enumerate(SECTIONS):
+            if total_by_section[code]:
+                sections[section] = {
+                    "questions": int(total_by_section[code]),
+                    "correct": int(correct_by_section[code]),
+                    "wrong": int(wrong_by_section[code]),
+                }
+
+        self.result = {
+            "correct": correct,
+            "answered": answered,
+            "answers": list(answers),
+            "correct_count": int(correct.sum()),
+            "wrong_count": int(wrong.sum()),
+            "empty_count": int((~answered).sum()),
+            "score": int(self.points[correct].sum()),
+            "percent": float(100.0 * correct.mean()) if len(correct) else 0.0,
+            "sections": sections,
+        }
+        return self.result
+
+
+def _paragraph_questions(bank, test_type, count, rng):
+    """Paragraf bankasının tür indeksinden toplu soru örnekle"""
+    refs = bank.question_refs(test_type)
+    picked = []
+    for paragraph_id, position in rng.sample(refs, min(count, len(refs))):
+        question = bank.questions_of(paragraph_id, test_type)[position]
+        options = list(question["options"])
+        rng.shuffle(options)
+        picked.append((
+            QuestionState("paragraph", test_type, options, item_id=paragraph_id,
+                          question_id=question.get("id"), question_key=question.get("id")),
+            (question["correct_answer"],),
+        ))
+    return picked
+
+
+def _sentence_questions(words, test_type, count, rng, distractors):
+    """Tek toplu çağrıyla cümle soruları üret"""
+    generated = generate_sentence_questions(words, test_type, count, rng=rng, distractors=distractors)
+    return [
+        (QuestionState("sentence", test_type, options, question_text=question, correct_answer=correct_answer),
+         (correct_answer,))
+        for question, correct_answer, options in generated
+    ]
+
+
+def _synonym_questions(synonyms, count, rng):
+    """Eş anlamlı soruları toplu örnekle"""
+    picked = []
+    for question in rng.sample(synonyms, min(count, len(synonyms))):
+        options = list(question["options"])
+        rng.shuffle(options)
+        picked.append((
+            QuestionState("synonym", question.get("type", "synonym"), options, item_id=question.get("id")),
+            tuple(question["correct_answers"]),
+        ))
+    return picked
+
+
+def build_exam(bank, words, synonyms, blueprint=DEFAULT_BLUEPRINT, duration_minutes=EXAM_DURATION_MINUTES,
+               rng=random, distractors=None):
+    """Plana göre sınavı tek seferde hazırla.
+
+    Bankada yeterli soru olmayan bölümler mevcut soru kadar doldurulur.
+    (Exam, {(bölüm, tür): eksik soru sayısı}) döner.
+    """
+    picked = []
+    shortages = {}
+    for section, test_type, count in blueprint:
+        if section == "paragraph":
+            items = _paragraph_questions(bank, test_type, count, rng)
+        elif section == "sentence":
+            items = _sentence_questions(words, test_type, count, rng, distractors)
+        else:
+            items = _synonym_questions(synonyms, count, rng)
+        if len(items) < count:
+            shortages[(section, test_type)] = count - len(items)
+        picked.extend(items)
+
+    # Cevap anahtarı matrisi: satır soru, sütun seçenek sırası
+    width = max((len(state.options) for state, _ in picked), default=0)
+    answer_key = np.zeros((len(picked), width), dtype=bool)
+    for row, (state, correct_answers) in enumerate(picked):
+        for column, option in enumerate(state.options):
+            if option in correct_answers:
+                answer_key[row, column] = True
+
+    return Exam([state for state, _ in picked], answer_key, duration_minutes), shortages
@@ -0,0 +1,327 @@
+import gc
+import json
+import marshal
+import os
+import struct
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: süreçler arası kilit yok, tek süreçte çalışılır
+    fcntl = None
+
+# -------------------- Süreçler Arası Dosya Senkronizasyonu --------------------
+# Aynı klasörde çalışan birden fazla Streamlit süreci veri dosyalarını
+# paylaşır. Her dosya için yan kilit dosyası (<dosya>.lock) üzerinde
+# fcntl.flock ile okumada paylaşımlı, yazmada özel kilit alınır.
+#
+# Süreç, dosyayı en son okuduğu/yazdığı andaki içeriği (base) ve dosya
+# imzasını (mtime, boyut, inode) saklar. Kayıt sırasında dosya başka bir
+# süreç tarafından değiştirilmişse üç yönlü birleştirme yapılır: diskteki
+# içerik + bu sürecin base'e göre yaptığı değişiklikler. Böylece son yazan
+# diğerlerinin güncellemelerini silmez. Her çalıştırmada sadece imzası
+# değişen dosyalar yeniden okunur.
+#
+# Büyük, girintili JSON'u her açılışta ayrıştırmak yavaştır. Her başarılı
+# okuma/yazmadan sonra dosyanın yanına ikili bir kopya (<dosya>.snapshot:
+# başlık + marshal) yazılır. marshal sadece JSON'un tiplerini (dict, list,
+# str, sayı, bool, None) taşır ve pickle'dan hem hızlı yazılır hem hızlı
+# açılır. Başlıkta marshal sürümü ve kopyanın üretildiği JSON dosyasının
+# imzası bulunur; okumada ikisi de tutuyorsa JSON yerine kopya açılır,
+# tutmuyorsa (dosya elle/başka araçla değişti, Python sürümü değişti, kopya
+# bozuk vb.) JSON okunur ve kopya yenilenir. JSON her zaman asıl kaynaktır.
+
+SNAPSHOT_SUFFIX = ".snapshot"
+SNAPSHOT_MAGIC = b"YDSSNAP1"
+SNAPSHOT_HEADER = struct.Struct("<8sIqQQ")  # magic, marshal sürümü, mtime_ns, boyut, inode
+
+
+def file_signature(path):
+    """Dosya değişikliğini anlamak için ucuz imza (yoksa None)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+@contextmanager
+def file_lock(path, exclusive):
+    """Dosyanın yan kilit dosyası üzerinde flock al"""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def replace_in_place(target, data):
+    """Liste/sözlük içeriğini nesneyi değiştirmeden yenile"""
+    target.clear()
+    if isinstance(target, dict):
+        target.update(data)
+    else:
+        target.extend(data)
+
+
+# -------------------- İkili Kopya --------------------
+
+def read_snapshot(path, signature):
+    """JSON dosyasının imzası tutan ikili kopyasının marshal baytları (yoksa None)"""
+    if signature is None:
+        return None
+    try:
+        with open(path + SNAPSHOT_SUFFIX, "rb") as f:
+            header = f.read(SNAPSHOT_HEADER.size)
+            if len(header) != SNAPSHOT_HEADER.size or SNAPSHOT_HEADER.unpack(header) != (SNAPSHOT_MAGIC, marshal.version, *signature):
+                return None
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_snapshot(path, signature, blob):
+    """İkili kopyayı atomik yaz; yazılamazsa sessizce geç (JSON asıl kaynak)"""
+    if signature is None:
+        return
+    temp_path = f"{path}{SNAPSHOT_SUFFIX}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, marshal.version, *signature))
+            f.write(blob)
+        os.replace(temp_path, path + SNAPSHOT_SUFFIX)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def dump_blob(data):
+    return marshal.dumps(data)
+
+
+def load_blob(blob):
+    """marshal baytlarını aç; çok sayıda küçük nesne oluşurken GC çalıştırılmaz"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return marshal.loads(blob)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# -------------------- Üç Yönlü Birleştirme --------------------
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _empty_like(value):
+    if isinstance(value, dict):
+        return {}
+    return 0 if _is_number(value) else None
+
+
+# Sayılar varsayılan olarak sayaç kabul edilir ve farkla birleştirilir. Sayaç
+# olmayan alanlar için kayıt düzeyinde (sadece en üst anahtarlarda; örn. puan
+# verisinin günlük kayıtlarındaki aynı adlı alanlar yine sayaçtır) kurallar
+# verilebilir: {alan adı: kural(base, ours, theirs)}. Kurallar sadece iki süreç
+# de alanı değiştirdiyse çağrılır.
+
+def keep_ours(base, ours, theirs):
+    """Son yazan kazanır (seriler gibi toplanamayan değerler)"""
+    return ours
+
+
+def merge_reset_counter(base, ours, theirs):
+    """Günlük sıfırlanan sayaç: base'den küçük olan taraf sıfırlamış, 0'dan saymıştır.
+
+    Sadece bir taraf sıfırladıysa diğerinin artışları önceki güne aittir.
+    """
+    if not (_is_number(base) and _is_number(ours) and _is_number(theirs)):
+        return ours
+    our_reset, their_reset = ours < base, theirs < base
+    if our_reset and their_reset:
+        return ours + theirs
+    if our_reset or their_reset:
+        return ours if our_reset else theirs
+    return theirs + (ours - base)
+
+
+def merge_set(base, ours, theirs):
+    """Küme gibi kullanılan liste: bizim eklediklerimiz ve sildiklerimiz theirs'e uygulanır"""
+    if not (isinstance(base, list) and isinstance(ours, list) and isinstance(theirs, list)):
+        return ours
+    removed = [value for value in base if value not in ours]
+    merged = [value for value in theirs if value not in removed]
+    merged += [value for value in ours if value not in base and value not in merged]
+    return merged
+
+
+def merge_values(base, ours, theirs, rules=None):
+    """base'den ours'a yapılan değişiklikleri theirs üzerine uygula.
+
+    Sayılar farkla (theirs + ours - base), sözlükler anahtar bazında
+    birleştirilir; diğer değerlerde bizim değiştirdiğimiz değer kazanır.
+    rules verilirse bu sözlüğün anahtarlarında (iç içe olanlarda değil)
+    varsayılan yerine alanın kuralı kullanılır.
+    """
+    if ours == base:
+        return theirs
+    if theirs == base:
+        return ours
+    if _is_number(base) and _is_number(ours) and _is_number(theirs):
+        return theirs + (ours - base)
+    if isinstance(base, dict) and isinstance(ours, dict) and isinstance(theirs, dict):
+        rules = rules or {}
+        merged = dict(theirs)
+        for key in set(base) | set(ours):
+            if key not in ours:
+                merged.pop(key, None)  # Bu süreç sildi
+            elif key not in base:
+                # İki süreç de eklediyse (örn. aynı günün kaydı) boş değer taban alınır
+                merged[key] = ours[key] if key not in theirs else merge_values(
+                    _empty_like(ours[key]), ours[key], theirs[key])
+            elif key in theirs:
+                if key in rules and ours[key] != base[key] and theirs[key] != base[key]:
+                    merged[key] = rules[key](base[key], ours[key], theirs[key])
+                else:
+                    merged[key] = merge_values(base[key], ours[key], theirs[key])
+            elif ours[key] != base[key]:
+                merged[key] = ours[key]  # Diğer süreç sildi, biz değiştirdik
+        return merged
+    return ours
+
+
+def merge_with_rules(rules):
+    """Alan kurallarıyla merge_values kullanan birleştirici (tek kayıtlık dosyalar için)"""
+    def merge(base, ours, theirs):
+        return merge_values(base, ours, theirs, rules)
+
+    return merge
+
+
+def merge_items_by_key(key, rules=None):
+    """Öğe listeleri için birleştirici: öğeler key(item) ile eşleştirilir.
+
+    key bir alan adıysa (örn. "id") o alan kullanılır. Bu sürecin eklediği
+    ve diskte aynı anahtarla farklı içerikte bulunan öğeye yeni id verilir.
+    rules: öğe alanlarının birleştirme kuralları (bkz. merge_values).
+    """
+    if isinstance(key, str):
+        field = key
+
+        def key(item):
+            return item.get(field) if isinstance(item, dict) else item
+    else:
+        field = None
+
+    def merge(base, ours, theirs):
+        base_items = {key(item): item for item in base}
+        our_items = {key(item): item for item in ours}
+        merged = []
+        merged_by_key = {}
+        for item in theirs:
+            item_key = key(item)
+            if item_key in base_items and item_key not in our_items:
+                continue  # Bu süreç sildi
+            if item_key in our_items and item_key in base_items:
+                item = merge_values(base_items[item_key], our_items[item_key], item, rules)
+            merged.append(item)
+            merged_by_key[item_key] = item
+
+        next_id = None
+        for item in ours:
+            item_key = key(item)
+            if item_key in base_items:
+                continue  # Yukarıda birleştirildi (veya diğer süreç sildi)
+            if item_key in merged_by_key:
+                if field is None or merged_by_key[item_key] == item:
+                    continue  # Aynı öğe iki süreçte de eklenmiş
+                # Diğer süreç aynı id ile başka öğe eklemiş: yeni id ver
+                if next_id is None:
+                    next_id = max((i.get(field, 0) for i in merged if isinstance(i.get(field), int)),
+                                  default=0) + 1
+                item[field] = next_id
+                next_id += 1
+            merged.append(item)
+            merged_by_key[key(item)] = item
+        return merged
+
+    return merge
+
+
+# -------------------- Senkronize Dosya --------------------
+
+class SyncedFile:
+    """Kilitli okuma, birleştirmeli yazma ve değişiklik takibi yapılan JSON dosyası"""
+
+    def __init__(self, path, merge):
+        self.path = path
+        self.merge = merge
+        self.signature = None   # En son okunan/yazılan halin imzası
+        self.base_blob = None   # En son okunan/yazılan içerik, marshal baytları (birleştirme tabanı)
+
+    def changed(self):
+        """Dosya bu süreç dışında değişti mi?"""
+        return file_signature(self.path) != self.signature
+
+    def _read_text(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _read_current(self, signature):
+        """Diskteki içerik ve marshal baytları: imzası tutan ikili kopyadan, yoksa JSON'dan"""
+        blob = read_snapshot(self.path, signature)
+        if blob is not None:
+            try:
+                return load_blob(blob), blob
+            except Exception:
+                pass  # Bozuk/uyumsuz kopya: JSON'a dön
+        data = json.loads(self._read_text())
+        blob = dump_blob(data)
+        write_snapshot(self.path, signature, blob)
+        return data, blob
+
+    def load(self):
+        """Dosyayı paylaşımlı kilitle oku; dosya yoksa None döner"""
+        with file_lock(self.path, exclusive=False):
+            signature = file_signature(self.path)
+            if signature is None:
+                self.signature = None
+                self.base_blob = None
+                return None
+            data, self.base_blob = self._read_current(signature)
+            self.signature = signature
+            return data
+
+    def save(self, data):
+        """Özel kilitle kaydet; dosya başka süreçte değiştiyse önce birleştir.
+
+        Birleştirme sonucu data'ya yerinde yazılır. Birleştirme yapıldıysa
+        True döner.
+        """
+        merged = False
+        with file_lock(self.path, exclusive=True):
+            signature = file_signature(self.path)
+            if signature != self.signature and signature is not None:
+                theirs, _ = self._read_current(signature)
+                base = load_blob(self.base_blob) if self.base_blob is not None else type(data)()
+                replace_in_place(data, self.merge(base, data, theirs))
+                merged = True
+
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, self.path)  # Okuyucular yarım dosya görmez
+            self.signature = file_signature(self.path)
+            self.base_blob = dump_blob(data)
+            write_snapshot(self.path, self.signature, self.base_blob)
+        return merged
@@ -0,0 +1,173 @@
+import json
+import os
+
+from paragraph_ingest import ingest_paragraphs
+from paragraph_schema import normalize_paragraphs
+from paragraph_store import detach_texts
+
+# -------------------- Şema Geçişleri --------------------
+# Puan dosyasındaki schema_version, verinin hangi geçişlerden geçtiğini
+# tutar. Geçişler sırayla ve sadece bir kez uygulanır; sonuç normal kayıtla
+# diske yazıldığı için sonraki yüklemelerde kayıt bazında düzeltme yapılmaz.
+# Paragraf ve puan dosyaları birlikte kaydedildiğinden tek sürüm ikisini
+# birden kapsar.
+
+LEGACY_SCORE_FILE = "puan.json"  # Eski uygulamanın puan dosyası
+
+TEST_COUNTERS = (
+    "en_to_tr_answered",
+    "tr_to_en_answered",
+    "fill_blank_answered",
+    "sentence_test_answered",
+    "synonym_test_answered",
+    "word_test_answered",
+)
+
+
+def empty_daily_entry():
+    """Boş günlük kayıt"""
+    entry = {"score": 0, "questions_answered": 0, "correct": 0, "wrong": 0}
+    entry.update({counter: 0 for counter in TEST_COUNTERS})
+    return entry
+
+
+# -------------------- Eski puan.json Biçimi --------------------
+# {"score": ..., "daily": {"YYYY-MM-DD": {"puan", "yeni_kelime", "dogru", "yanlis"}}}
+
+def is_legacy_score(data):
+    """Eski puan.json biçiminde mi?"""
+    return isinstance(data, dict) and "score" in data and "total_score" not in data
+
+
+def convert_legacy_daily(legacy_day):
+    """Eski günlük kaydı güncel biçime çevir"""
+    entry = empty_daily_entry()
+    entry["score"] = legacy_day.get("puan", 0)
+    entry["correct"] = legacy_day.get("dogru", 0)
+    entry["wrong"] = legacy_day.get("yanlis", 0)
+    entry["questions_answered"] = entry["correct"] + entry["wrong"]
+    entry["new_words"] = legacy_day.get("yeni_kelime", 0)
+    return entry
+
+
+def merge_legacy_score(score_data, legacy):
+    """Eski puanları güncel veriye ekle (aynı gün varsa değerler toplanır)"""
+    score_data["total_score"] = score_data.get("total_score", 0) + legacy.get("score", 0)
+    daily = score_data.setdefault("daily", {})
+    for date, legacy_day in (legacy.get("daily") or {}).items():
+        converted = convert_legacy_daily(legacy_day)
+        if date not in daily:
+            daily[date] = converted
+            continue
+        for key, value in converted.items():
+            daily[date][key] = daily[date].get(key, 0) + value
+
+
+# -------------------- Geçiş Adımları --------------------
+# Her adım (paragraflar, score_data) üzerinde yerinde çalışır.
+
+def _add_used_questions(paragraflar, score_data):
+    """1: Paragraflara used_questions listesi ekle"""
+    for paragraf in paragraflar:
+        paragraf.setdefault("used_questions", [])
+
+
+def _add_test_counters(paragraflar, score_data):
+    """2: Genel ve günlük verilere test sayaçlarını ekle"""
+    for counter in TEST_COUNTERS:
+        score_data.setdefault(counter, 0)
+    for daily_data in score_data.get("daily", {}).values():
+        for key, value in empty_daily_entry().items():
+            daily_data.setdefault(key, value)
+
+
+def _merge_legacy_score_file(paragraflar, score_data):
+    """3: Eski puan.json dosyasındaki puanları aktar"""
+    if not os.path.exists(LEGACY_SCORE_FILE):
+        return
+    with open(LEGACY_SCORE_FILE, "r", encoding="utf-8") as f:
+        legacy = json.load(f)
+    if is_legacy_score(legacy):
+        merge_legacy_score(score_data, legacy)
+
+
+def _normalize_paragraph_schema(paragraflar, score_data):
+    """4: Cümle tabanlı paragrafları soru tabanlı biçime çevir, soru id'leri ver"""
+    normalize_paragraphs(paragraflar)
+
+
+def _move_paragraph_texts(paragraflar, score_data):
+    """5: Paragraf metinlerini ve çevirilerini metin dosyasına taşı"""
+    detach_texts(paragraflar)
+
+
+def _add_word_test_counter(paragraflar, score_data):
+    """6: Kelime kartı sayacını ekle (bkz. word_quiz)"""
+    _add_test_counters(paragraflar, score_data)
+
+
+def _ingest_paragraph_questions(paragraflar, score_data):
+    """7: Henüz işlenmemiş paragraflar için otomatik soruları üret (bkz. paragraph_ingest)"""
+    # Üretim kullanılan soru kayıtlarını id'ye göre süzer; eski kayıtlar önce çevrilir
+    _key_used_questions_by_id(paragraflar, score_data)
+    ingest_paragraphs(paragraflar)
+
+
+def _key_used_questions_by_id(paragraflar, score_data):
+    """8: Kullanılan soru kayıtlarını sıradan ("fill_blank_2") soru id'sine çevir"""
+    for paragraf in paragraflar:
+        ids_by_type = {}
+        for question in paragraf.get("questions") or []:
+            ids_by_type.setdefault(question.get("type"), []).append(question.get("id"))
+        converted = []
+        for key in paragraf.get("used_questions") or []:
+            if isinstance(key, str):
+                test_type, _, position = key.rpartition("_")
+                ids = ids_by_type.get(test_type, [])
+                if not position.isdigit() or int(position) >= len(ids):
+                    continue  # Artık olmayan soru
+                key = ids[int(position)]
+            if key not in converted:
+                converted.append(key)
+        paragraf["used_questions"] = converted
+
+
+MIGRATIONS = [
+    _add_used_questions,
+    _add_test_counters,
+    _merge_legacy_score_file,
+    _normalize_paragraph_schema,
+    _move_paragraph_texts,
+    _add_word_test_counter,
+    _ingest_paragraph_questions,
+    _key_used_questions_by_id,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(paragraflar, score_data):
+    """Bekleyen geçişleri sırayla uygula; uygulanan geçiş sayısını döner.
+
+    Güncel sürümdeki veride hiçbir kayda dokunulmaz.
+    """
+    version = score_data.get("schema_version", 0)
+    pending = MIGRATIONS[version:]
+    for step in pending:
+        step(paragraflar, score_data)
+        version += 1
+        score_data["schema_version"] = version
+    return len(pending)
+
+
+def convert_legacy_score(legacy):
+    """Eski puan.json içeriğinden sıfırdan güncel puan verisi oluştur.
+
+    Sonuç, eski dosya aktarma adımına kadar geçirilmiş sayılır; böylece
+    migrate() aynı puanları diskteki puan.json'dan tekrar eklemez.
+    """
+    score_data = {"total_score": 0, "daily": {}}
+    _add_test_counters([], score_data)
+    merge_legacy_score(score_data, legacy)
+    score_data["schema_version"] = MIGRATIONS.index(_merge_legacy_score_file) + 1
+    return score_data
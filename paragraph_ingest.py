@@ -0,0 +1,268 @@
+import hashlib
+import multiprocessing
+import os
+import random
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from paragraph_store import TEXT_FIELDS, TEXT_REF_FIELD, get_text
+from questions import assign_question_ids
+
+# -------------------- Paragraftan Otomatik Soru Üretimi --------------------
+# Paragraf ve Türkçe çevirisi cümlelere bölünür, cümleler sırayla eşlenir ve
+# her cümle için en_to_tr, tr_to_en ve fill_blank soruları üretilir. Yanlış
+# seçenekler diğer paragrafların cümlelerinden ve kelimelerinden seçilir.
+# Üretilen sorular "auto": True ile işaretlenir; paragrafın metin hash'i
+# değişmedikçe yeniden üretilmez.
+#
+# Metin dosyasına sadece ekleme yapıldığından (bkz. paragraph_store) metni
+# değişen paragrafın text_ref'i de değişir. Hash'in hesaplandığı text_ref
+# kayıtta content_ref olarak tutulur; text_ref'i aynı kalan paragrafların
+# metni yeniden okunup hash'lenmez. Paragrafların çeldirici havuzuna kattığı
+# cümle ve kelimeler hash'e göre önbellekte tutulur; böylece tek paragraf
+# eklendiğinde sadece yeni (veya değişen) paragrafların metni okunur.
+
+GENERATOR_VERSION = "1"     # Üretim mantığı değişirse artırılır (tüm önbellek yenilenir)
+PARALLEL_THRESHOLD = 16     # Bundan az paragraf süreç havuzu kullanmadan işlenir
+MIN_BLANK_LENGTH = 5        # Boşluk doldurmada boşluğa alınacak kelimenin min. uzunluğu
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[\"“'(A-ZÇĞİÖŞÜ0-9])")
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'-]*")
+
+STOPWORDS = {
+    "about", "above", "after", "again", "against", "although", "among", "because", "before", "being",
+    "below", "between", "could", "during", "every", "their", "there", "these", "those", "through",
+    "under", "until", "where", "which", "while", "would", "should", "other", "another", "however",
+    "therefore", "whether", "without", "within", "itself", "themselves", "something", "anything",
+}
+
+
+def split_sentences(text):
+    """Metni cümlelere böl"""
+    return [s.strip() for s in SENTENCE_SPLIT.split(text.strip()) if s.strip()] if text else []
+
+
+def _digest(text, translation):
+    digest = hashlib.sha1(GENERATOR_VERSION.encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(translation.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def content_hash(paragraf):
+    """Paragraf metni ve çevirisinin hash'i (üretici sürümü dahil)"""
+    return _digest(get_text(paragraf, "paragraph"), get_text(paragraf, "turkish_translation"))
+
+
+def text_key(paragraf):
+    """Metnin değişmediğini okumadan anlamak için anahtar (metin satır içindeyse None)"""
+    ref = paragraf.get(TEXT_REF_FIELD)
+    if not ref or any(field in paragraf for field in TEXT_FIELDS):
+        return None
+    return [GENERATOR_VERSION, *ref]
+
+
+def is_current(paragraf):
+    """content_hash, paragrafın şu anki metninden mi hesaplandı?"""
+    key = text_key(paragraf)
+    return key is not None and "content_hash" in paragraf and paragraf.get("content_ref") == key
+
+
+def blank_candidates(sentence):
+    """Boşluğa alınabilecek içerik kelimeleri"""
+    return [w for w in WORD_PATTERN.findall(sentence)
+            if len(w) >= MIN_BLANK_LENGTH and w.lower() not in STOPWORDS]
+
+
+# -------------------- Çalışan Süreç Tarafı --------------------
+# Banka genelindeki çeldirici havuzları her çalışana bir kez (initializer ile)
+# gönderilir; görevler sadece kendi paragraf metnini taşır. Havuz sadece
+# tek thread'li süreçlerde (komut satırı) fork ile başlatılır: Streamlit
+# arayüzünde fork edilen çalışan, başka thread'lerin tuttuğu kilitleri kilitli
+# devralabilir (bkz. validation). Diğer durumlarda üretim tek süreçte yapılır.
+
+_bank = None
+
+
+def _init_worker(bank):
+    global _bank
+    _bank = bank
+
+
+def _closest_by_length(pool, target, exclude, count, rng):
+    """Havuzdan uzunluğu hedefe en yakın, farklı count değer seç"""
+    sample = rng.sample(pool, min(len(pool), count * 10 + len(exclude)))
+    seen = {e.lower() for e in exclude}
+    picked = []
+    for value in sorted(sample, key=lambda v: abs(len(v) - len(target))):
+        if value.lower() not in seen:
+            seen.add(value.lower())
+            picked.append(value)
+            if len(picked) == count:
+                break
+    return picked
+
+
+def _make_question(test_type, question, correct_answer, wrong, rng):
+    """Yeterli çeldirici varsa soru sözlüğü oluştur"""
+    if len(wrong) < 3:
+        return None
+    options = [correct_answer] + wrong[:3]
+    rng.shuffle(options)
+    return {
+        "type": test_type,
+        "question": question,
+        "correct_answer": correct_answer,
+        "options": options,
+        "auto": True,
+    }
+
+
+def generate_questions(task):
+    """Tek paragraf için soruları üret: (paragraf_id, hash, sorular)"""
+    paragraph_id, digest, text, translation = task
+    rng = random.Random(digest)  # Aynı metin her zaman aynı soruları üretir
+    bank = _bank or {"en": [], "tr": [], "words": []}
+
+    en_sentences = split_sentences(text)
+    tr_sentences = split_sentences(translation)
+    # Cümle sayıları eşitse sırayla eşlenir, değilse çeviri soruları üretilmez
+    aligned = list(zip(en_sentences, tr_sentences)) if len(en_sentences) == len(tr_sentences) else []
+
+    # Havuz tüm bankayı içerir; diğer paragraflardan yeterli cümle varsa
+    # paragrafın kendi cümleleri çeldirici olarak kullanılmaz
+    en_pool = bank["en"] or en_sentences
+    tr_pool = bank["tr"] or tr_sentences
+    own_en = en_sentences if len(en_pool) - len(en_sentences) >= 3 else []
+    own_tr = tr_sentences if len(tr_pool) - len(tr_sentences) >= 3 else []
+
+    questions = []
+    for en, tr in aligned:
+        questions.append(_make_question(
+            "en_to_tr", en, tr, _closest_by_length(tr_pool, tr, [tr] + own_tr, 3, rng), rng))
+        questions.append(_make_question(
+            "tr_to_en", tr, en, _closest_by_length(en_pool, en, [en] + own_en, 3, rng), rng))
+
+    word_pool = bank["words"] or [w for sentence in en_sentences for w in blank_candidates(sentence)]
+    for sentence in en_sentences:
+        candidates = blank_candidates(sentence)
+        if not candidates:
+            continue
+        answer = rng.choice(candidates)
+        blanked = re.sub(rf"\b{re.escape(answer)}\b", "_____", sentence, count=1)
+        questions.append(_make_question(
+            "fill_blank", blanked, answer, _closest_by_length(word_pool, answer, [answer], 3, rng), rng))
+
+    return paragraph_id, digest, [q for q in questions if q is not None]
+
+
+# -------------------- Banka İşleme --------------------
+
+_pools = {}  # content_hash -> (İngilizce cümleler, Türkçe cümleler, içerik kelimeleri)
+
+
+def _paragraph_pools(paragraf, cache):
+    """Paragrafın çeldirici havuzuna kattıkları (metni güncel hash'liyse önbellekten)"""
+    digest = paragraf["content_hash"] if is_current(paragraf) else None
+    pools = _pools.get(digest) if digest else None
+    if pools is None:
+        en_sentences = split_sentences(get_text(paragraf, "paragraph"))
+        words = [word for sentence in en_sentences for word in blank_candidates(sentence)]
+        pools = (en_sentences, split_sentences(get_text(paragraf, "turkish_translation")), words)
+    if digest:
+        cache[digest] = pools
+    return pools
+
+
+def build_bank(paragraflar):
+    """Çeldirici havuzu: tüm paragrafların cümleleri ve içerik kelimeleri"""
+    global _pools
+    bank = {"en": [], "tr": [], "words": []}
+    seen_words = set()
+    cache = {}  # Sadece bankada kalan paragrafların havuzları tutulur
+    for paragraf in paragraflar:
+        en_sentences, tr_sentences, words = _paragraph_pools(paragraf, cache)
+        bank["en"].extend(en_sentences)
+        bank["tr"].extend(tr_sentences)
+        for word in words:
+            if word.lower() not in seen_words:
+                seen_words.add(word.lower())
+                bank["words"].append(word)
+    _pools = cache
+    return bank
+
+
+def stale_paragraphs(paragraflar):
+    """Metni değişmiş (veya hiç işlenmemiş) paragraflar ve yeni hash'leri.
+
+    text_ref'i hash'in hesaplandığı yerde duran paragrafların metni okunmaz.
+    """
+    stale = []
+    for paragraf in paragraflar:
+        if is_current(paragraf):
+            continue
+        text = get_text(paragraf, "paragraph")
+        if not text:
+            continue
+        digest = _digest(text, get_text(paragraf, "turkish_translation"))
+        if paragraf.get("content_hash") != digest:
+            stale.append((paragraf, digest))
+        elif text_key(paragraf) is not None:
+            paragraf["content_ref"] = text_key(paragraf)  # Metin sadece taşınmış
+    return stale
+
+
+def apply_generated(paragraf, digest, generated):
+    """Eski otomatik soruları yenileriyle değiştir; elle eklenenler korunur"""
+    manual = [q for q in paragraf.get("questions") or [] if not q.get("auto")]
+    # Elle eklenmiş (veya cümle tabanlı biçimden gelen) sorular tekrar üretilmez
+    existing = {(q.get("type"), q.get("question")) for q in manual}
+    paragraf["questions"] = manual + [q for q in generated if (q["type"], q["question"]) not in existing]
+    paragraf["content_hash"] = digest
+    paragraf["content_ref"] = text_key(paragraf)
+    # Kullanılan soru kayıtları soru id'leriyle tutulur: elle eklenen soruların
+    # kayıtları korunur, silinen otomatik soruların kayıtları atılır (yeni
+    # üretilen sorulara aynı id'ler verilebilir)
+    kept_ids = {q.get("id") for q in manual}
+    paragraf["used_questions"] = [key for key in paragraf.get("used_questions") or [] if key in kept_ids]
+
+
+def ingest_paragraphs(paragraflar, workers=None):
+    """Metni değişen paragraflar için otomatik soruları (paralel) üret.
+
+    Sadece content_hash'i güncel olmayan paragraflar işlenir. Güncellenen
+    paragraf sayısını döner.
+    """
+    stale = stale_paragraphs(paragraflar)
+    if not stale:
+        return 0
+
+    bank = build_bank(paragraflar)
+    by_id = {}
+    tasks = []
+    for paragraf, digest in stale:
+        by_id[paragraf.get("id")] = paragraf
+        tasks.append((paragraf.get("id"), digest, get_text(paragraf, "paragraph"),
+                      get_text(paragraf, "turkish_translation")))
+
+    workers = workers or os.cpu_count() or 1
+    parallel = (len(tasks) >= PARALLEL_THRESHOLD and workers > 1 and threading.active_count() == 1
+                and "fork" in multiprocessing.get_all_start_methods())
+    if parallel:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(bank,)) as executor:
+            results = list(executor.map(generate_questions, tasks, chunksize=chunksize))
+    else:
+        _init_worker(bank)
+        results = [generate_questions(task) for task in tasks]
+        _init_worker(None)
+
+    for paragraph_id, digest, generated in results:
+        apply_generated(by_id[paragraph_id], digest, generated)
+
+    assign_question_ids(by_id.values())
+    return len(results)
@@ -0,0 +1,161 @@
+from paragraph_store import TEXT_FIELDS, TEXT_REF_FIELD, get_text
+from questions import assign_paragraph_question_ids
+
+# -------------------- Paragraf Şeması --------------------
+# paragraflar.json iki biçimde olabilir:
+#   * Soru tabanlı: {"id", "title", "paragraph", "turkish_translation", "questions": [...]}
+#   * Cümle tabanlı: {"id", "paragraph", "sentences": [{"text", "answer", "choices"}]}
+# Her iki biçim de bir kez (şema geçişinde veya içe aktarmada) soru tabanlı
+# biçime çevrilir; yüklemede sadece test türüne göre indekslenir ve soru
+# seçimi sırasında sözlük yoklaması yapılmaz.
+# Metin alanları sonra metin dosyasına taşınır (bkz. paragraph_store).
+
+SENTENCE_QUESTION_TYPE = "en_to_tr"  # Cümle tabanlı kayıtlar çeviri sorusu olur
+TITLE_WORDS = 6                      # Başlığı olmayan paragraflarda başlığa alınacak kelime sayısı
+
+
+def default_title(paragraph_text, paragraph_id):
+    """Başlığı olmayan paragraf için metnin ilk kelimelerinden başlık üret"""
+    words = (paragraph_text or "").split()
+    if not words:
+        return f"Paragraf {paragraph_id}"
+    title = " ".join(words[:TITLE_WORDS])
+    return title + "..." if len(words) > TITLE_WORDS else title
+
+
+def convert_sentences(sentences):
+    """Cümle tabanlı kayıtları (text/answer/choices) soru listesine çevir"""
+    questions = []
+    for sentence in sentences:
+        text = (sentence.get("text") or "").strip()
+        answer = (sentence.get("answer") or "").strip()
+        if not text or not answer:
+            continue
+        options = list(dict.fromkeys(sentence.get("choices") or []))
+        if answer not in options:
+            options.insert(0, answer)
+        questions.append({
+            "type": SENTENCE_QUESTION_TYPE,
+            "question": text,
+            "correct_answer": answer,
+            "options": options,
+        })
+    return questions
+
+
+def normalize_paragraph(paragraf, fallback_id):
+    """Paragrafı yerinde soru tabanlı biçime getir; değiştiyse True döner"""
+    changed = False
+
+    if "sentences" in paragraf:
+        sentences = paragraf.pop("sentences") or []
+        paragraf.setdefault("questions", [])
+        paragraf["questions"].extend(convert_sentences(sentences))
+        if not get_text(paragraf, "turkish_translation"):
+            paragraf["turkish_translation"] = " ".join(
+                (s.get("answer") or "").strip() for s in sentences if s.get("answer"))
+        changed = True
+
+    if "id" not in paragraf:
+        paragraf["id"] = fallback_id
+        changed = True
+
+    if TEXT_REF_FIELD not in paragraf:
+        for key in TEXT_FIELDS:
+            if not isinstance(paragraf.get(key), str):
+                paragraf[key] = ""
+                changed = True
+    for key in ("questions", "used_questions"):
+        if not isinstance(paragraf.get(key), list):
+            paragraf[key] = []
+            changed = True
+    if not paragraf.get("difficulty"):
+        paragraf["difficulty"] = "intermediate"
+        changed = True
+    if not paragraf.get("title"):
+        paragraf["title"] = default_title(get_text(paragraf, "paragraph"), paragraf["id"])
+        changed = True
+
+    if assign_paragraph_question_ids(paragraf):
+        changed = True
+    return changed
+
+
+def normalize_paragraphs(paragraflar):
+    """Tüm paragrafları soru tabanlı biçime getir; değişiklik olduysa True döner"""
+    changed = False
+    next_id = max((p.get("id", 0) for p in paragraflar if isinstance(p.get("id"), int)), default=0) + 1
+    for paragraf in paragraflar:
+        fallback_id = paragraf.get("id", next_id)
+        if "id" not in paragraf:
+            next_id += 1
+        if normalize_paragraph(paragraf, fallback_id):
+            changed = True
+    return changed
+
+
+def merge_paragraph(kept, duplicate):
+    """Benzer bulunan paragrafın elle yazılmış sorularını tutulan paragrafa taşı.
+
+    Otomatik üretilen sorular alınmaz (tutulan paragrafın metninden yeniden
+    üretilir); aynı (tür, soru) çifti zaten varsa soru eklenmez.
+    """
+    existing = {(q.get("type"), q.get("question")) for q in kept["questions"]}
+    for question in duplicate.get("questions") or []:
+        signature = (question.get("type"), question.get("question"))
+        if question.get("auto") or signature in existing:
+            continue
+        question = {key: value for key, value in question.items() if key != "id"}
+        kept["questions"].append(question)
+        existing.add(signature)
+    assign_paragraph_question_ids(kept)
+
+
+class ParagraphBank:
+    """Normalize edilmiş paragraflar üzerinde id ve test türü indeksleri.
+
+    Kayıtların zaten normalize edildiği varsayılır (bkz. migrations); burada
+    sadece indeks kurulur.
+    """
+
+    def __init__(self, paragraflar):
+        self.paragraphs = paragraflar
+        self.by_id = {}
+        self._questions = {}     # (paragraf_id, test_type) -> [soru, ...] (dosyadaki sırayla)
+        self._ids_by_type = {}   # test_type -> [paragraf_id, ...]
+        self._refs_by_type = {}  # test_type -> [(paragraf_id, türdeki sırası), ...]
+        for paragraf in paragraflar:
+            self._index(paragraf)
+
+    def _index(self, paragraf):
+        paragraph_id = paragraf["id"]
+        self.by_id[paragraph_id] = paragraf
+        for question in paragraf["questions"]:
+            key = (paragraph_id, question.get("type"))
+            if key not in self._questions:
+                self._questions[key] = []
+                self._ids_by_type.setdefault(question.get("type"), []).append(paragraph_id)
+            self._refs_by_type.setdefault(question.get("type"), []).append(
+                (paragraph_id, len(self._questions[key])))
+            self._questions[key].append(question)
+
+    def questions_of(self, paragraph_id, test_type):
+        """Paragrafın verilen türdeki soruları"""
+        return self._questions.get((paragraph_id, test_type), [])
+
+    def paragraph_ids(self, test_type):
+        """Verilen türde sorusu olan paragrafların id'leri"""
+        return self._ids_by_type.get(test_type, [])
+
+    def question_refs(self, test_type):
+        """Verilen türdeki tüm sorular: (paragraf_id, türdeki sırası) listesi.
+
+        Sıra, questions_of(paragraf_id, test_type) listesindeki sıradır.
+        """
+        return self._refs_by_type.get(test_type, [])
+
+
+def compile_paragraph_bank(paragraflar):
+    """Dışarıdan gelen (karışık biçimli) paragrafları normalize et ve indeksle"""
+    normalize_paragraphs(paragraflar)
+    return ParagraphBank(paragraflar)
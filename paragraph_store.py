@@ -0,0 +1,129 @@
+import mmap
+import os
+import threading
+
+from file_sync import file_lock
+
+# -------------------- Paragraf Metin Deposu --------------------
+# Paragraf metni ve Türkçe çevirisi paragraflar.json'da değil, yanındaki
+# sadece eklemeli paragraf_metinleri.bin dosyasında (UTF-8, art arda)
+# tutulur. Paragraf kaydında sadece metinlerin yeri bulunur:
+#   "text_ref": [başlangıç baytı, metin bayt uzunluğu, çeviri bayt uzunluğu]
+# Böylece bellekte sadece üst veriler (id, başlık, zorluk, sorular) durur;
+# metin dosyası bellek eşlemeli (mmap) açılır ve bir paragrafın metni ancak
+# okunduğunda diskten (işletim sistemi önbelleğinden) alınır.
+#
+# Dosyaya sadece ekleme yapılır: metni değişen paragrafa yeni yer verilir,
+# eski baytlar yerinde kalır. Böylece diğer süreçlerin bellekteki eski
+# kayıtları ve yedek JSON dosyaları geçerli kalır. Yeni eklenen veya dışarıdan
+# gelen kayıtlardaki satır içi metinler detach_texts ile dosyaya taşınır;
+# taşınana kadar get_text satır içi metni döner.
+
+PARAGRAPH_TEXT_FILE = "paragraf_metinleri.bin"
+TEXT_REF_FIELD = "text_ref"
+TEXT_FIELDS = ("paragraph", "turkish_translation")
+
+
+class ParagraphTexts:
+    """Sadece eklemeli, bellek eşlemeli paragraf metni dosyası"""
+
+    def __init__(self, path=PARAGRAPH_TEXT_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self._map = None
+        self._mapped = None      # Eşlenen dosyanın (inode, boyut) bilgisi
+
+    def _current_map(self):
+        """Dosyanın güncel eşlemesi (dosya yoksa/boşsa None).
+
+        Dosya büyüdüyse (başka süreç ekledi) veya değiştirildiyse (yedekten
+        geri yükleme) yeniden eşlenir; eski eşleme referansı bırakılınca kapanır.
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._map, self._mapped = None, None
+            return None
+        if (stat.st_ino, stat.st_size) != self._mapped:
+            self._map = None
+            if stat.st_size:
+                with open(self.path, "rb") as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped = (stat.st_ino, stat.st_size)
+        return self._map
+
+    def read(self, ref, field):
+        """Kaydın verilen metin alanı (geçersiz yerde boş metin)"""
+        offset, paragraph_length, translation_length = ref
+        if field == TEXT_FIELDS[0]:
+            start, end = offset, offset + paragraph_length
+        else:
+            start = offset + paragraph_length
+            end = start + translation_length
+        with self.lock:
+            data = self._current_map()
+            if data is None or end > len(data):
+                return ""
+            return data[start:end].decode("utf-8", errors="replace")
+
+    def append(self, texts):
+        """[(metin, çeviri), ...] metinlerini dosyanın sonuna ekle, yerlerini döndür"""
+        chunks = []
+        refs = []
+        with file_lock(self.path, exclusive=True):
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                for paragraph, translation in texts:
+                    paragraph_bytes = paragraph.encode("utf-8")
+                    translation_bytes = translation.encode("utf-8")
+                    refs.append([offset, len(paragraph_bytes), len(translation_bytes)])
+                    chunks += [paragraph_bytes, translation_bytes]
+                    offset += len(paragraph_bytes) + len(translation_bytes)
+                f.write(b"".join(chunks))
+        return refs
+
+
+_texts = None
+_texts_lock = threading.Lock()
+
+
+def get_paragraph_texts():
+    """Süreç genelinde paylaşılan metin dosyası"""
+    global _texts
+    with _texts_lock:
+        if _texts is None:
+            _texts = ParagraphTexts()
+        return _texts
+
+
+def get_text(paragraf, field):
+    """Paragrafın metni ("paragraph") veya çevirisi ("turkish_translation")"""
+    if field in paragraf:
+        return paragraf[field] or ""
+    ref = paragraf.get(TEXT_REF_FIELD)
+    return get_paragraph_texts().read(ref, field) if ref else ""
+
+
+def detach_texts(paragraflar):
+    """Satır içi metinleri metin dosyasına taşı, yerine text_ref yaz.
+
+    Tüm kayıtlar tek seferde eklenir. Taşınan paragraf sayısını döner.
+    """
+    pending = [paragraf for paragraf in paragraflar if any(field in paragraf for field in TEXT_FIELDS)]
+    if not pending:
+        return 0
+    refs = get_paragraph_texts().append(
+        [tuple(get_text(paragraf, field) for field in TEXT_FIELDS) for paragraf in pending])
+    for paragraf, ref in zip(pending, refs):
+        for field in TEXT_FIELDS:
+            paragraf.pop(field, None)
+        paragraf[TEXT_REF_FIELD] = ref
+    return len(pending)
+
+
+def with_texts(paragraf):
+    """Metinleri satır içinde olan kopya (dışa aktarma için)"""
+    record = {key: value for key, value in paragraf.items() if key != TEXT_REF_FIELD}
+    for field in TEXT_FIELDS:
+        record[field] = get_text(paragraf, field)
+    return record
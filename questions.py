@@ -0,0 +1,121 @@
+import itertools
+import time
+
+# -------------------- Soru Durumu --------------------
+# Oturumda tutulan soru durumu sadece kimlikleri, seçenek sırasını ve cevap
+# durumunu saklar. Paragraf metni ve soru içeriği her çalıştırmada kimlik
+# üzerinden güncel veriden okunur.
+
+_serials = itertools.count(1)
+
+
+class QuestionState:
+    """Gösterilen sorunun kompakt oturum durumu"""
+
+    __slots__ = (
+        "section",          # "paragraph", "sentence" veya "synonym"
+        "test_type",        # en_to_tr, tr_to_en, fill_blank, synonym...
+        "item_id",          # paragraf id'si veya eş anlamlı soru id'si
+        "question_id",      # paragraf içindeki sorunun kalıcı id'si
+        "question_key",     # used_questions kaydı için anahtar (paragraf sorusunun id'si)
+        "options",          # karıştırılmış seçenek sırası (tuple)
+        "question_text",    # sadece üretilen (bankada olmayan) sorular için
+        "correct_answer",   # sadece üretilen (bankada olmayan) sorular için
+        "serial",           # widget anahtarları için oturumda benzersiz sıra no
+        "answered",
+        "is_correct",
+        "selected",         # verilen cevap(lar)
+        "match",            # yazılı cevapta (sonuç, uzaklık, doğru cevap), bkz. answer_match
+        "shown_at",         # ilk gösterildiği an (time.time), cevap süresi için
+    )
+
+    def __init__(self, section, test_type, options, item_id=None, question_id=None,
+                 question_key=None, question_text=None, correct_answer=None):
+        self.section = section
+        self.test_type = test_type
+        self.item_id = item_id
+        self.question_id = question_id
+        self.question_key = question_key
+        self.options = tuple(options)
+        self.question_text = question_text
+        self.correct_answer = correct_answer
+        self.serial = next(_serials)
+        self.answered = False
+        self.is_correct = None
+        self.selected = None
+        self.match = None
+        self.shown_at = None
+
+    def widget_key(self, prefix, suffix=""):
+        """Bu soruya özel, kararlı widget anahtarı"""
+        return f"{prefix}_{self.serial}{suffix}"
+
+    def mark_shown(self, now=None):
+        """İlk gösterim anını kaydet (önceden hazırlanan sorular için gösterimde)"""
+        if self.shown_at is None:
+            self.shown_at = time.time() if now is None else now
+
+    def response_time(self, now=None):
+        """Gösterimden bu yana geçen süre (saniye); gösterilmediyse None"""
+        if self.shown_at is None:
+            return None
+        return max(0.0, (time.time() if now is None else now) - self.shown_at)
+
+    def mark_answered(self, selected, is_correct, match=None):
+        """Cevabı kaydet"""
+        self.selected = selected
+        self.is_correct = is_correct
+        self.match = match
+        self.answered = True
+
+
+# -------------------- Kalıcı Soru Kimlikleri --------------------
+
+def assign_question_ids(paragraflar):
+    """Id'si olmayan paragraf sorularına paragraf içinde kalıcı id ver.
+
+    Değişiklik yapıldıysa True döner (kaydedilmesi gerekir).
+    """
+    changed = False
+    for paragraf in paragraflar:
+        if assign_paragraph_question_ids(paragraf):
+            changed = True
+    return changed
+
+
+def assign_paragraph_question_ids(paragraf):
+    """Tek paragrafın id'si olmayan sorularına id ver"""
+    changed = False
+    questions = paragraf.get("questions") or []
+    next_id = max((q.get("id", 0) for q in questions), default=0) + 1
+    for question in questions:
+        if "id" not in question:
+            question["id"] = next_id
+            next_id += 1
+            changed = True
+    return changed
+
+
+def next_item_id(items):
+    """Listedeki en büyük id'nin bir fazlası (boş listede 1)"""
+    return max((item.get("id", 0) for item in items if isinstance(item, dict)), default=0) + 1
+
+
+def assign_item_ids(items):
+    """Id'si olmayan öğelere (eş anlamlı sorular vb.) kalıcı id ver"""
+    changed = False
+    next_id = next_item_id(items)
+    for item in items:
+        if "id" not in item:
+            item["id"] = next_id
+            next_id += 1
+            changed = True
+    return changed
+
+
+def find_question(paragraf, question_id):
+    """Paragraftaki soruyu kalıcı id'sine göre bul"""
+    for question in paragraf.get("questions") or []:
+        if question.get("id") == question_id:
+            return question
+    return None
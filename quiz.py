@@ -0,0 +1,146 @@
+import random
+
+from ratings import paragraph_rating_key, synonym_rating_key, word_rating_key
+from sentence_engine import prepare_word_pairs, word_text
+
+# -------------------- Soru Seçimi --------------------
+# Paragraf ve eş anlamlı soru seçimi arayüzden bağımsızdır; Streamlit
+# arayüzü ve HTTP API aynı mantığı kullanır. Uyarlamalı seçim için sorular
+# derece modelinin (bkz. ratings) zorluğa göre sıralı havuzlarından alınır.
+
+
+def pick_paragraph_question(store, bank, paragraf, test_type, exclude=(), allow_reset=True, rng=random):
+    """Paragraftan kullanılmamış bir soru seç.
+
+    exclude: seçilmeyecek soru anahtarları (örn. önceden hazırlanmış sorular)
+    allow_reset: tüm sorular kullanıldıysa used_questions sıfırlansın mı
+    (soru, soru_metni, doğru_cevap, seçenekler, soru_anahtarı) veya None döner.
+    """
+    # Test türüne uygun sorular (yüklemede indekslendi)
+    suitable_questions = bank.questions_of(paragraf["id"], test_type)
+
+    if not suitable_questions:
+        return None
+
+    # Kullanılmamış soruları bul
+    used_questions = paragraf.get("used_questions", [])
+    unused_questions = []
+
+    for question in suitable_questions:
+        question_key = question["id"]
+        if question_key not in used_questions and question_key not in exclude:
+            unused_questions.append((question, question_key))
+
+    # Eğer tüm sorular kullanıldıysa, sıfırla
+    if not unused_questions and allow_reset:
+        # Bu test türü için kullanılan soruları sıfırla
+        store.reset_used_questions(paragraf, test_type)
+        unused_questions = [(question, question["id"]) for question in suitable_questions]
+
+    if not unused_questions:
+        return None
+
+    # Rastgele kullanılmamış soru seç
+    selected_question, question_key = rng.choice(unused_questions)
+
+    question_text = selected_question["question"]
+    correct_answer = selected_question["correct_answer"]
+    options = selected_question["options"].copy()
+    rng.shuffle(options)
+
+    return selected_question, question_text, correct_answer, options, question_key
+
+
+def generate_synonym_question(synonyms, rng=random):
+    """Eş anlamlı kelime sorusu üret"""
+    if not synonyms:
+        return None, None, None, None, None
+
+    selected_question = rng.choice(synonyms)
+
+    question_text = selected_question["question"]
+    correct_answers = selected_question["correct_answers"]
+    options = selected_question["options"].copy()
+    solution = selected_question.get("solution", "")
+
+    # Seçenekleri karıştır
+    rng.shuffle(options)
+
+    return selected_question, question_text, correct_answers, options, solution
+
+
+# -------------------- Uyarlamalı Seçim --------------------
+# Havuzlar, kaynak listenin ucuz bir imzası (uzunluk ve son öğe) değiştiğinde
+# eşitlenir; böylece her seçimde tüm banka taranmaz. Silinmiş sorular seçim
+# sırasında accept ile elenir.
+
+
+def _paragraph_question(bank, paragraph_id, test_type, question_id):
+    """Paragrafın verilen türdeki sorusu (id'ye göre); yoksa None"""
+    for question in bank.questions_of(paragraph_id, test_type):
+        if question.get("id") == question_id:
+            return question
+    return None
+
+
+def pick_adaptive_paragraph_question(model, bank, test_type, target_success, rng=random):
+    """Hedef başarı olasılığına uygun, kullanılmamış bir paragraf sorusu seç.
+
+    (paragraf_id, pick_paragraph_question ile aynı biçimde sonuç) veya None döner.
+    """
+    refs = bank.question_refs(test_type)
+
+    def keys():
+        return [paragraph_rating_key(pid, bank.questions_of(pid, test_type)[position].get("id"))
+                for pid, position in refs]
+
+    pool = model.pool(f"paragraph:{test_type}", keys, (len(refs), refs[-1] if refs else None))
+
+    def accept(key):
+        _, paragraph_id, question_id = key.split(":")
+        paragraf = bank.by_id.get(int(paragraph_id))
+        if paragraf is None:
+            return False
+        question_id = int(question_id)
+        return (_paragraph_question(bank, paragraf["id"], test_type, question_id) is not None
+                and question_id not in paragraf.get("used_questions", []))
+
+    picked = model.select(pool, 1, rng, target_success, accept)
+    if not picked:
+        return None
+    _, paragraph_id, question_id = picked[0].split(":")
+    paragraph_id, question_id = int(paragraph_id), int(question_id)
+    question = _paragraph_question(bank, paragraph_id, test_type, question_id)
+    options = question["options"].copy()
+    rng.shuffle(options)
+    return paragraph_id, (question, question["question"], question["correct_answer"], options, question_id)
+
+
+def pick_adaptive_synonym_questions(model, synonym_index, count, target_success, exclude=(), rng=random):
+    """Hedef başarı olasılığına uygun count eş anlamlı soru seç (id -> soru index'inden)"""
+    last_id = next(reversed(synonym_index), None) if synonym_index else None
+
+    def keys():
+        return [synonym_rating_key(question_id) for question_id in synonym_index]
+
+    pool = model.pool("synonym", keys, (len(synonym_index), last_id))
+
+    def accept(key):
+        question_id = int(key.split(":")[1])
+        return question_id in synonym_index and question_id not in exclude
+
+    return [synonym_index[int(key.split(":")[1])] for key in model.select(pool, count, rng, target_success, accept)]
+
+
+def pick_adaptive_words(model, words, test_type, count, target_success, rng=random):
+    """Cümle sorusu (veya kelime kartı, test_type "card_...") için hedef başarı olasılığına uygun count kelime seç"""
+    def keys():
+        pairs = prepare_word_pairs(words)
+        if test_type.endswith(("en_to_tr", "tr_to_en")):
+            pairs = [pair for pair in pairs if pair[1]]
+        return [word_rating_key(test_type, en) for en, _, _ in pairs]
+
+    signature = (len(words), word_text(words[-1]) if words else None)
+    pool = model.pool(f"sentence:{test_type}", keys, signature)
+    prefix = f"w:{test_type}:"
+    return [key[len(prefix):] for key in model.select(pool, count, rng, target_success)]
@@ -0,0 +1,299 @@
+import json
+import math
+import os
+import threading
+from bisect import bisect_left, insort
+
+from file_sync import file_lock
+from word_quiz import word_rating_type
+
+# -------------------- Zorluk ve Yetenek Dereceleri --------------------
+# Her soru için bir zorluk (b), öğrenci için bir yetenek (θ) derecesi tutulur
+# (Rasch/Elo): doğru cevap olasılığı 1 / (1 + e^(b - θ)). Her cevapta iki
+# derece beklenen ile gerçek sonuç arasındaki farkla O(1) güncellenir; adım
+# büyüklüğü (K) kaydın cevap sayısı arttıkça küçülür.
+#
+# Dereceler zorluk_dereceleri.jsonl dosyasında sadece eklemeli bir günlük
+# olarak saklanır: her satır [anahtar, derece farkı, cevap sayısı farkı].
+# Cevap başına dosyaya iki satır eklenir (soru ve öğrenci); dosyanın tamamı
+# yeniden yazılmaz. Farklar toplanabilir olduğundan diğer süreçlerin
+# eklediği satırlar da aynı şekilde uygulanır (kaldığı yerden okunur).
+# Günlük uzayınca anahtar başına tek satıra sıkıştırılır.
+#
+# Uyarlamalı seçim için her soru havuzu zorluğa göre sıralı bir liste
+# tutar; hedef başarı olasılığına karşılık gelen zorluğun çevresindeki
+# sorular ikili aramayla bulunur.
+
+RATINGS_FILE = "zorluk_dereceleri.jsonl"
+LEARNER_KEY = "@learner"
+
+K_MAX = 0.8               # Yeni kayıtlarda adım büyüklüğü
+K_MIN = 0.08              # Çok cevaplanmış kayıtlarda en küçük adım
+K_DECAY = 0.05            # Cevap sayısı arttıkça adımın küçülme hızı
+DEFAULT_TARGET_SUCCESS = 0.7
+ADAPTIVE_WINDOW = 20      # Hedef zorluğa en yakın bu kadar soru arasından rastgele seçilir
+COMPACT_MIN_LINES = 5000  # Günlük en az bu kadar satır ve anahtar sayısının 2 katı olunca sıkıştırılır
+
+
+def success_probability(ability, difficulty):
+    """Yetenek ve zorluktan doğru cevap olasılığı"""
+    return 1.0 / (1.0 + math.exp(difficulty - ability))
+
+
+def target_difficulty(ability, target_success):
+    """Verilen başarı olasılığını sağlayan zorluk"""
+    p = min(max(target_success, 0.05), 0.95)
+    return ability - math.log(p / (1.0 - p))
+
+
+def k_factor(count):
+    """Cevap sayısına göre güncelleme adımı"""
+    return max(K_MIN, K_MAX / (1.0 + K_DECAY * count))
+
+
+def paragraph_rating_key(paragraph_id, question_id):
+    return f"p:{paragraph_id}:{question_id}"
+
+
+def synonym_rating_key(question_id):
+    return f"s:{question_id}"
+
+
+def word_rating_key(test_type, word):
+    return f"w:{test_type}:{word.lower()}"
+
+
+def rating_key(state):
+    """Soru durumunun derece anahtarı (derecelendirilemiyorsa None)"""
+    if state.section == "paragraph" and state.question_id is not None:
+        return paragraph_rating_key(state.item_id, state.question_id)
+    if state.section == "synonym" and state.item_id is not None:
+        return synonym_rating_key(state.item_id)
+    if state.section == "sentence" and state.item_id is not None:
+        return word_rating_key(state.test_type, state.item_id)  # Cümle sorularında item_id kelimedir
+    if state.section == "word" and state.item_id is not None:
+        return word_rating_key(word_rating_type(state.test_type), state.item_id)
+    return None
+
+
+class DifficultyPool:
+    """Zorluğa göre sıralı (derece, anahtar) listesi"""
+
+    def __init__(self):
+        self.entries = []        # [(derece, anahtar), ...] sıralı
+        self.members = {}        # anahtar -> listedeki derece
+        self.signature = None    # Son eşitlemedeki kaynak imzası
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key, rating):
+        self.members[key] = rating
+        insort(self.entries, (rating, key))
+
+    def remove(self, key):
+        rating = self.members.pop(key, None)
+        if rating is None:
+            return
+        position = bisect_left(self.entries, (rating, key))
+        if position < len(self.entries) and self.entries[position] == (rating, key):
+            del self.entries[position]
+
+    def move(self, key, rating):
+        """Üyenin derecesi değişti: sıradaki yerini güncelle"""
+        if key in self.members:
+            self.remove(key)
+            self.add(key, rating)
+
+    def sync(self, keys, rating_of):
+        """Havuzu anahtar listesine eşitle (sadece eklenen/çıkanlar işlenir)"""
+        current = set(keys)
+        for key in [key for key in self.members if key not in current]:
+            self.remove(key)
+        new_keys = [key for key in current if key not in self.members]
+        if len(new_keys) > len(self.entries):
+            # Toplu ilk yükleme: tek sıralama
+            for key in new_keys:
+                self.members[key] = rating_of(key)
+            self.entries = sorted((rating, key) for key, rating in self.members.items())
+        else:
+            for key in new_keys:
+                self.add(key, rating_of(key))
+
+    def nearest(self, target, count, rng=None):
+        """Zorluğu hedefe en yakın count anahtar (en yakın önce).
+
+        rng verilirse aynı dereceli büyük bloklarda (örn. hiç cevaplanmamış
+        sorular) aramaya bloğun rastgele bir yerinden başlanır; aksi halde
+        hep anahtar sırasına göre ilk sorular gelirdi.
+        """
+        entries = self.entries
+        right = bisect_left(entries, (target, ""))
+        if rng is not None and entries:
+            anchor = entries[min(right, len(entries) - 1)][0]
+            low = bisect_left(entries, (anchor, ""))
+            high = bisect_left(entries, (anchor, "\uffff"))
+            if high - low > count:
+                right = rng.randrange(low, high - count + 1)
+        left = right - 1
+        picked = []
+        while len(picked) < count and (left >= 0 or right < len(entries)):
+            if right >= len(entries) or (left >= 0 and target - entries[left][0] <= entries[right][0] - target):
+                picked.append(entries[left][1])
+                left -= 1
+            else:
+                picked.append(entries[right][1])
+                right += 1
+        return picked
+
+
+class RatingModel:
+    """Dereceler, sıralı havuzlar ve eklemeli günlük dosyası"""
+
+    def __init__(self, path=RATINGS_FILE):
+        self.path = path
+        self.ratings = {}        # anahtar -> [derece, cevap sayısı]
+        self.pools = {}          # havuz adı -> DifficultyPool
+        self.lock = threading.RLock()
+        self._offset = 0         # Günlükte okunan son bayt
+        self._inode = None       # Sıkıştırmada dosya değişir
+        self._lines = 0
+
+    # ---------- dereceler ----------
+
+    def rating(self, key):
+        entry = self.ratings.get(key)
+        return entry[0] if entry else 0.0
+
+    def count(self, key):
+        entry = self.ratings.get(key)
+        return entry[1] if entry else 0
+
+    def ability(self):
+        return self.rating(LEARNER_KEY)
+
+    def expected(self, key):
+        """Öğrencinin bu soruyu doğru cevaplama olasılığı"""
+        return success_probability(self.ability(), self.rating(key))
+
+    def _apply(self, key, delta, count):
+        entry = self.ratings.setdefault(key, [0.0, 0])
+        entry[0] += delta
+        entry[1] += count
+        if delta:
+            for pool in self.pools.values():
+                pool.move(key, entry[0])
+
+    # ---------- günlük ----------
+
+    def _read_tail(self):
+        """Günlüğün okunmamış kısmını uygula (sıkıştırıldıysa baştan)"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self.ratings = {}
+            self._offset = 0
+            self._lines = 0
+            self._inode = stat.st_ino
+            for pool in self.pools.values():
+                pool.signature = None  # Dereceler baştan okunuyor: havuzlar yeniden kurulur
+                pool.entries, pool.members = [], {}
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # Yarım satır bir sonraki okumaya kalır
+        for line in data[:end].splitlines():
+            try:
+                key, delta, count = json.loads(line)
+            except (ValueError, TypeError):
+                continue
+            self._apply(key, delta, count)
+            self._lines += 1
+        self._offset += end
+
+    def refresh(self):
+        """Diğer süreçlerin eklediği satırları oku"""
+        with self.lock, file_lock(self.path, exclusive=False):
+            self._read_tail()
+
+    def record(self, key, is_correct):
+        """Cevabı işle: soru zorluğunu ve öğrenci yeteneğini güncelle, günlüğe ekle.
+
+        Güncellemeden önceki başarı olasılığını döner.
+        """
+        with self.lock, file_lock(self.path, exclusive=True):
+            self._read_tail()
+            ability, difficulty = self.ability(), self.rating(key)
+            expected = success_probability(ability, difficulty)
+            error = (1.0 if is_correct else 0.0) - expected
+            learner_delta = round(k_factor(self.count(LEARNER_KEY)) * error, 5)
+            item_delta = round(-k_factor(self.count(key)) * error, 5)
+
+            lines = [(key, item_delta, 1), (LEARNER_KEY, learner_delta, 1)]
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(line) + "\n" for line in lines))
+            for line in lines:
+                self._apply(*line)
+            self._lines += len(lines)
+            stat = os.stat(self.path)
+            self._offset, self._inode = stat.st_size, stat.st_ino
+
+            if self._lines >= max(COMPACT_MIN_LINES, 2 * len(self.ratings)):
+                self._compact()
+            return expected
+
+    def _compact(self):
+        """Günlüğü anahtar başına tek satıra indir (özel kilit altında çağrılır)"""
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for key, (rating, count) in self.ratings.items():
+                f.write(json.dumps([key, round(rating, 5), count]) + "\n")
+        os.replace(temp_path, self.path)
+        stat = os.stat(self.path)
+        self._offset, self._inode, self._lines = stat.st_size, stat.st_ino, len(self.ratings)
+
+    # ---------- uyarlamalı seçim ----------
+
+    def pool(self, name, keys, signature):
+        """Adlı havuzu döndür; kaynak imzası değiştiyse anahtarlarla eşitle.
+
+        keys anahtarları üreten çağrılabilir nesnedir; sadece eşitleme
+        gerektiğinde çağrılır.
+        """
+        with self.lock:
+            pool = self.pools.setdefault(name, DifficultyPool())
+            if pool.signature != signature:
+                pool.sync(keys(), self.rating)
+                pool.signature = signature
+            return pool
+
+    def select(self, pool, count, rng, target_success=DEFAULT_TARGET_SUCCESS, accept=None):
+        """Hedef başarı olasılığına en yakın sorulardan count tane seç.
+
+        accept(anahtar) verilirse sadece kabul edilen anahtarlar seçilir.
+        Hedefin çevresindeki ADAPTIVE_WINDOW soru arasından rastgele seçilir.
+        """
+        with self.lock:
+            target = target_difficulty(self.ability(), target_success)
+            window = max(ADAPTIVE_WINDOW, count)
+            candidates = [key for key in pool.nearest(target, window * 3, rng) if accept is None or accept(key)]
+        candidates = candidates[:window]
+        return rng.sample(candidates, min(count, len(candidates)))
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_rating_model():
+    """Süreç genelinde paylaşılan, günlüğe eşitlenmiş derece modeli"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = RatingModel()
+    _model.refresh()
+    return _model
@@ -0,0 +1,112 @@
+from bisect import bisect_right
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from score_history import TIERS
+
+# -------------------- Cevap Süreleri --------------------
+# Soru gösterildiği an ile cevaplandığı an arasındaki süre, günlük kayıtta
+# test türü başına sabit kovalı bir histogram olarak tutulur:
+#   daily[gün]["response_times"][tür] = {"<kova no>": adet, ..., "sum": saniye}
+# Kayıt boyutu cevap sayısından bağımsızdır (en fazla kova sayısı kadar
+# alan). Kovalar sözlük olduğu için süreçler arası birleştirmede sayaçlar
+# farkla toplanır (bkz. file_sync) ve haftalık/aylık özetlere taşınırken
+# kova kova toplanır (bkz. score_history).
+
+RESPONSE_TIME_FIELD = "response_times"
+BUCKET_EDGES = (3, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180)  # Kova üst sınırları (saniye)
+MAX_COUNTED_SECONDS = 600  # Ortalama için bir cevaba sayılacak en uzun süre (boşta kalma)
+
+RESPONSE_TYPE_LABELS = {
+    "en_to_tr": "📝 Paragraf EN→TR",
+    "tr_to_en": "📝 Paragraf TR→EN",
+    "fill_blank": "📝 Paragraf Boşluk",
+    "sentence_en_to_tr": "✏️ Cümle EN→TR",
+    "sentence_tr_to_en": "✏️ Cümle TR→EN",
+    "sentence_fill_blank": "✏️ Cümle Boşluk",
+    "synonym": "🔗 Eş Anlamlı",
+    "word_en_to_tr": "🃏 Kelime EN→TR",
+    "word_tr_to_en": "🃏 Kelime TR→EN",
+}
+
+
+def response_key(section, test_type):
+    """Bölüm ve test türünden histogram anahtarı"""
+    if section in ("sentence", "word"):
+        return f"{section}_{test_type}"
+    if section == "synonym":
+        return "synonym"
+    return test_type
+
+
+def bucket_index(seconds):
+    """Sürenin düştüğü kova (son kova: son sınır ve üstü)"""
+    return bisect_right(BUCKET_EDGES, seconds)
+
+
+def bucket_labels():
+    """Kova etiketleri (grafik ekseni için)"""
+    labels = [f"<{BUCKET_EDGES[0]}s"]
+    labels += [f"{low}-{high}s" for low, high in zip(BUCKET_EDGES, BUCKET_EDGES[1:])]
+    labels.append(f"{BUCKET_EDGES[-1]}s+")
+    return labels
+
+
+def record_response_time(entry, key, seconds):
+    """Günlük kayda bir cevap süresi ekle"""
+    histogram = entry.setdefault(RESPONSE_TIME_FIELD, {}).setdefault(key, {})
+    bucket = str(bucket_index(seconds))
+    histogram[bucket] = histogram.get(bucket, 0) + 1
+    histogram["sum"] = round(histogram.get("sum", 0) + min(seconds, MAX_COUNTED_SECONDS), 1)
+
+
+def _entries(score_data, days, today):
+    """Histogramı okunacak kayıtlar: days verilirse sadece son days ham gün"""
+    if days is None:
+        for tier in TIERS:
+            yield from (score_data.get(tier) or {}).values()
+        return
+    cutoff = (today - timedelta(days=days - 1)).isoformat()
+    for key, entry in (score_data.get("daily") or {}).items():
+        if key >= cutoff:
+            yield entry
+
+
+def response_time_stats(score_data, days=None, today=None):
+    """Histogramları türlere göre topla.
+
+    (histogram DataFrame'i [satır: kova, sütun: tür], özet DataFrame'i
+    [adet, ortalama, medyan kovası]) döner. Veri yoksa iki boş DataFrame.
+    """
+    today = today or date.today()
+    bucket_count = len(BUCKET_EDGES) + 1
+    counts = {}
+    sums = {}
+    for entry in _entries(score_data, days, today):
+        for key, histogram in (entry.get(RESPONSE_TIME_FIELD) or {}).items():
+            row = counts.setdefault(key, np.zeros(bucket_count, dtype=np.int64))
+            for bucket, count in histogram.items():
+                if bucket != "sum" and bucket.isdigit() and int(bucket) < bucket_count:
+                    row[int(bucket)] += count
+            sums[key] = sums.get(key, 0) + histogram.get("sum", 0)
+
+    keys = [key for key in RESPONSE_TYPE_LABELS if key in counts and counts[key].sum()]
+    if not keys:
+        return pd.DataFrame(), pd.DataFrame()
+
+    labels = bucket_labels()
+    matrix = np.column_stack([counts[key] for key in keys])
+    names = [RESPONSE_TYPE_LABELS[key] for key in keys]
+    histogram_frame = pd.DataFrame(matrix, index=pd.Index(labels, name="Süre"), columns=names)
+
+    totals = matrix.sum(axis=0)
+    # Medyan: kümülatif adetin yarıyı geçtiği ilk kova
+    medians = (matrix.cumsum(axis=0) >= totals / 2).argmax(axis=0)
+    summary = pd.DataFrame({
+        "Cevap": totals,
+        "Ortalama (sn)": [round(sums[key] / total, 1) for key, total in zip(keys, totals)],
+        "Medyan": [labels[i] for i in medians],
+    }, index=pd.Index(names, name="Test Türü"))
+    return histogram_frame, summary
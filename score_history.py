@@ -0,0 +1,210 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+# -------------------- Puan Geçmişi Katmanları --------------------
+# score_data["daily"] sadece son raw_history_days günü ham olarak tutar.
+# Daha eski günler haftalık özetlere (score_data["weekly"], anahtar: haftanın
+# pazartesi tarihi), WEEKLY_WEEKS haftadan eski haftalar da aylık özetlere
+# (score_data["monthly"], anahtar: "YYYY-MM") toplanır. Sayısal alanlar
+# toplandığı için tüm toplamlar korunur; "days" ve "active_days" alanları
+# özetlenen gün sayısını tutar. İstatistik sayfası katmanları birleştirir.
+
+DEFAULT_RAW_DAYS = 90   # Ham tutulacak gün sayısı (ayarlardan değiştirilebilir)
+MIN_RAW_DAYS = 7
+WEEKLY_WEEKS = 52       # Haftalık özetlerin tutulacağı hafta sayısı
+
+TIERS = ("daily", "weekly", "monthly")
+
+MAX_CHART_POINTS = 365  # Ham (günlük) grafikte çizilecek en fazla nokta
+# Haftalık kovalar pazartesi başlar ve pazartesi tarihiyle etiketlenir (week_key ile aynı)
+RESOLUTIONS = {"daily": None, "weekly": "W-MON", "monthly": "MS"}
+
+
+def _parse_date(value):
+    return date.fromisoformat(value)
+
+
+def week_key(day):
+    """Günün ait olduğu haftanın anahtarı (pazartesi tarihi)"""
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def month_key(day):
+    """Günün ait olduğu ayın anahtarı"""
+    return day.strftime("%Y-%m")
+
+
+def _add_counts(target, entry):
+    """Sayısal alanları (iç içe sözlüklerdekiler dahil, örn. süre histogramları) topla"""
+    for key, value in entry.items():
+        if isinstance(value, dict):
+            _add_counts(target.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            target[key] = target.get(key, 0) + value
+
+
+def _add_summary(target, entry, days, active_days):
+    """entry'deki sayısal alanları target özetine ekle"""
+    _add_counts(target, {key: value for key, value in entry.items() if key not in ("days", "active_days")})
+    target["days"] = target.get("days", 0) + days
+    target["active_days"] = target.get("active_days", 0) + active_days
+
+
+def compact_history(score_data, today, raw_days=None):
+    """Eski günleri haftalık, eski haftaları aylık özetlere topla.
+
+    Taşınan kayıt sayısını döner. Günde bir kez (gün değişiminde) çağrılır.
+    """
+    raw_days = max(MIN_RAW_DAYS, raw_days or score_data.get("raw_history_days", DEFAULT_RAW_DAYS))
+    daily = score_data.setdefault("daily", {})
+    weekly = score_data.setdefault("weekly", {})
+    monthly = score_data.setdefault("monthly", {})
+    moved = 0
+
+    day_cutoff = today - timedelta(days=raw_days)
+    for key in [k for k in daily if _parse_date(k) < day_cutoff]:
+        entry = daily.pop(key)
+        active = 1 if entry.get("questions_answered", 0) > 0 else 0
+        _add_summary(weekly.setdefault(week_key(_parse_date(key)), {}), entry, 1, active)
+        moved += 1
+
+    week_cutoff = today - timedelta(weeks=WEEKLY_WEEKS)
+    for key in [k for k in weekly if _parse_date(k) < week_cutoff]:
+        entry = weekly.pop(key)
+        _add_summary(monthly.setdefault(month_key(_parse_date(key)), {}), entry,
+                     entry.get("days", 0), entry.get("active_days", 0))
+        moved += 1
+
+    if moved:
+        touch_history(score_data)
+    return moved
+
+
+# -------------------- Geçmiş Sürümü --------------------
+# Grafik verisi önbelleği bu anahtarla tutulur. Sayaç cevap kaydı ve
+# sıkıştırmada artırılır; içe aktarma/sıfırlama gibi toplu değişiklikleri de
+# yakalamak için katman boyutları ve toplam puan anahtara eklenir.
+
+def touch_history(score_data):
+    """Geçmiş değişti: sürüm sayacını artır"""
+    score_data["history_version"] = score_data.get("history_version", 0) + 1
+
+
+def history_version(score_data):
+    """Geçmişin O(1) sürüm anahtarı"""
+    return (
+        score_data.get("history_version", 0),
+        score_data.get("total_score", 0),
+        len(score_data.get("daily") or {}),
+        len(score_data.get("weekly") or {}),
+        len(score_data.get("monthly") or {}),
+    )
+
+
+# -------------------- Katmanları Birleştirme --------------------
+
+def _period_start(tier, key):
+    if tier == "monthly":
+        return pd.Timestamp(f"{key}-01")
+    return pd.Timestamp(key)
+
+
+def history_frame(score_data):
+    """Tüm katmanları tek DataFrame'de birleştir (dönem başına göre sıralı).
+
+    "period" sütunu satırın katmanını, "days" ve "active_days" özetlenen gün
+    sayılarını verir; ham günlerde ikisi de günün kendisinden hesaplanır.
+    """
+    rows = []
+    index = []
+    for tier in TIERS:
+        for key, entry in (score_data.get(tier) or {}).items():
+            # İç içe alanlar (cevap süresi histogramları) tabloya alınmaz
+            row = {key: value for key, value in entry.items() if not isinstance(value, dict)}
+            if tier == "daily":
+                row["days"] = 1
+                row["active_days"] = 1 if entry.get("questions_answered", 0) > 0 else 0
+            row["period"] = tier
+            rows.append(row)
+            index.append(_period_start(tier, key))
+    if not rows:
+        return pd.DataFrame()
+    frame = pd.DataFrame(rows, index=pd.DatetimeIndex(index)).sort_index()
+    numeric = frame.columns.drop("period")
+    frame[numeric] = frame[numeric].fillna(0)
+    return frame
+
+
+def history_totals(score_data):
+    """Tüm katmanlar üzerinden toplam sayılar"""
+    totals = {"days": 0, "active_days": 0, "questions_answered": 0, "correct": 0, "wrong": 0, "score": 0}
+    for entry in (score_data.get("daily") or {}).values():
+        totals["days"] += 1
+        totals["active_days"] += 1 if entry.get("questions_answered", 0) > 0 else 0
+        for key in ("questions_answered", "correct", "wrong", "score"):
+            totals[key] += entry.get(key, 0)
+    for tier in ("weekly", "monthly"):
+        for entry in (score_data.get(tier) or {}).values():
+            for key in totals:
+                totals[key] += entry.get(key, 0)
+    return totals
+
+
+# -------------------- Grafik Verisi --------------------
+
+def lttb_indices(y, threshold):
+    """Largest-Triangle-Three-Buckets: görsel şekli koruyan threshold nokta seç.
+
+    Noktalar eşit aralıklı kabul edilir; ilk ve son nokta her zaman korunur.
+    Seçilen noktaların sıralı indekslerini döner.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    x = np.arange(n, dtype=float)
+    # İlk ve son nokta hariç noktalar threshold - 2 kovaya bölünür
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Sonraki kovanın ortalaması üçgenin üçüncü köşesi olur
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs((x[previous] - avg_x) * (bucket_y - y[previous])
+                       - (x[previous] - bucket_x) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return selected
+
+
+def chart_series(frame, resolution="daily", max_points=MAX_CHART_POINTS):
+    """Puan grafiği serisi.
+
+    daily: ham günler ve özetlerin gün başına ortalaması, LTTB ile
+    max_points noktaya indirilir. weekly/monthly: dönem toplamları.
+    """
+    if frame.empty:
+        return pd.Series(dtype=float)
+    rule = RESOLUTIONS[resolution]
+    if rule is None:
+        series = frame["score"] / frame["days"].clip(lower=1)
+        if len(series) > max_points:
+            series = series.iloc[lttb_indices(series.to_numpy(), max_points)]
+        return series
+    # "W-MON" varsayılan olarak pazartesi biten haftaları verir; kovalar sola kapalı ve
+    # sol uçla etiketlenir ki özetlenmiş haftalarla aynı pazartesi-pazar aralığı olsun
+    return frame["score"].resample(rule, label="left", closed="left").sum()
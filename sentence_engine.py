@@ -0,0 +1,210 @@
+import json
+import os
+import random
+
+# -------------------- Cümle Şablon Motoru --------------------
+# Şablonlar cumle_sablonlari.json dosyasından bir kez yüklenip derlenir.
+# Her şablonun İngilizce ve Türkçe hali vardır; {en} ve {tr} yuvalarına
+# kelimeler.json'daki en/tr çiftleri yerleştirilir. Böylece çeviri
+# sorularının doğru cevabı gerçek bir çeviri olur.
+
+TEMPLATE_FILE = "cumle_sablonlari.json"
+BLANK = "_____"
+
+DEFAULT_TEMPLATES = [
+    {"pos": "noun", "en": "Everyone is talking about {en} these days.",
+     "tr": "Bugünlerde herkes {tr} hakkında konuşuyor."},
+    {"pos": "noun", "en": "The article explains the concept of {en} in detail.",
+     "tr": "Makale {tr} kavramını ayrıntılı olarak açıklıyor."},
+    {"pos": "noun", "en": "We discussed the issue of {en} at the meeting.",
+     "tr": "Toplantıda {tr} konusunu tartıştık."},
+    {"pos": "noun", "en": "The report focuses mainly on {en}.",
+     "tr": "Rapor esas olarak {tr} üzerine odaklanıyor."},
+    {"pos": "verb", "en": "It is not easy to {en} in such a short time.",
+     "tr": "Bu kadar kısa sürede {tr} kolay değildir."},
+    {"pos": "verb", "en": "We have to {en} before the deadline.",
+     "tr": "Son tarihten önce {tr} zorundayız."},
+    {"pos": "verb", "en": "The company wants to {en} as soon as possible.",
+     "tr": "Şirket mümkün olan en kısa sürede {tr} istiyor."},
+    {"pos": "verb", "en": "Many students find it difficult to {en} on their own.",
+     "tr": "Birçok öğrenci kendi başına {tr} zor buluyor."},
+    {"pos": "adj", "en": "This is a very {en} idea for our project.",
+     "tr": "Bu, projemiz için çok {tr} bir fikir."},
+    {"pos": "adj", "en": "The results of the study were quite {en}.",
+     "tr": "Çalışmanın sonuçları oldukça {tr} idi."},
+    {"pos": "adj", "en": "Experts believe the new policy is {en}.",
+     "tr": "Uzmanlar yeni politikanın {tr} olduğuna inanıyor."},
+]
+
+VERB_SUFFIXES = ("mek", "mak")
+
+
+class SentenceTemplate:
+    """Derlenmiş şablon: yuvanın öncesi ve sonrası ayrı tutulur"""
+
+    __slots__ = ("pos", "en_prefix", "en_suffix", "tr_prefix", "tr_suffix")
+
+    def __init__(self, pos, en, tr):
+        self.pos = pos
+        self.en_prefix, self.en_suffix = en.split("{en}", 1)
+        self.tr_prefix, self.tr_suffix = tr.split("{tr}", 1)
+
+    def english(self, word):
+        return self.en_prefix + word + self.en_suffix
+
+    def turkish(self, word):
+        return self.tr_prefix + word + self.tr_suffix
+
+    def blank(self):
+        return self.en_prefix + BLANK + self.en_suffix
+
+
+def compile_templates(raw_templates):
+    """Ham şablonları derle, yuvası eksik olanları atla"""
+    compiled = []
+    for template in raw_templates:
+        en = template.get("en", "")
+        tr = template.get("tr", "")
+        if en.count("{en}") == 1 and tr.count("{tr}") == 1:
+            compiled.append(SentenceTemplate(template.get("pos", "noun"), en, tr))
+    return compiled
+
+
+_compiled_templates = None
+
+
+def load_templates():
+    """Şablonları dosyadan yükle ve bir kez derle"""
+    global _compiled_templates
+    if _compiled_templates is None:
+        raw_templates = DEFAULT_TEMPLATES
+        try:
+            if os.path.exists(TEMPLATE_FILE):
+                with open(TEMPLATE_FILE, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                    if isinstance(loaded, list) and loaded:
+                        raw_templates = loaded
+            else:
+                # Varsayılan şablonları kaydet
+                with open(TEMPLATE_FILE, "w", encoding="utf-8") as f:
+                    json.dump(DEFAULT_TEMPLATES, f, ensure_ascii=False, indent=2)
+        except (OSError, ValueError):
+            raw_templates = DEFAULT_TEMPLATES
+        _compiled_templates = compile_templates(raw_templates) or compile_templates(DEFAULT_TEMPLATES)
+    return _compiled_templates
+
+
+def guess_pos(tr):
+    """Türkçe karşılıktan kelime türünü tahmin et (mastar eki -> fiil)"""
+    if tr and tr.strip().lower().endswith(VERB_SUFFIXES):
+        return "verb"
+    return "noun"
+
+
+def word_text(word):
+    """Kelime kaydının İngilizce metni (eski düz metin kayıtlar da desteklenir)"""
+    return word.get("en", "") if isinstance(word, dict) else str(word)
+
+
+def prepare_word_pairs(words):
+    """Kelimeleri (en, tr, pos) üçlülerine çevir; tr'si olmayanlar None alır"""
+    pairs = []
+    for word in words:
+        if isinstance(word, dict):
+            en = (word.get("en") or "").strip()
+            tr = (word.get("tr") or "").strip() or None
+            pos = word.get("pos") or guess_pos(tr)
+        else:
+            en, tr, pos = str(word).strip(), None, "noun"
+        if en:
+            pairs.append((en, tr, pos))
+    return pairs
+
+
+def _wrong_words(en, tr, question_type, same_pos, distractors, rng):
+    """Yanlış seçenek olacak 3 kelime (en, tr) seç.
+
+    Çeldirici index'i verilmişse önceden hesaplanmış benzer kelime havuzu
+    kullanılır; havuz yetmezse aynı türden rastgele kelimelerle tamamlanır.
+    """
+    picked = []
+    if distractors is not None:
+        for word in distractors.pick(en, 3, rng):
+            word_tr = distractors.translation(word)
+            if question_type == "fill_blank" or word_tr:
+                picked.append((word, word_tr))
+    if len(picked) < 3:
+        taken = {en} | {w for w, _ in picked}
+        # Aynı Türkçe karşılığa sahip kelimeler de doğru olacağından çıkarılır
+        pool = [(p[0], p[1]) for p in same_pos if p[0] not in taken and (p[1] != tr or not tr)]
+        pool = list(dict.fromkeys(pool))
+        picked += rng.sample(pool, min(3 - len(picked), len(pool)))
+    return picked
+
+
+def generate_sentence_questions(words, question_type, count, rng=random, distractors=None,
+                                targets=None, with_words=False):
+    """Tek geçişte count adet cümle sorusu üret.
+
+    Her soru (soru_metni, doğru_cevap, seçenekler) üçlüsüdür. Kelime çiftleri
+    ve türlere göre gruplama bir kez yapılır; şablon ve kelime seçimleri tüm
+    soru seti için toplu örneklenir. distractors bir DistractorIndex ise
+    yanlış seçenekler onun havuzlarından alınır.
+
+    targets verilirse (İngilizce kelimeler, örn. uyarlamalı seçimden) rastgele
+    seçim yerine bu kelimeler kullanılır. with_words ise her soruya
+    kullanılan kelime dördüncü eleman olarak eklenir.
+    """
+    if question_type not in ("en_to_tr", "tr_to_en", "fill_blank"):
+        return []
+
+    templates = load_templates()
+    pairs = prepare_word_pairs(words)
+    if question_type in ("en_to_tr", "tr_to_en"):
+        # Çeviri sorusu için Türkçe karşılığı olan kelimeler gerekir
+        pairs = [pair for pair in pairs if pair[1]]
+    if len(pairs) < 3 or not templates or count <= 0:
+        return []
+
+    by_pos = {}
+    for pair in pairs:
+        by_pos.setdefault(pair[2], []).append(pair)
+    templates_by_pos = {}
+    for template in templates:
+        templates_by_pos.setdefault(template.pos, []).append(template)
+
+    # Şablonu olan kelimeler arasından toplu seçim
+    usable = [pair for pair in pairs if pair[2] in templates_by_pos]
+    if not usable:
+        return []
+    if targets is not None:
+        by_word = {pair[0].lower(): pair for pair in usable}
+        chosen_words = [by_word[word.lower()] for word in targets if word.lower() in by_word]
+    else:
+        chosen_words = rng.choices(usable, k=count)
+
+    questions = []
+    for en, tr, pos in chosen_words:
+        template = rng.choice(templates_by_pos[pos])
+        same_pos = by_pos[pos] if len(by_pos[pos]) >= 4 else pairs
+
+        wrong = _wrong_words(en, tr, question_type, same_pos, distractors, rng)
+
+        if question_type == "en_to_tr":
+            question = template.english(en)
+            correct_answer = template.turkish(tr)
+            options = [correct_answer] + [template.turkish(w_tr) for _, w_tr in wrong]
+        elif question_type == "tr_to_en":
+            question = template.turkish(tr)
+            correct_answer = template.english(en)
+            options = [correct_answer] + [template.english(w_en) for w_en, _ in wrong]
+        else:
+            question = template.blank()
+            correct_answer = en
+            options = [correct_answer] + [w_en for w_en, _ in wrong]
+
+        rng.shuffle(options)
+        questions.append((question, correct_answer, options, en) if with_words
+                         else (question, correct_answer, options))
+
+    return questions
@@ -0,0 +1,239 @@
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+from questions import QuestionState
+
+# -------------------- Oturum Kaydı ve Tekrarı --------------------
+# Her oturum kendi tohumlu rastgele sayı üretecini (random.Random) kullanır ve
+# soru seçen tüm fonksiyonlara (quiz, sentence_engine, exam) rng olarak verir.
+# Aynı tohum, aynı veri ve aynı cevaplar aynı soru sırasını üretir.
+#
+# Kayıt açıksa oturum JSONL olarak yazılır (satır başına bir olay):
+#   {"event": "session", "seed", "started", "counts": {koleksiyon: kayıt sayısı}}
+#   {"event": "question", "serial", "section", "type", "item_id", "question_id",
+#    "question_key", "question_text", "correct_answer", "options"}
+#   {"event": "answer", "serial", "answer", "correct", "response_time", "at"}
+#   (yazılı cevaplarda ayrıca "match", "distance", "expected"; bkz. answer_match)
+#
+# replay_session kaydı aynı tohumla QuizService'e (bkz. api_server) yeniden
+# oynatır: her soru motora yeniden seçtirilir ve kayıttakiyle karşılaştırılır,
+# cevaplar yeniden puanlanır, her adımın süresi ölçülür. Seçim farklıysa
+# (veri değişmiş veya kayıt farklı bir çağrı sırasıyla, örn. arayüzün önceden
+# hazırlama tamponuyla yapılmış) kayıttaki soru sorulur; fark raporlanır.
+
+SESSION_DIR = "oturumlar"
+MAX_REPORTED_MISMATCHES = 50
+
+
+def new_seed():
+    """Oturum için yeni tohum"""
+    return random.SystemRandom().randrange(2 ** 32)
+
+
+def data_counts(store):
+    """Kayıttaki verinin tekrarla aynı olup olmadığını anlamak için kayıt sayıları"""
+    return {name: len(getattr(store, name)) for name in ("paragraflar", "words", "synonyms")}
+
+
+def _jsonable(value):
+    return list(value) if isinstance(value, tuple) else value
+
+
+class SessionRecorder:
+    """Oturumdaki soruları ve cevapları JSONL dosyasına ekler"""
+
+    def __init__(self, path, seed, counts=None):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Satır tamponlu: süreç beklenmedik biterse de yazılan olaylar dosyada kalır
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._write({"event": "session", "seed": seed,
+                     "started": datetime.now().isoformat(timespec="seconds"), "counts": counts or {}})
+
+    @classmethod
+    def in_directory(cls, seed, counts=None, directory=SESSION_DIR):
+        """Klasörde zaman damgalı yeni kayıt dosyası aç"""
+        name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{seed}.jsonl"
+        return cls(os.path.join(directory, name), seed, counts)
+
+    def _write(self, event):
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def question(self, state):
+        """Gösterilen soruyu kaydet"""
+        self._write({
+            "event": "question",
+            "serial": state.serial,
+            "section": state.section,
+            "type": state.test_type,
+            "item_id": state.item_id,
+            "question_id": state.question_id,
+            "question_key": state.question_key,
+            "question_text": state.question_text,
+            "correct_answer": state.correct_answer,
+            "options": list(state.options),
+        })
+
+    def answer(self, serial, selected, is_correct, response_time=None, match=None):
+        """Verilen cevabı kaydet (match: yazılı cevabın eşleşme sonucu)"""
+        event = {
+            "event": "answer",
+            "serial": serial,
+            "answer": _jsonable(selected),
+            "correct": bool(is_correct),
+            "response_time": round(response_time, 3) if response_time is not None else None,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        if match is not None:
+            event["match"], event["distance"], event["expected"] = match
+        self._write(event)
+
+    def close(self):
+        self._file.close()
+
+
+def read_session(path):
+    """Kayıt dosyasını oku: (başlık, olaylar)"""
+    header = None
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from None
+            if event.get("event") == "session":
+                if header is None:
+                    header = event
+            else:
+                events.append(event)
+    if header is None:
+        raise ValueError(f"{path}: oturum başlığı bulunamadı")
+    return header, events
+
+
+# -------------------- Tekrar --------------------
+
+def _selection(event_or_state):
+    """Seçimin karşılaştırılan kısmı (soru kaynağı ve seçenek sırası)"""
+    if isinstance(event_or_state, QuestionState):
+        state = event_or_state
+        return (state.section, state.item_id, state.question_id, state.question_text, list(state.options))
+    event = event_or_state
+    return (event["section"], event["item_id"], event["question_id"], event["question_text"], event["options"])
+
+
+def _state_from_event(event):
+    return QuestionState(event["section"], event["type"], event["options"], item_id=event["item_id"],
+                         question_id=event["question_id"], question_key=event["question_key"],
+                         question_text=event["question_text"], correct_answer=event["correct_answer"])
+
+
+class _Timings:
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def summary(self):
+        result = {}
+        for name, samples in self.samples.items():
+            samples = sorted(samples)
+            result[name] = {
+                "count": len(samples),
+                "total_ms": round(sum(samples) * 1000, 3),
+                "median_ms": round(samples[len(samples) // 2] * 1000, 3),
+                "max_ms": round(samples[-1] * 1000, 3),
+            }
+        return result
+
+
+def replay_session(path, service):
+    """Kaydı QuizService üzerinde yeniden oynat ve raporu döndür.
+
+    Servisin deposu kayıttaki veriyle aynı olmalıdır (bkz. data_counts);
+    servis dosyalara yazmaz (flush çağrılmaz), ama derece modeline
+    verilen model cevapları kaydeder.
+    """
+    header, events = read_session(path)
+    service.rng.seed(header["seed"])
+    next_question = {
+        "paragraph": service.next_paragraph_question,
+        "sentence": service.next_sentence_question,
+        "synonym": service.next_synonym_question,
+        "word": service.next_word_question,
+    }
+
+    tokens = {}        # Kayıttaki soru sıra no -> servisteki token
+    mismatches = []
+    counts = {"questions": 0, "matched": 0, "diverged": 0, "answers": 0, "answer_mismatches": 0, "skipped": 0}
+    timings = _Timings()
+
+    def mismatch(kind, event, **details):
+        if len(mismatches) < MAX_REPORTED_MISMATCHES:
+            mismatches.append({"kind": kind, "serial": event.get("serial"), **details})
+
+    for event in events:
+        kind = event.get("event")
+        if kind == "question":
+            counts["questions"] += 1
+            params = {} if event["section"] == "synonym" else {"type": event["type"]}
+            error = None
+            started = time.perf_counter()
+            try:
+                token = next_question[event["section"]](params)["token"]
+            except Exception as e:  # Soru seçilemediyse (örn. veri farklı) kayıttaki soru sorulur
+                token = None
+                error = str(e)
+            timings.add(event["section"], time.perf_counter() - started)
+
+            state = service.pending.get(token) if token is not None else None
+            if state is not None and _selection(state) == _selection(event):
+                counts["matched"] += 1
+            else:
+                counts["diverged"] += 1
+                replayed = _selection(state) if state is not None else error
+                mismatch("question", event, recorded=_selection(event), replayed=replayed)
+                if token is not None:
+                    service.pending.pop(token, None)
+                token = service.add_pending(_state_from_event(event))
+            tokens[event["serial"]] = token
+
+        elif kind == "answer":
+            token = tokens.pop(event["serial"], None)
+            if token is None:
+                counts["skipped"] += 1
+                continue
+            counts["answers"] += 1
+            started = time.perf_counter()
+            try:
+                result = service.submit_answer({"token": token, "answer": event["answer"],
+                                                "free_text": "expected" in event})
+            except Exception as e:
+                counts["answer_mismatches"] += 1
+                mismatch("answer", event, recorded=event["correct"], replayed=str(e))
+                continue
+            timings.add("answer", time.perf_counter() - started)
+            if result["correct"] != event["correct"]:
+                counts["answer_mismatches"] += 1
+                mismatch("answer", event, recorded=event["correct"], replayed=result["correct"])
+
+    with service.store.read():
+        current_counts = data_counts(service.store)
+    return {
+        "seed": header["seed"],
+        "started": header.get("started"),
+        "data_matches": not header.get("counts") or header["counts"] == current_counts,
+        **counts,
+        "mismatches": mismatches,
+        "timings": timings.summary(),
+    }
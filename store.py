@@ -0,0 +1,334 @@
+import threading
+from contextlib import contextmanager
+
+from file_sync import SyncedFile, replace_in_place
+from paragraph_schema import ParagraphBank
+from questions import next_item_id
+from response_times import record_response_time
+from score_history import touch_history
+
+# -------------------- Paylaşılan Veri Deposu --------------------
+# Streamlit her oturumu ayrı bir thread'de çalıştırır. Paragraflar, puanlar,
+# kelimeler ve eş anlamlı sorular süreç genelinde tek bir DataStore'da
+# tutulur; her çalıştırmada diskten yeniden okunmaz. Okumalar paylaşımlı,
+# değişiklikler tek yazıcılı kilit altında yapılır. Değişiklik ve kayıt aynı
+# yazma kilidi içinde yapıldığında başka bir oturumun güncellemesi kaybolmaz.
+# Diğer süreçlerle paylaşım için her koleksiyon bir SyncedFile'a bağlanır
+# (bkz. file_sync): kayıtlar birleştirilerek yazılır, başka süreçte değişen
+# dosyalar bir sonraki çalıştırmada tek tek yeniden okunur.
+#
+# Her koleksiyonun bir sürüm sayacı vardır: yükleme, yeniden okuma, ekleme,
+# silme ve kayıtta artırılır. Koleksiyondan türetilen önbellekler (örn.
+# çeldirici index'i, paragraf indeksi) sürüm değişmedikçe yeniden
+# hesaplanmaz; yerinde yapılan düzenlemeler kaydedildiğinde (save_file) veya
+# touch ile bildirildiğinde sürüm artar.
+
+COLLECTIONS = ("paragraflar", "score_data", "words", "synonyms")
+
+
+class RWLock:
+    """Okuyucu-yazıcı kilidi.
+
+    Birden fazla okuyucu aynı anda girebilir; yazıcı tek başına girer.
+    Bekleyen yazıcı varsa yeni okuyucular bekler (yazıcı açlığı olmaz).
+    Yazıcı aynı thread'de yeniden yazabilir ve okuyabilir; okuma kilidi
+    tutarken yazmaya yükseltme desteklenmez.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = None          # Yazma kilidini tutan thread
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        depth = getattr(self._local, "read_depth", 0)
+        # İç içe okuma ve yazıcının kendi okuması beklemeden geçer
+        nested = depth > 0 or self._writer == me
+        if not nested:
+            with self._cond:
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.read_depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.read_depth = depth
+            if not nested:
+                with self._cond:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+            else:
+                self._waiting_writers += 1
+                try:
+                    while self._writer is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = me
+                self._writer_depth = 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer_depth -= 1
+                if not self._writer_depth:
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+class DataStore:
+    """Süreç genelinde paylaşılan veriler ve atomik güncelleme işlemleri.
+
+    İşlemler yazma kilidini kendileri alır; birden fazla işlemi ve diske
+    kaydı tek adımda yapmak için çağıran taraf write() içinde çağırabilir.
+    """
+
+    def __init__(self):
+        self.lock = RWLock()
+        self.paragraflar = []
+        self.score_data = {}
+        self.words = []
+        self.synonyms = []
+        self.files = {}          # koleksiyon adı -> SyncedFile
+        self.loaded = False
+        self._next_ids = {}      # koleksiyon adı -> sıradaki id (ilk eklemede bir kez hesaplanır)
+        self.versions = dict.fromkeys(COLLECTIONS, 0)  # koleksiyon adı -> değişiklik sayacı
+        self._paragraph_bank = None  # (paragraflar sürümü, ParagraphBank)
+
+    def read(self):
+        return self.lock.read()
+
+    def write(self):
+        return self.lock.write()
+
+    def version(self, name):
+        """Koleksiyonun sürümü (her değişiklikte artar)"""
+        return self.versions[name]
+
+    def touch(self, name):
+        """Koleksiyon yerinde değiştirildi (örn. sorular yeniden üretildi): sürümü artır"""
+        with self.write():
+            self.versions[name] += 1
+
+    def paragraph_bank(self):
+        """Paragrafların id ve test türü indeksi (paragraflar değişmedikçe yeniden kurulmaz)"""
+        with self.read():
+            version = self.versions["paragraflar"]
+            cached = self._paragraph_bank
+            if cached is None or cached[0] != version:
+                cached = self._paragraph_bank = (version, ParagraphBank(self.paragraflar))
+            return cached[1]
+
+    # -------------------- Yükleme --------------------
+
+    def set_data(self, paragraflar, score_data, words, synonyms):
+        """Diskten yüklenen verileri depoya al.
+
+        İçerik yerinde değiştirilir; böylece önceki çalıştırmalardan kalan
+        referanslar (callback'ler) yeniden yüklemeden sonra da geçerli olur.
+        """
+        with self.write():
+            self.paragraflar[:] = paragraflar
+            self.score_data.clear()
+            self.score_data.update(score_data)
+            self.words[:] = words
+            self.synonyms[:] = synonyms
+            self._next_ids.clear()
+            for name in COLLECTIONS:
+                self.versions[name] += 1
+            self.loaded = True
+
+    def invalidate(self):
+        """Dosyalar dışarıdan değişti (geri yükleme vb.): sonraki çalıştırmada yeniden yükle"""
+        with self.write():
+            self.loaded = False
+
+    def replace(self, name, data):
+        """Bir koleksiyonun içeriğini yerinde değiştir (içe aktarma, sıfırlama)"""
+        with self.write():
+            replace_in_place(getattr(self, name), data)
+            self._next_ids.pop(name, None)
+            self.versions[name] += 1
+
+    # -------------------- Dosyalar --------------------
+
+    def track(self, name, path, merge):
+        """Koleksiyonu diskteki dosyasına bağla (süreç başına bir kez)"""
+        if name not in self.files:
+            self.files[name] = SyncedFile(path, merge)
+
+    def load_file(self, name):
+        """Koleksiyonun dosyasını kilitli oku (yoksa None)"""
+        return self.files[name].load()
+
+    def save_file(self, name, data=None):
+        """Koleksiyonu (veya verilen veriyi) diğer süreçlerin değişiklikleriyle birleştirerek kaydet"""
+        with self.write():
+            target = getattr(self, name) if data is None else data
+            merged = self.files[name].save(target)
+            if merged and data is None:
+                self._next_ids.pop(name, None)  # Birleştirmede id'ler değişmiş olabilir
+            self.versions[name] += 1  # Kaydedilen içerik yerinde düzenlenmiş olabilir
+            return merged
+
+    def refresh(self):
+        """Başka süreçlerin değiştirdiği dosyaları yeniden oku; değişen adları döner"""
+        changed = []
+        with self.write():
+            for name, synced in self.files.items():
+                if synced.changed():
+                    data = synced.load()
+                    if data is not None:
+                        replace_in_place(getattr(self, name), data)
+                        self._next_ids.pop(name, None)
+                        self.versions[name] += 1
+                        changed.append(name)
+        return changed
+
+    # -------------------- Sayaçlar --------------------
+
+    def increment(self, counters, day=None):
+        """Genel sayaçları (ve verildiyse o günün sayaçlarını) artır"""
+        with self.write():
+            for key, amount in counters.items():
+                self.score_data[key] = self.score_data.get(key, 0) + amount
+            if day is not None:
+                daily = self.score_data["daily"][day]
+                for key, amount in counters.items():
+                    daily[key] = daily.get(key, 0) + amount
+
+    def record_answer(self, day, counter_key, is_correct, points, response_time=None):
+        """Cevap sonucunu puan, sayaç ve serilere tek adımda işle.
+
+        response_time verilirse (histogram anahtarı, saniye) günün cevap
+        süresi histogramına eklenir.
+        """
+        with self.write():
+            score_data = self.score_data
+            daily = score_data["daily"][day]
+
+            score_data["questions_answered_today"] += 1
+            score_data[counter_key] += 1
+            daily[counter_key] += 1
+
+            if is_correct:
+                score_data["total_score"] += points
+                daily["score"] += points
+                daily["correct"] += 1
+                score_data["correct_streak"] += 1
+                score_data["wrong_streak"] = 0
+            else:
+                daily["wrong"] += 1
+                score_data["wrong_streak"] += 1
+                score_data["correct_streak"] = 0
+
+            daily["questions_answered"] += 1
+            if response_time is not None:
+                record_response_time(daily, *response_time)
+            touch_history(score_data)
+
+    # -------------------- Paragraf Soruları --------------------
+
+    def mark_question_used(self, paragraf, question_key):
+        """Soruyu kullanıldı olarak işaretle; daha önce işaretliyse False döner"""
+        with self.write():
+            used_questions = paragraf.setdefault("used_questions", [])
+            if question_key in used_questions:
+                return False
+            used_questions.append(question_key)
+            return True
+
+    def reset_used_questions(self, paragraf=None, test_type=None):
+        """Kullanılan soru kayıtlarını sıfırla.
+
+        paragraf verilmezse tüm paragraflar, test_type verilirse sadece o
+        türün kayıtları sıfırlanır.
+        """
+        with self.write():
+            targets = self.paragraflar if paragraf is None else [paragraf]
+            for target in targets:
+                if test_type is None:
+                    target["used_questions"] = []
+                else:
+                    of_type = {q.get("id") for q in target.get("questions", []) if q.get("type") == test_type}
+                    target["used_questions"] = [
+                        q for q in target.get("used_questions", []) if q not in of_type]
+
+    # -------------------- Öğe Ekleme / Silme --------------------
+
+    def next_id(self, name):
+        """Koleksiyon için yeni id (sayaç sadece ilk seferde listeden hesaplanır)"""
+        with self.write():
+            if name not in self._next_ids:
+                self._next_ids[name] = next_item_id(getattr(self, name))
+            value = self._next_ids[name]
+            self._next_ids[name] = value + 1
+            return value
+
+    def add_item(self, name, item, assign_id=False):
+        """Koleksiyona öğe ekle; assign_id ise kilit altında yeni id ver"""
+        with self.write():
+            items = getattr(self, name)
+            if assign_id:
+                item["id"] = self.next_id(name)
+            items.append(item)
+            self.versions[name] += 1
+            return item
+
+    def add_items(self, name, new_items, key=None):
+        """Koleksiyonda olmayan öğeleri ekle; eklenen sayıyı döner.
+
+        key verilirse öğeler key(item) değerine göre karşılaştırılır.
+        """
+        key = key or (lambda value: value)
+        with self.write():
+            items = getattr(self, name)
+            existing = {key(item) for item in items}
+            added = 0
+            for item in new_items:
+                if key(item) not in existing:
+                    existing.add(key(item))
+                    items.append(item)
+                    added += 1
+            if added:
+                self.versions[name] += 1
+            return added
+
+    def remove_item(self, name, item):
+        """Öğeyi koleksiyondan sil; bulunamazsa (başka oturum sildiyse) False döner"""
+        with self.write():
+            items = getattr(self, name)
+            try:
+                items.remove(item)
+            except ValueError:
+                return False
+            self.versions[name] += 1
+            return True
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Süreç genelindeki tek DataStore örneği"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DataStore()
+    return _store
@@ -0,0 +1,37 @@
+from datetime import date
+
+import pandas as pd
+
+from score_history import chart_series, compact_history, history_frame, week_key
+
+
+def _day(score):
+    return {"score": score, "questions_answered": 1}
+
+
+def test_weekly_bins_start_on_monday():
+    # 2024-01-08 ve 2024-01-15 pazartesi: pazar bir önceki haftada, pazartesi yeni haftada kalmalı
+    score_data = {
+        "daily": {"2024-01-07": _day(1), "2024-01-08": _day(10), "2024-01-14": _day(100)},
+        "weekly": {"2024-01-15": {"score": 1000, "days": 7, "active_days": 7}},
+    }
+    series = chart_series(history_frame(score_data), "weekly")
+
+    assert series.to_dict() == {
+        pd.Timestamp("2024-01-01"): 1,
+        pd.Timestamp("2024-01-08"): 110,
+        pd.Timestamp("2024-01-15"): 1000,
+    }
+
+
+def test_weekly_bins_match_compacted_weeks():
+    days = pd.date_range("2024-01-01", "2024-02-29").date
+    score_data = {"daily": {day.isoformat(): _day(i) for i, day in enumerate(days)}}
+    before = chart_series(history_frame(score_data), "weekly")
+
+    compact_history(score_data, date(2024, 3, 1), raw_days=30)
+    after = chart_series(history_frame(score_data), "weekly")
+
+    assert score_data["weekly"]
+    assert all(week_key(date.fromisoformat(key)) == key for key in score_data["weekly"])
+    pd.testing.assert_series_equal(before, after)
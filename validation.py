@@ -0,0 +1,305 @@
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from paragraph_store import PARAGRAPH_TEXT_FILE, TEXT_REF_FIELD
+from sentence_engine import word_text
+
+# -------------------- İçerik Doğrulama --------------------
+# Paragraf soruları, kelimeler ve eş anlamlı sorular kayıt bazında denetlenir
+# (doğru cevap seçeneklerde mi, seçenekler tekrarlı mı, alanlar boş mu...).
+# Kayıt kontrolleri birbirinden bağımsız olduğu için büyük listeler parçalara
+# bölünüp süreç havuzunda denetlenir; koleksiyon genelindeki kontroller
+# (tekrarlanan id ve kelimeler) ana süreçte yapılır.
+#
+# Kayıtları çalışanlara göndermek (pickle) denetlemekten birkaç kat pahalı
+# olduğu için çalışanlar fork ile başlatılır: listeleri ana süreçten devralır,
+# görevler sadece parça sınırlarını, sonuçlar sadece hataları taşır. Çok
+# thread'li bir süreçte (Streamlit arayüzü, HTTP API) fork edilen çalışan,
+# başka thread'lerin tuttuğu kilitleri kilitli devralabileceğinden havuz
+# sadece tek thread'li süreçlerde (komut satırı) kullanılır. fork olmayan
+# platformlarda ve çok thread'li süreçlerde denetim tek süreçte yapılır.
+#
+# Sonuç JSON'a yazılabilen bir rapordur:
+#   {"checked": {koleksiyon: kayıt sayısı}, "error_count": n,
+#    "errors": [{"collection", "index", "id", "question_id", "code", "message"}, ...]}
+
+PARALLEL_THRESHOLD = 50000   # Bundan az kayıt süreç havuzu kullanmadan denetlenir
+CHUNK_SIZE = 5000            # Çalışana gönderilen parça büyüklüğü
+MIN_OPTIONS = 2
+
+PARAGRAPH_QUESTION_TYPES = ("en_to_tr", "tr_to_en", "fill_blank")
+SYNONYM_QUESTION_TYPES = ("synonym", "meaning")
+
+MESSAGES = {
+    "not_object": "Kayıt bir JSON nesnesi değil",
+    "empty_paragraph": "Paragraf metni boş",
+    "bad_text_ref": "Metin referansı metin dosyasının dışında",
+    "bad_questions": "questions bir liste değil",
+    "bad_sentences": "sentences bir liste değil",
+    "empty_sentence": "Cümle metni veya cevabı boş",
+    "question_not_object": "Soru bir JSON nesnesi değil",
+    "unknown_type": "Bilinmeyen soru türü",
+    "empty_question": "Soru metni boş",
+    "too_few_options": f"En az {MIN_OPTIONS} seçenek olmalı",
+    "bad_options": "Seçenekler metin veya sayı olmalı",
+    "duplicate_options": "Seçenekler tekrarlı",
+    "correct_answer_missing": "Doğru cevap seçenekler arasında bulunmuyor",
+    "duplicate_question_id": "Paragrafta aynı soru id'si birden fazla",
+    "not_word": "Kelime metin veya JSON nesnesi değil",
+    "empty_word": "Kelimenin İngilizce metni boş",
+    "bad_wrong_count": "wrong_count negatif olmayan bir tam sayı değil",
+    "correct_answers_missing": "Doğru cevaplar boş",
+    "correct_answers_not_in_options": "Doğru cevaplar seçenekler arasında bulunmuyor",
+    "duplicate_id": "Aynı id birden fazla kayıtta",
+    "duplicate_word": "Aynı kelime birden fazla kayıtta",
+}
+
+
+def _error(errors, collection, index, item, code, question_id=None, detail=None):
+    message = MESSAGES[code] if detail is None else f"{MESSAGES[code]}: {detail}"
+    errors.append({
+        "collection": collection,
+        "index": index,
+        "id": item.get("id") if isinstance(item, dict) else None,
+        "question_id": question_id,
+        "code": code,
+        "message": message,
+    })
+
+
+def _is_text(value):
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _check_options(options, errors, report):
+    """Seçenek listesinin ortak kontrolleri; liste geçerliyse True"""
+    if not isinstance(options, list) or len(options) < MIN_OPTIONS:
+        report("too_few_options")
+        return False
+    try:
+        unique = set(options)
+    except TypeError:  # Seçeneklerde liste veya nesne var
+        report("bad_options")
+        return False
+    if len(unique) != len(options):
+        duplicates = sorted(str(option) for option, count in Counter(options).items() if count > 1)
+        report("duplicate_options", ", ".join(duplicates))
+    return True
+
+
+# -------------------- Kayıt Kontrolleri --------------------
+
+def paragraph_errors(paragraf, index=None, text_size=None):
+    """Paragrafın ve sorularının sorunları (text_size: metin dosyası boyutu)"""
+    errors = []
+    if not isinstance(paragraf, dict):
+        _error(errors, "paragraflar", index, paragraf, "not_object")
+        return errors
+    report = lambda code, detail=None, question_id=None: _error(  # noqa: E731
+        errors, "paragraflar", index, paragraf, code, question_id, detail)
+
+    ref = paragraf.get(TEXT_REF_FIELD)
+    if "paragraph" in paragraf:
+        if not _is_text(paragraf["paragraph"]) and not paragraf.get("sentences"):
+            report("empty_paragraph")
+    elif ref is not None:
+        if not isinstance(ref, list) or len(ref) != 3 or not all(isinstance(n, int) and n >= 0 for n in ref):
+            report("bad_text_ref", str(ref))
+        elif ref[1] == 0:
+            report("empty_paragraph")
+        elif text_size is not None and sum(ref) > text_size:
+            report("bad_text_ref", str(ref))
+    elif not paragraf.get("sentences"):
+        report("empty_paragraph")
+
+    sentences = paragraf.get("sentences")
+    if sentences is not None:
+        if not isinstance(sentences, list):
+            report("bad_sentences")
+        else:
+            for sentence in sentences:
+                if not isinstance(sentence, dict) or not _is_text(sentence.get("text")) \
+                        or not _is_text(sentence.get("answer")):
+                    report("empty_sentence")
+
+    questions = paragraf.get("questions", [])
+    if not isinstance(questions, list):
+        report("bad_questions")
+        return errors
+    seen_ids = set()
+    for position, question in enumerate(questions):
+        if not isinstance(question, dict):
+            report("question_not_object", f"#{position}")
+            continue
+        question_id = question.get("id")
+        if question_id is not None:
+            if question_id in seen_ids:
+                report("duplicate_question_id", question_id=question_id)
+            seen_ids.add(question_id)
+        question_report = lambda code, detail=None: report(code, detail, question_id)  # noqa: E731
+        if question.get("type") not in PARAGRAPH_QUESTION_TYPES:
+            question_report("unknown_type", str(question.get("type")))
+        if not _is_text(question.get("question")):
+            question_report("empty_question")
+        options = question.get("options")
+        if _check_options(options, errors, question_report) and question.get("correct_answer") not in options:
+            question_report("correct_answer_missing", str(question.get("correct_answer")))
+    return errors
+
+
+def word_errors(word, index=None):
+    """Kelime kaydının sorunları"""
+    errors = []
+    if not isinstance(word, (str, dict)):
+        _error(errors, "words", index, word, "not_word")
+        return errors
+    if not word_text(word).strip():
+        _error(errors, "words", index, word, "empty_word")
+    if isinstance(word, dict) and "wrong_count" in word:
+        count = word["wrong_count"]
+        if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+            _error(errors, "words", index, word, "bad_wrong_count", detail=str(count))
+    return errors
+
+
+def synonym_errors(question, index=None):
+    """Eş anlamlı sorunun sorunları (ekleme formu da kullanır)"""
+    errors = []
+    if not isinstance(question, dict):
+        _error(errors, "synonyms", index, question, "not_object")
+        return errors
+    report = lambda code, detail=None: _error(errors, "synonyms", index, question, code, detail=detail)  # noqa: E731
+
+    if question.get("type", "synonym") not in SYNONYM_QUESTION_TYPES:
+        report("unknown_type", str(question.get("type")))
+    if not _is_text(question.get("question")):
+        report("empty_question")
+    options = question.get("options")
+    correct_answers = question.get("correct_answers")
+    if not isinstance(correct_answers, list) or not correct_answers:
+        report("correct_answers_missing")
+    elif _check_options(options, errors, report):
+        missing = [str(answer) for answer in correct_answers if answer not in options]
+        if missing:
+            report("correct_answers_not_in_options", ", ".join(missing))
+    return errors
+
+
+CHECKS = {
+    "paragraflar": paragraph_errors,
+    "words": word_errors,
+    "synonyms": synonym_errors,
+}
+
+
+# -------------------- Paralel Denetim --------------------
+
+_collections = None  # Denetlenen koleksiyonlar (fork edilen çalışanlar devralır)
+
+
+def _validate_chunk(task):
+    """Bir koleksiyonun [start, end) aralığını denetle"""
+    collection, start, end, text_size = task
+    check = CHECKS[collection]
+    errors = []
+    for index in range(start, end):
+        item = _collections[collection][index]
+        if collection == "paragraflar":
+            errors.extend(check(item, index, text_size))
+        else:
+            errors.extend(check(item, index))
+    return errors
+
+
+def _duplicate_errors(collection, items, key, code):
+    """Koleksiyon genelinde aynı anahtarlı kayıtlar (ilki hariç)"""
+    errors = []
+    seen = set()
+    for index, item in enumerate(items):
+        value = key(item)
+        if value is None:
+            continue
+        if value in seen:
+            _error(errors, collection, index, item, code, detail=str(value))
+        seen.add(value)
+    return errors
+
+
+def validate_collections(collections, workers=None):
+    """{koleksiyon adı: kayıtlar} sözlüğünü denetle ve raporu döndür.
+
+    Toplam kayıt sayısı PARALLEL_THRESHOLD'u geçerse kayıt kontrolleri
+    süreç havuzunda parça parça yapılır. Hatalar koleksiyon ve kayıt
+    sırasına göre dizilir. Süreç havuzu sadece çağıran süreçte tek thread
+    çalışıyorsa kullanılır (bkz. modül açıklaması).
+    """
+    global _collections
+    text_size = os.path.getsize(PARAGRAPH_TEXT_FILE) if os.path.exists(PARAGRAPH_TEXT_FILE) else 0
+    tasks = []
+    for collection, items in collections.items():
+        for start in range(0, len(items), CHUNK_SIZE):
+            tasks.append((collection, start, min(start + CHUNK_SIZE, len(items)), text_size))
+
+    total = sum(len(items) for items in collections.values())
+    workers = workers or os.cpu_count() or 1
+    parallel = (total >= PARALLEL_THRESHOLD and workers > 1 and threading.active_count() == 1
+                and "fork" in multiprocessing.get_all_start_methods())
+    _collections = collections
+    try:
+        if parallel:
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                results = list(executor.map(_validate_chunk, tasks))
+        else:
+            results = [_validate_chunk(task) for task in tasks]
+    finally:
+        _collections = None
+    errors = [error for result in results for error in result]
+
+    for collection in ("paragraflar", "synonyms"):
+        if collection in collections:
+            errors.extend(_duplicate_errors(
+                collection, collections[collection],
+                lambda item: item.get("id") if isinstance(item, dict) else None, "duplicate_id"))
+    if "words" in collections:
+        errors.extend(_duplicate_errors(
+            "words", collections["words"],
+            lambda word: word_text(word).strip().lower() or None if isinstance(word, (str, dict)) else None,
+            "duplicate_word"))
+
+    order = {collection: position for position, collection in enumerate(collections)}
+    errors.sort(key=lambda error: (order[error["collection"]], error["index"] if error["index"] is not None else -1))
+    return {
+        "checked": {collection: len(items) for collection, items in collections.items()},
+        "question_count": sum(len(p.get("questions") or []) for p in collections.get("paragraflar", [])
+                              if isinstance(p, dict) and isinstance(p.get("questions"), list)),
+        "error_count": len(errors),
+        "errors": errors,
+    }
+
+
+def validate_store(store, workers=None):
+    """Depodaki paragraflar, kelimeler ve eş anlamlı soruların raporu"""
+    with store.read():
+        collections = {
+            "paragraflar": list(store.paragraflar),
+            "words": list(store.words),
+            "synonyms": list(store.synonyms),
+        }
+    return validate_collections(collections, workers)
+
+
+def summarize(report, limit=10):
+    """Raporun ilk hataları için okunabilir satırlar"""
+    lines = []
+    for error in report["errors"][:limit]:
+        where = f"#{error['id']}" if error["id"] is not None else f"[{error['index']}]"
+        if error["question_id"] is not None:
+            where += f" soru {error['question_id']}"
+        lines.append(f"{error['collection']} {where}: {error['message']}")
+    if report["error_count"] > limit:
+        lines.append(f"... ve {report['error_count'] - limit} hata daha")
+    return lines
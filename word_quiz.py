@@ -0,0 +1,96 @@
+import random
+
+from sentence_engine import word_text
+
+# -------------------- Kelime Kartları --------------------
+# kelimeler.json'daki en/tr çiftleriyle doğrudan çeviri soruları:
+#   en_to_tr: İngilizce kelime sorulur, Türkçe karşılıklar seçenektir
+#   tr_to_en: Türkçe karşılık sorulur, İngilizce kelimeler seçenektir
+# Kelime ve yanlış seçenekler çeldirici index'inden (bkz. distractors) okunur:
+# kelime çevirisi olan satırlar arasından rastgele seçilir, yanlış seçenekler
+# kelimenin önceden hesaplanmış benzer kelime havuzundan gelir. Soru başına
+# iş deste büyüklüğünden bağımsızdır (O(1)). Yanlış cevaplanan kelimenin
+# wrong_count'u artırılır.
+
+WORD_QUESTION_TYPES = ("en_to_tr", "tr_to_en")
+OPTION_COUNT = 4
+FALLBACK_TRIES = 20  # Havuz yetmezse rastgele kelimeyle tamamlama denemesi
+
+
+def word_rating_type(question_type):
+    """Derece ve uyarlamalı seçim anahtarlarındaki tür (cümle sorularından ayrı)"""
+    return f"card_{question_type}"
+
+
+def generate_word_question(index, question_type, rng=random, target=None):
+    """Tek kelime kartı sorusu: (soru, doğru_cevap, seçenekler, kelime) veya None.
+
+    index güncel kelime listesine eşitlenmiş bir DistractorIndex olmalıdır.
+    target verilirse (İngilizce kelime, örn. uyarlamalı seçimden) o kelime sorulur.
+    """
+    rows = index.translated_rows()
+    if len(rows) < OPTION_COUNT or question_type not in WORD_QUESTION_TYPES:
+        return None
+    if target is not None:
+        row = index.row_of.get(target.lower())
+        if row is None or not index.tr_of[row]:
+            return None
+    else:
+        row = int(rows[rng.randrange(len(rows))])
+
+    if question_type == "en_to_tr":
+        question = index.vocab[row]
+        answer_of = lambda candidate: index.tr_of[candidate]  # noqa: E731
+    else:
+        question = index.tr_of[row]
+        answer_of = lambda candidate: index.vocab[candidate]  # noqa: E731
+    correct_answer = answer_of(row)
+
+    options = [correct_answer]
+    seen = {correct_answer.lower()}
+
+    def offer(candidate):
+        option = answer_of(candidate)
+        if option.lower() not in seen:
+            seen.add(option.lower())
+            options.append(option)
+
+    # Havuzda aynı anlama gelen kelimeler zaten yok
+    pool = [int(candidate) for candidate in index.pools[row] if candidate >= 0 and index.tr_of[candidate]]
+    for candidate in rng.sample(pool, len(pool)):
+        offer(candidate)
+        if len(options) == OPTION_COUNT:
+            break
+    for _ in range(FALLBACK_TRIES):
+        if len(options) == OPTION_COUNT:
+            break
+        candidate = int(rows[rng.randrange(len(rows))])
+        if index.meaning[candidate] != index.meaning[row]:
+            offer(candidate)
+    if len(options) < OPTION_COUNT:
+        return None
+
+    rng.shuffle(options)
+    return question, correct_answer, options, index.vocab[row]
+
+
+def generate_word_questions(index, question_type, count, rng=random, targets=None):
+    """count kelime kartı sorusu (targets verilirse o kelimeler için)"""
+    if targets is not None:
+        generated = [generate_word_question(index, question_type, rng, target) for target in targets]
+    else:
+        generated = [generate_word_question(index, question_type, rng) for _ in range(count)]
+    return [question for question in generated if question is not None]
+
+
+def record_word_miss(words, word):
+    """Kelimenin wrong_count'unu bir artır; kelime bulunamazsa None döner"""
+    key = word.lower()
+    for position, entry in enumerate(words):
+        if word_text(entry).lower() != key:
+            continue
+        if not isinstance(entry, dict):  # Eski düz metin kayıt
+            entry = words[position] = {"en": word_text(entry), "wrong_count": 0}
+        entry["wrong_count"] = entry.get("wrong_count", 0) + 1
+        return entry["wrong_count"]
+    return None